@@ -0,0 +1,36 @@
+"""Example how to decode a measurement file downloaded from device memory card (see example_dyscom_download).
+Run with python -m examples.dyscom.example_dyscom_decode_file <measurement file> <destination> [<number of processes>]"""
+
+import sys
+import time
+
+import numpy as np
+
+from science_mode_4.dyscom.dyscom_measurement_file_decoder import DyscomMeasurementFileDecoder
+
+
+def main():
+    """Main function"""
+    if len(sys.argv) not in [3, 4]:
+        print(__doc__)
+        sys.exit(1)
+
+    decoder = DyscomMeasurementFileDecoder(sys.argv[1])
+    meta_info = decoder.meta_info
+    print(f"Proband: {meta_info.proband_name}, start: {meta_info.start_time}, duration: {meta_info.duration}")
+    print(f"Signal types: {decoder.signal_types}, sample rate: {decoder.sample_rate}, packets: {decoder.packet_count}")
+
+    # packets are decoded in parallel by a pool of processes into a recording, that is memory mapped
+    max_workers = int(sys.argv[3]) if len(sys.argv) == 4 else None
+    start_time = time.perf_counter()
+    recording = decoder.convert(sys.argv[2], max_workers)
+    duration = time.perf_counter() - start_time
+    print(f"Duration: {duration}, packets per second: {recording.packet_count / duration if duration > 0 else 0}")
+
+    for signal_type in recording.signal_types:
+        print(f"{signal_type.name}: mean {np.mean(recording.get_values(signal_type))}")
+    recording.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Example how to download a measurement file from device memory card.
+Run with python -m examples.dyscom.example_dyscom_download <com port> <filename> <destination> [<block offset>],
+if download was interrupted it can be continued with block offset printed in error message"""
+
+import asyncio
+import sys
+
+from science_mode_4 import DeviceI24
+from science_mode_4 import SerialPortConnection
+
+
+async def download(com_port: str, filename: str, destination: str, block_offset: int):
+    """Downloads file and prints download rate"""
+    connection = SerialPortConnection(com_port)
+    connection.open()
+
+    device = DeviceI24(connection)
+    await device.initialize()
+    dyscom = device.get_layer_dyscom()
+
+    print(f"Number of measurements: {await dyscom.get_list_of_measurement_meta_info()}")
+    # blocks are acknowledged as soon as they arrive and written to destination in background thread,
+    # checksum is calculated while blocks arrive and compared with checksum from device
+    result = await dyscom.download_file(filename, destination, block_offset)
+    print(f"File: {result.filename}, size: {result.filesize}, blocks: {result.number_of_blocks}, resumes: {result.resume_count}, "
+          f"checksum: {result.checksum:#06x}")
+    print(f"Duration: {result.duration_in_seconds}, MB per second: {result.megabytes_per_second}")
+
+    connection.close()
+
+
+def main():
+    """Main function"""
+    if len(sys.argv) not in [4, 5]:
+        print(__doc__)
+        sys.exit(1)
+
+    block_offset = int(sys.argv[4]) if len(sys.argv) == 5 else 0
+    asyncio.run(download(sys.argv[1], sys.argv[2], sys.argv[3], block_offset))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Example how to record the raw data of a dyscom measurement and replay it to benchmark decoding.
+Record with python -m examples.dyscom.example_dyscom_record_replay record <com port> <filename>
+Replay with python -m examples.dyscom.example_dyscom_record_replay replay <filename> [<minimum packets per second>],
+exit code is 1 if decoding is slower than minimum packets per second (e.g. to use it as a regression check)"""
+
+import asyncio
+import sys
+import time
+
+from science_mode_4 import DeviceI24
+from science_mode_4 import Commands
+from science_mode_4 import PacketBuffer, PacketFactory
+from science_mode_4 import SerialPortConnection, RecordingConnection, ReplayConnection
+from science_mode_4.dyscom.dyscom_types import DyscomInitParams, DyscomPowerModulePowerType, DyscomPowerModuleType
+
+
+async def record(com_port: str, filename: str):
+    """Records raw data of a 10s dyscom measurement"""
+    # wrap serial port connection, so all read and written data is recorded
+    connection = RecordingConnection(SerialPortConnection(com_port), filename)
+    connection.open()
+
+    device = DeviceI24(connection)
+    await device.initialize()
+    dyscom = device.get_layer_dyscom()
+    await dyscom.power_module(DyscomPowerModuleType.MEASUREMENT, DyscomPowerModulePowerType.SWITCH_ON)
+    await dyscom.init(DyscomInitParams())
+    await dyscom.start()
+
+    live_data_count = 0
+    start_time = time.perf_counter()
+    while time.perf_counter() - start_time < 10:
+        while True:
+            raw_packet = device.packet_buffer.get_raw_packet_from_buffer()
+            if raw_packet is None:
+                break
+            if raw_packet[0] == Commands.DlSendLiveData:
+                live_data_count += 1
+        await connection.wait_for_data(0.01)
+
+    await dyscom.stop()
+    await dyscom.power_module(DyscomPowerModuleType.MEASUREMENT, DyscomPowerModulePowerType.SWITCH_OFF)
+    connection.close()
+    print(f"Live data packets: {live_data_count}, records: {connection.record_count}")
+
+
+def replay(filename: str) -> float:
+    """Decodes recorded data as fast as possible and returns packets per second"""
+    # each read returns one recorded chunk, so fragmentation is the same as during recording
+    connection = ReplayConnection(filename, original_timing=False)
+    connection.open()
+    packet_buffer = PacketBuffer(connection, PacketFactory())
+
+    packet_count = 0
+    start_time = time.perf_counter()
+    while not connection.is_finished:
+        while True:
+            packet = packet_buffer.get_packet_from_buffer()
+            if packet is None:
+                break
+            packet_count += 1
+    duration = time.perf_counter() - start_time
+
+    print(f"Chunks: {connection.chunk_count}, bytes: {connection.byte_count}, packets: {packet_count}")
+    print(f"Duration: {duration}, packets per second: {packet_count / duration}, MB per second: {connection.byte_count / duration / 1e6}")
+    return packet_count / duration
+
+
+def main():
+    """Main function"""
+    if len(sys.argv) == 4 and sys.argv[1] == "record":
+        asyncio.run(record(sys.argv[2], sys.argv[3]))
+    elif len(sys.argv) in [3, 4] and sys.argv[1] == "replay":
+        packets_per_second = replay(sys.argv[2])
+        if len(sys.argv) == 4 and packets_per_second < float(sys.argv[3]):
+            print(f"Decoding is slower than {sys.argv[3]} packets per second")
+            sys.exit(1)
+    else:
+        print(__doc__)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Example how to record dyscom live data to a binary file with DyscomLiveDataRecorder and
+read the recording back with DyscomLiveDataRecording. Recorder writes columns in a background
+thread, so recording takes much less CPU time and disk space than writing a .csv-file."""
+
+import asyncio
+
+import numpy as np
+
+from science_mode_4 import DeviceI24
+from science_mode_4 import SerialPortConnection
+from science_mode_4.dyscom.ads129x.ads129x_config_register_1 import Ads129xOutputDataRate, Ads129xPowerMode
+from science_mode_4.dyscom.dyscom_types import DyscomInitParams, DyscomPowerModulePowerType, DyscomPowerModuleType, DyscomSignalType
+from science_mode_4.dyscom.dyscom_sample_store import DyscomSampleStore
+from science_mode_4.dyscom.dyscom_live_data_recorder import DyscomLiveDataRecorder, DyscomLiveDataRecording
+from examples.utils.example_utils import ExampleUtils
+
+
+def main():
+    """Main function"""
+
+    async def device_communication() -> int:
+        """Communication with science mode device"""
+
+        # get comport from command line argument
+        com_port = ExampleUtils.get_comport_from_commandline_argument()
+        # create serial port connection
+        connection = SerialPortConnection(com_port)
+        # open connection, now we can read and write data
+        connection.open()
+
+        # create science mode device
+        device = DeviceI24(connection)
+        # call initialize to get basic information (serial, versions) and stop any active stimulation/measurement
+        # to have a defined state
+        await device.initialize()
+
+        # get dyscom layer to call dyscom level commands
+        dyscom = device.get_layer_dyscom()
+
+        # call enable measurement power module for measurement
+        await dyscom.power_module(DyscomPowerModuleType.MEASUREMENT, DyscomPowerModulePowerType.SWITCH_ON)
+        # call init with 4k sample rate and enable signal types
+        init_params = DyscomInitParams()
+        init_params.signal_type = [DyscomSignalType.BI, DyscomSignalType.EMG_1,\
+                                DyscomSignalType.EMG_2, DyscomSignalType.BREATHING, DyscomSignalType.TEMPERATURE]
+        init_params.register_map_ads129x.config_register_1.output_data_rate = Ads129xOutputDataRate.HR_MODE_4_KSPS__LP_MODE_2_KSPS
+        init_params.register_map_ads129x.config_register_1.power_mode = Ads129xPowerMode.HIGH_RESOLUTION
+        init_result = await dyscom.init(init_params)
+
+        # recorder stores init params and sample rate in file header
+        recorder = DyscomLiveDataRecorder("values.sm4live", init_params, DyscomSampleStore.get_sample_rate(init_result.frequency_out))
+        recorder.start()
+
+        # start dyscom measurement
+        await dyscom.start()
+
+        # stop measurement after 10s, stream_live_data() ends when it detects that device is no longer measuring
+        async def stop_measurement():
+            await asyncio.sleep(10)
+            await dyscom.stop()
+        stop_task = asyncio.create_task(stop_measurement())
+
+        async for batch in dyscom.stream_live_data():
+            # returns immediately, batch is written in background thread
+            recorder.append(batch)
+        await stop_task
+
+        # writes remaining packets and closes file
+        recorder.stop()
+        print(f"Recorded packets: {recorder.packet_count}, chunks: {recorder.chunk_count}")
+
+        # turn power module off
+        await dyscom.power_module(DyscomPowerModuleType.MEASUREMENT, DyscomPowerModulePowerType.SWITCH_OFF)
+
+        # close serial port connection
+        connection.close()
+
+        # open recording, file is memory mapped and chunks are views of file
+        recording = DyscomLiveDataRecording("values.sm4live")
+        print(f"Signal types: {recording.signal_types}, sample rate: {recording.sample_rate}, packets: {recording.packet_count}")
+        for signal_type in recording.signal_types:
+            print(f"{signal_type.name}: mean {np.mean(recording.get_values(signal_type))}")
+        recording.close()
+
+        return 0
+
+
+    # start device communication
+    asyncio.run(device_communication())
+
+
+if __name__ == "__main__":
+    main()
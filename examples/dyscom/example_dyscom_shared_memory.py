@@ -0,0 +1,94 @@
+"""Example how to acquire dyscom live data of multiple devices with one process per device.
+Each acquisition process publishes samples into a shared memory ring, main process maps
+the rings and reads samples without decoding packets itself. Prints throughput per device,
+so it can be used to benchmark how many devices a machine can handle."""
+
+import functools
+import sys
+import time
+
+import numpy as np
+
+from science_mode_4 import SerialPortConnection
+from science_mode_4.dyscom.ads129x.ads129x_config_register_1 import Ads129xOutputDataRate, Ads129xPowerMode
+from science_mode_4.dyscom.dyscom_types import DyscomInitParams, DyscomSignalType
+from science_mode_4.dyscom.dyscom_shared_sample_ring import DyscomSharedSampleRing
+from science_mode_4.dyscom.dyscom_acquisition_process import DyscomAcquisitionProcess
+
+
+def get_comports_from_commandline_arguments() -> list[str]:
+    """Get com ports from command line arguments, if no argument provided,
+    use all matching devices"""
+    if len(sys.argv) > 1:
+        return sys.argv[1:]
+    return [x.device for x in SerialPortConnection.list_science_mode_device_ports()]
+
+
+def read_samples(com_ports: list[str], rings: list[DyscomSharedSampleRing], duration: float):
+    """Reads samples from all rings for duration and prints stats"""
+    # read samples for some time, each reader keeps track of its own sequence
+    sequences = [ring.write_sequence for ring in rings]
+    counts = [0] * len(rings)
+    lost_counts = [0] * len(rings)
+    start_time = time.perf_counter()
+    while time.perf_counter() - start_time < duration:
+        for index, ring in enumerate(rings):
+            result = ring.read(sequences[index])
+            sequences[index] = result.next_sequence
+            counts[index] += len(result.records)
+            lost_counts[index] += result.lost_count
+            if len(result.records) > 0:
+                # values is a float32 array with shape (packets, channels)
+                mean = np.mean(result.records["value"], axis=0)
+                print(f"{com_ports[index]}: {len(result.records)} samples, mean {mean}")
+        time.sleep(0.1)
+
+    # print stats
+    elapsed_time = time.perf_counter() - start_time
+    for com_port, count, lost_count in zip(com_ports, counts, lost_counts):
+        print(f"{com_port}: samples {count}, lost {lost_count}, sample rate {count / elapsed_time}")
+    print(f"Devices: {len(com_ports)}, total sample rate: {sum(counts) / elapsed_time}")
+
+
+def main():
+    """Main function"""
+
+    com_ports = get_comports_from_commandline_arguments()
+    if len(com_ports) == 0:
+        print("No science mode device found")
+        print("Serial port command line arguments missing (e.g. python -m examples.dyscom.example_dyscom_shared_memory COM3 COM4)")
+        sys.exit(1)
+
+    # measure 4k samples per second with 2 signal types
+    init_params = DyscomInitParams()
+    init_params.signal_type = [DyscomSignalType.BI, DyscomSignalType.EMG_1]
+    init_params.register_map_ads129x.config_register_1.output_data_rate = Ads129xOutputDataRate.HR_MODE_4_KSPS__LP_MODE_2_KSPS
+    init_params.register_map_ads129x.config_register_1.power_mode = Ads129xPowerMode.HIGH_RESOLUTION
+
+    # create one ring and one acquisition process per device, ring holds 16 seconds of data
+    rings: list[DyscomSharedSampleRing] = []
+    processes: list[DyscomAcquisitionProcess] = []
+    for com_port in com_ports:
+        ring = DyscomSharedSampleRing.create(len(init_params.signal_type), 65536)
+        rings.append(ring)
+        # connection is created inside of acquisition process
+        process = DyscomAcquisitionProcess(functools.partial(SerialPortConnection, com_port), ring, init_params)
+        process.start()
+        processes.append(process)
+
+    for com_port, process in zip(com_ports, processes):
+        if not process.wait_until_running(10):
+            print(f"Acquisition for {com_port} failed")
+
+    read_samples(com_ports, rings, 10)
+
+    # stop acquisition, processes stop measurement and close connection
+    for process in processes:
+        process.stop()
+    for ring in rings:
+        ring.close()
+        ring.unlink()
+
+
+if __name__ == "__main__":
+    main()
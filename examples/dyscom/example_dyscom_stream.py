@@ -0,0 +1,93 @@
+"""Example how to use dyscom layer stream_live_data() to receive live data as batches
+of NumPy arrays, operation mode polling and stop detection is handled by stream_live_data().
+Batches are kept in a DyscomSampleStore to access values of last seconds."""
+
+import asyncio
+
+import numpy as np
+
+from science_mode_4 import DeviceI24
+from science_mode_4 import SerialPortConnection
+from science_mode_4.dyscom.ads129x.ads129x_config_register_1 import Ads129xOutputDataRate, Ads129xPowerMode
+from science_mode_4.dyscom.dyscom_types import DyscomInitParams, DyscomPowerModulePowerType, DyscomPowerModuleType, DyscomSignalType
+from science_mode_4.dyscom.dyscom_sample_store import DyscomSampleStore
+from examples.utils.example_utils import ExampleUtils
+
+
+def main():
+    """Main function"""
+
+    async def device_communication() -> int:
+        """Communication with science mode device"""
+
+        # get comport from command line argument
+        com_port = ExampleUtils.get_comport_from_commandline_argument()
+        # create serial port connection
+        connection = SerialPortConnection(com_port)
+        # open connection, now we can read and write data
+        connection.open()
+
+        # create science mode device
+        device = DeviceI24(connection)
+        # call initialize to get basic information (serial, versions) and stop any active stimulation/measurement
+        # to have a defined state
+        await device.initialize()
+
+        # get dyscom layer to call dyscom level commands
+        dyscom = device.get_layer_dyscom()
+
+        # call enable measurement power module for measurement
+        await dyscom.power_module(DyscomPowerModuleType.MEASUREMENT, DyscomPowerModulePowerType.SWITCH_ON)
+        # call init with 4k sample rate and enable signal types
+        init_params = DyscomInitParams()
+        init_params.signal_type = [DyscomSignalType.BI, DyscomSignalType.EMG_1]
+        init_params.register_map_ads129x.config_register_1.output_data_rate = Ads129xOutputDataRate.HR_MODE_4_KSPS__LP_MODE_2_KSPS
+        init_params.register_map_ads129x.config_register_1.power_mode = Ads129xPowerMode.HIGH_RESOLUTION
+        init_result = await dyscom.init(init_params)
+
+        # store keeps last 5s of each signal type, size depends on output data rate from init,
+        # lost samples are detected from time offsets and stored as NaN
+        store = DyscomSampleStore.create(init_params, init_result, 5.0, True)
+
+        # start dyscom measurement
+        await dyscom.start()
+
+        # stop measurement after 10s, stream_live_data() ends when it detects that device is no longer measuring
+        async def stop_measurement():
+            await asyncio.sleep(10)
+            await dyscom.stop()
+        stop_task = asyncio.create_task(stop_measurement())
+
+        # receive batches with up to 1000 packets, but at least every 100ms
+        total_count = 0
+        async for batch in dyscom.stream_live_data(batch_size=1000, max_latency_in_seconds=0.1):
+            total_count += batch.number_of_packets
+            store.append(batch)
+            means = {signal_type.name: float(np.mean(values)) for signal_type, values in batch.values_by_signal_type.items()}
+            # get_last_seconds() returns views into store, no values are copied
+            _, last_second = store.get_last_seconds(DyscomSignalType.BI, 1.0)
+            print(f"Packets: {batch.number_of_packets}, time offset: {batch.time_offset[0]}, mean: {means}, "
+                  f"BI mean of last second: {np.nanmean(last_second)}")
+            if np.any(batch.status):
+                print("Live data status error")
+        print(f"Samples: {total_count}")
+        gap_detector = store.gap_detector
+        print(f"Lost samples: {gap_detector.lost_sample_count}, gaps: {gap_detector.gap_count}, "
+              f"largest gap: {gap_detector.largest_gap}, duplicates: {gap_detector.duplicate_count}")
+        await stop_task
+
+        # turn power module off
+        await dyscom.power_module(DyscomPowerModuleType.MEASUREMENT, DyscomPowerModulePowerType.SWITCH_OFF)
+
+        # close serial port connection
+        connection.close()
+
+        return 0
+
+
+    # start device communication
+    asyncio.run(device_communication())
+
+
+if __name__ == "__main__":
+    main()
@@ -53,6 +53,10 @@ def main():
         init_params.register_map_ads129x.config_register_1.power_mode = Ads129xPowerMode.HIGH_RESOLUTION
         await dyscom.init(init_params)
 
+        # read and decode incoming data in a background thread, so the connection buffer
+        # does not overflow if handling of packets takes longer
+        device.packet_buffer.start_reader_thread()
+
         # start dyscom measurement
         await dyscom.start()
 
@@ -109,6 +113,8 @@ def main():
         # turn power module off
         await dyscom.power_module(DyscomPowerModuleType.MEASUREMENT, DyscomPowerModulePowerType.SWITCH_OFF)
 
+        # stop background thread before closing connection
+        device.packet_buffer.stop_reader_thread()
         # close serial port connection
         connection.close()
 
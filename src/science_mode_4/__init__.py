@@ -13,5 +13,8 @@ from .device import *
 from .layer import *
 from .device_p24 import *
 from .device_i24 import *
+from .device_group import *
+# emulator uses types of all layers, so it is imported after layers
+from .utils.emulator_connection import *
 
 __version__ = version("science_mode_4")
@@ -1,5 +1,6 @@
 """Provides device class representing a science mode device"""
 
+from contextlib import AbstractContextManager
 from enum import IntEnum
 from typing import Type
 
@@ -14,6 +15,7 @@ from .dyscom.dyscom_layer import LayerDyscom
 from .dyscom.dyscom_types import DyscomGetOperationModeType
 from .utils.connection import Connection
 from .utils.packet_buffer import PacketBuffer
+from .utils.transmit_buffer import TransmitBuffer
 
 
 class DeviceCapability(IntEnum):
@@ -63,7 +65,7 @@ class Device():
     @property
     def packet_number_generator(self) -> PacketNumberGenerator:
         """Getter for packet number generator"""
-        return self._capabilities
+        return self._packet_number_generator
 
 
     @property
@@ -113,6 +115,13 @@ class Device():
         return self._layer[DeviceCapability.DYSCOM]
 
 
+    def batch(self) -> AbstractContextManager[TransmitBuffer]:
+        """Context manager, all packets send inside of this context are written to connection
+        with a single write when context ends, e.g. channel configs for multiple channels.
+        If context ends with an exception, packets of this context are discarded"""
+        return self._packet_buffer.transmit_buffer.batch()
+
+
     def add_layer(self, capability: DeviceCapability, layer: Layer):
         """Add layer"""
         self._layer[capability] = layer
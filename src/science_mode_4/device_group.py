@@ -0,0 +1,164 @@
+"""Provides a device group class to drive multiple science mode devices on one event loop"""
+
+import asyncio
+import time
+from typing import Iterator, NamedTuple
+
+from .device import Device, DeviceCapability
+from .protocol.types import StimStatus
+
+
+class DeviceStats(NamedTuple):
+    """Represents throughput and latency statistics of a device since last reset"""
+    received_packet_count: int
+    received_payload_byte_count: int
+    request_count: int
+    mean_request_latency: float
+    max_request_latency: float
+    stream_drop_count: int
+    overflow_count: int
+    elapsed_time: float
+
+
+    @property
+    def packets_per_second(self) -> float:
+        """Received packets per second"""
+        if self.elapsed_time <= 0:
+            return 0.0
+        return self.received_packet_count / self.elapsed_time
+
+
+    @property
+    def payload_bytes_per_second(self) -> float:
+        """Received payload bytes per second"""
+        if self.elapsed_time <= 0:
+            return 0.0
+        return self.received_payload_byte_count / self.elapsed_time
+
+
+class DeviceGroup():
+    """Class for driving multiple devices on one event loop. Group operations are issued to all
+    devices concurrently, so they take about as long as the slowest device and not the sum of all devices.
+
+    Use connections that notify the event loop about incoming data (e.g. AsyncSerialPortConnection),
+    then all connections are multiplexed by the selector of the event loop and wait_for_data()
+    wakes up as soon as any device sends data."""
+
+
+    def __init__(self, devices: list[Device] | None = None):
+        self._devices: list[Device] = [] if devices is None else list(devices)
+        self._stats_start_time = time.perf_counter()
+        # packet buffer counters are cumulative, so stream drop and overflow count of each device at last reset
+        self._stats_base_counts: dict[Device, tuple[int, int]] = {}
+
+
+    @property
+    def devices(self) -> list[Device]:
+        """Getter for devices"""
+        return self._devices
+
+
+    def __len__(self) -> int:
+        return len(self._devices)
+
+
+    def __iter__(self) -> Iterator[Device]:
+        return iter(self._devices)
+
+
+    def __getitem__(self, index: int) -> Device:
+        return self._devices[index]
+
+
+    def add_device(self, device: Device):
+        """Add device to group"""
+        self._devices.append(device)
+
+
+    def remove_device(self, device: Device):
+        """Remove device from group"""
+        self._devices.remove(device)
+        self._stats_base_counts.pop(device, None)
+
+
+    async def initialize(self):
+        """Initializes all devices concurrently, see Device.initialize()"""
+        await asyncio.gather(*(device.initialize() for device in self._devices))
+
+
+    async def start_dyscom(self):
+        """Starts dyscom measurement of all devices with dyscom capability concurrently"""
+        await asyncio.gather(*(device.get_layer_dyscom().start() for device in self._get_devices(DeviceCapability.DYSCOM)))
+
+
+    async def stop_dyscom(self):
+        """Stops dyscom measurement of all devices with dyscom capability concurrently"""
+        await asyncio.gather(*(device.get_layer_dyscom().stop() for device in self._get_devices(DeviceCapability.DYSCOM)))
+
+
+    async def stop_stimulation(self):
+        """Stops low level or mid level stimulation of all devices concurrently, stim status of each device
+        is used to decide which layer has to be stopped"""
+        await asyncio.gather(*(self._stop_stimulation(device) for device in self._devices
+                               if DeviceCapability.LOW_LEVEL in device.capabilities
+                               or DeviceCapability.MID_LEVEL in device.capabilities))
+
+
+    def process_incoming(self):
+        """Reads and decodes incoming data of all devices, see PacketBuffer.process_incoming()"""
+        for device in self._devices:
+            device.packet_buffer.process_incoming()
+
+
+    async def wait_for_data(self, timeout_in_seconds: float):
+        """Wait until any device may have new data available or timeout elapsed"""
+        if not self._devices:
+            await asyncio.sleep(timeout_in_seconds)
+            return
+
+        waiters = [asyncio.ensure_future(device.connection.wait_for_data(timeout_in_seconds)) for device in self._devices]
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+
+    def get_stats(self) -> list[DeviceStats]:
+        """Returns statistics for each device since group was created or reset_stats() was called"""
+        elapsed_time = time.perf_counter() - self._stats_start_time
+        return [self._get_device_stats(device, elapsed_time, self._stats_base_counts.get(device, (0, 0))) for device in self._devices]
+
+
+    def reset_stats(self):
+        """Resets statistics of all devices"""
+        for device in self._devices:
+            device.packet_buffer.statistics.reset()
+            self._stats_base_counts[device] = device.packet_buffer.stream_drop_count, device.packet_buffer.overflow_count
+        self._stats_start_time = time.perf_counter()
+
+
+    def _get_devices(self, capability: DeviceCapability) -> list[Device]:
+        """Returns all devices with capability"""
+        return [device for device in self._devices if capability in device.capabilities]
+
+
+    @staticmethod
+    async def _stop_stimulation(device: Device):
+        """Stops stimulation of device depending on stim status"""
+        stim_status = await device.get_layer_general().get_stim_status()
+        if stim_status.stim_status == StimStatus.LOW_LEVEL_INITIALIZED:
+            await device.get_layer_low_level().stop()
+        elif stim_status.stim_status in [StimStatus.MID_LEVEL_INITIALIZED, StimStatus.MID_LEVEL_RUNNING]:
+            await device.get_layer_mid_level().stop()
+
+
+    @staticmethod
+    def _get_device_stats(device: Device, elapsed_time: float, base_counts: tuple[int, int]) -> DeviceStats:
+        """Collects statistics of device, base_counts are stream drop and overflow count at last reset"""
+        packet_buffer = device.packet_buffer
+        statistics = packet_buffer.statistics
+        return DeviceStats(statistics.received_packet_count, statistics.received_payload_byte_count,
+                           statistics.request_count, statistics.mean_request_latency,
+                           statistics.max_request_latency, packet_buffer.stream_drop_count - base_counts[0],
+                           packet_buffer.overflow_count - base_counts[1], elapsed_time)
@@ -1,5 +1,8 @@
 """Init file for dyscom"""
 
+from .dyscom_acquisition_process import *
+from .dyscom_file_block_writer import *
+from .dyscom_gap_detector import *
 from .dyscom_get_battery_status import *
 from .dyscom_get_device_id import *
 from .dyscom_get_file_by_name import *
@@ -10,10 +13,15 @@ from .dyscom_get_list_of_measurement_meta_info import *
 from .dyscom_get_operation_mode import *
 from .dyscom_init import *
 from .dyscom_layer import *
+from .dyscom_live_data_batch import *
+from .dyscom_live_data_recorder import *
+from .dyscom_measurement_file_decoder import *
 from .dyscom_power_module import *
+from .dyscom_sample_store import *
 from .dyscom_send_file import *
 from .dyscom_send_live_data import *
 from .dyscom_send_measurement_meta_info import *
+from .dyscom_shared_sample_ring import *
 from .dyscom_start import *
 from .dyscom_stop import *
 from .dyscom_sys import *
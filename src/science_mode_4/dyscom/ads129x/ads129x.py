@@ -37,6 +37,13 @@ class Ads129x:
         control_register = data[0]
         self.device_id = control_register
 
+        # registers are class attributes, so create own registers before changing them
+        self.config_register_1 = Ads129xConfigRegister1()
+        self.config_register_2 = Ads129xConfigRegister2()
+        self.config_register_3 = Ads129xConfigRegister3()
+        self.config_register_4 = Ads129xConfigRegister4()
+        self.respiration_control_register = Ads129xRespirationControlRegister()
+
         self.config_register_1.set_data([data[8]])
         self.config_register_2.set_data([data[9]])
         self.config_register_3.set_data([data[10]])
@@ -0,0 +1,131 @@
+"""Provides a process that acquires dyscom live data and publishes it to a shared memory ring"""
+
+import asyncio
+import multiprocessing
+from typing import Callable
+
+from science_mode_4.protocol.commands import Commands
+from science_mode_4.utils.connection import Connection
+from .dyscom_shared_sample_ring import DyscomSharedSampleRing
+from .dyscom_types import DyscomInitParams, DyscomPowerModulePowerType, DyscomPowerModuleType
+
+
+class DyscomAcquisitionProcess():
+    """Dedicated process for one connection, that reads and decodes frames and writes
+    send live data packets to a DyscomSharedSampleRing. Framing and decoding run without
+    competing for the GIL of the consumer process, consumers map the ring with
+    DyscomSharedSampleRing.attach().
+
+    Connection is created inside the process with connection_factory, so it must be picklable
+    (e.g. functools.partial(SerialPortConnection, "COM3")). If init_params is not None, process
+    initializes the device, switches measurement power module on, calls dyscom init with init_params
+    and starts measurement, when process is stopped measurement is stopped again."""
+
+    # max time process waits for new data before checking stop request
+    WAIT_FOR_DATA_TIMEOUT_IN_SECONDS = 0.01
+
+
+    def __init__(self, connection_factory: Callable[[], Connection], ring: DyscomSharedSampleRing,
+                 init_params: DyscomInitParams | None = None):
+        self._running_event = multiprocessing.Event()
+        self._stop_event = multiprocessing.Event()
+        self._process = multiprocessing.Process(target=DyscomAcquisitionProcess._run,
+                                                args=(connection_factory, ring.name, init_params,
+                                                      self._running_event, self._stop_event),
+                                                name="ScienceModeAcquisition", daemon=True)
+
+
+    @property
+    def is_alive(self) -> bool:
+        """Getter for process state"""
+        return self._process.is_alive()
+
+
+    @property
+    def is_running(self) -> bool:
+        """Getter for acquisition state, true if process is alive and publishes live data"""
+        return self._running_event.is_set() and self._process.is_alive()
+
+
+    @property
+    def exitcode(self) -> int | None:
+        """Getter for exit code of process, None if process has not finished yet"""
+        return self._process.exitcode
+
+
+    def start(self):
+        """Starts acquisition process"""
+        self._process.start()
+
+
+    def wait_until_running(self, timeout_in_seconds: float) -> bool:
+        """Waits until process publishes live data, returns false if process ended or timeout elapsed"""
+        interval = 0.05
+        while timeout_in_seconds > 0:
+            if self._running_event.wait(min(interval, timeout_in_seconds)):
+                return True
+            if not self._process.is_alive():
+                return False
+            timeout_in_seconds -= interval
+        return self._running_event.is_set()
+
+
+    def stop(self, timeout_in_seconds: float = 5):
+        """Requests process to stop and waits until it finished, process is terminated
+        if it does not finish within timeout"""
+        self._stop_event.set()
+        self._process.join(timeout_in_seconds)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+
+
+    @staticmethod
+    def _run(connection_factory: Callable[[], Connection], ring_name: str, init_params: DyscomInitParams | None,
+             running_event, stop_event):
+        """Process function"""
+        asyncio.run(DyscomAcquisitionProcess._acquire(connection_factory, ring_name, init_params,
+                                                      running_event, stop_event))
+
+
+    @staticmethod
+    async def _acquire(connection_factory: Callable[[], Connection], ring_name: str, init_params: DyscomInitParams | None,
+                       running_event, stop_event):
+        """Reads live data from connection and writes it to ring until stop_event is set"""
+        # avoid circular import, device imports dyscom package
+        from science_mode_4.device_i24 import DeviceI24 # pylint:disable=import-outside-toplevel
+
+        ring = DyscomSharedSampleRing.attach(ring_name)
+        connection = connection_factory()
+        connection.open()
+        try:
+            device = DeviceI24(connection)
+            dyscom = device.get_layer_dyscom()
+            if init_params is not None:
+                await device.initialize()
+                await dyscom.power_module(DyscomPowerModuleType.MEASUREMENT, DyscomPowerModulePowerType.SWITCH_ON)
+                await dyscom.init(init_params)
+                await dyscom.start()
+            running_event.set()
+
+            packet_buffer = device.packet_buffer
+            while not stop_event.is_set():
+                packet_buffer.update_buffer()
+                payloads = []
+                while True:
+                    raw_packet = packet_buffer.get_raw_packet_from_buffer(False)
+                    if raw_packet is None:
+                        break
+                    if raw_packet[0] == Commands.DlSendLiveData:
+                        payloads.append(raw_packet[2])
+                if payloads:
+                    ring.write_payloads(payloads)
+                await connection.wait_for_data(DyscomAcquisitionProcess.WAIT_FOR_DATA_TIMEOUT_IN_SECONDS)
+
+            running_event.clear()
+            if init_params is not None:
+                await dyscom.stop()
+                await dyscom.power_module(DyscomPowerModuleType.MEASUREMENT, DyscomPowerModulePowerType.SWITCH_OFF)
+        finally:
+            connection.close()
+            ring.close()
@@ -0,0 +1,170 @@
+"""Provides a class that writes blocks of a dyscom file download and calculates the file checksum"""
+
+import asyncio
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO
+
+from science_mode_4.utils.crc16 import Crc16
+from .dyscom_send_file import PacketDyscomSendFile
+from .dyscom_get_file_by_name import DyscomGetFileByNameResult
+
+
+class DyscomFileBlockWriter():
+    """Writes blocks of a file download (see PacketDyscomSendFile) at their position in a background thread.
+
+    CRC16 (XModem) of each block is calculated when it arrives and folded into a running checksum
+    of file, so file does not need to be read again to compare it with checksum from device.
+    Blocks may arrive in any order, but all blocks except last one must have the same size,
+    blocks with inconsistent size are not written and returned by damaged_blocks."""
+
+
+    def __init__(self, f: BinaryIO, info: DyscomGetFileByNameResult):
+        """info is result of get file by name that started download, blocks before block offset
+        are expected to be in f already"""
+        self._f = f
+        self._info = info
+        # size of all blocks except last one, known after first of these blocks arrived
+        self._block_size = 0
+        self._last_block_size = 0
+        # checksum of each block after block offset, -1 if block was not written yet
+        self._block_checksums = array("l", [-1]) * max(0, info.number_of_blocks - info.block_offset)
+        self._damaged_blocks: set[int] = set()
+        # checksum of all consecutive blocks starting at block offset
+        self._running_checksum = 0
+        self._running_block = info.block_offset
+        self._executor = ThreadPoolExecutor(1)
+        # executor has one thread, so last write finishes after all other writes
+        self._last_write: asyncio.Future | None = None
+        self._write_error: Exception | None = None
+
+
+    @property
+    def info(self) -> DyscomGetFileByNameResult:
+        """Getter for result of get file by name that started download"""
+        return self._info
+
+
+    @property
+    def byte_count(self) -> int:
+        """Getter for number of bytes of all written blocks"""
+        count = len(self._block_checksums) - self._block_checksums.count(-1)
+        if count > 0 and self._block_checksums[-1] != -1:
+            return (count - 1) * self._block_size + self._last_block_size
+        return count * self._block_size
+
+
+    @property
+    def damaged_blocks(self) -> list[int]:
+        """Getter for block numbers of blocks with inconsistent size, that were not written"""
+        return sorted(self._damaged_blocks)
+
+
+    @property
+    def missing_block_count(self) -> int:
+        """Getter for number of blocks after block offset not written yet"""
+        return self._block_checksums.count(-1)
+
+
+    def write_block(self, block: PacketDyscomSendFile) -> bool:
+        """Writes block asynchronously, returns false if block size is inconsistent and block was not written"""
+        index = block.block_number - self._info.block_offset
+        position = self._get_block_position(block)
+        if index < 0 or index >= len(self._block_checksums) or position is None:
+            self._damaged_blocks.add(block.block_number)
+            return False
+
+        self._block_checksums[index] = Crc16.crc16_xmodem(block.data)
+        if block.block_number == self._running_block:
+            self._running_checksum = Crc16.crc16_xmodem(block.data, self._running_checksum)
+            self._running_block += 1
+        self._damaged_blocks.discard(block.block_number)
+
+        loop = asyncio.get_running_loop()
+        self._last_write = loop.run_in_executor(self._executor, self._write, position, block.data)
+        return True
+
+
+    async def finish(self) -> int:
+        """Waits until all blocks are written, truncates file to filesize and returns CRC16 (XModem) of file"""
+        loop = asyncio.get_running_loop()
+        if self._last_write is not None:
+            await self._last_write
+        if self._write_error is not None:
+            raise self._write_error
+        await loop.run_in_executor(self._executor, self._f.truncate, self._info.filesize)
+
+        if self._info.block_offset == 0 and self._running_block == self._info.number_of_blocks:
+            return self._running_checksum
+
+        # blocks arrived out of order or download was continued, combine checksum of blocks
+        checksum = await loop.run_in_executor(self._executor, self._read_checksum, self._get_offset_position())
+        for index, block_checksum in enumerate(self._block_checksums):
+            checksum = Crc16.crc16_xmodem_combine(checksum, block_checksum, self._get_block_length(self._info.block_offset + index))
+        return checksum
+
+
+    def close(self):
+        """Waits for background thread to finish"""
+        self._executor.shutdown()
+
+
+    def _get_block_position(self, block: PacketDyscomSendFile) -> int | None:
+        """Returns position of block in file or None if block size is inconsistent"""
+        length = len(block.data)
+        if length != block.block_size or length == 0:
+            return None
+
+        if block.block_number == self._info.number_of_blocks - 1:
+            if self._block_size != 0 and length != self._info.filesize - self._block_size * block.block_number:
+                return None
+            self._last_block_size = length
+            return self._info.filesize - length
+
+        if self._block_size == 0:
+            # first block tells block size, number of blocks and last block must match filesize
+            last_block_size = self._info.filesize - length * (self._info.number_of_blocks - 1)
+            if last_block_size <= 0 or last_block_size > length or self._last_block_size not in [0, last_block_size]:
+                return None
+            self._block_size = length
+        elif length != self._block_size:
+            return None
+        return block.block_number * length
+
+
+    def _get_block_length(self, block_number: int) -> int:
+        """Returns number of bytes of block"""
+        if block_number == self._info.number_of_blocks - 1:
+            return self._last_block_size
+        return self._block_size
+
+
+    def _get_offset_position(self) -> int:
+        """Returns position of block at block offset"""
+        if self._info.block_offset >= self._info.number_of_blocks:
+            return self._info.filesize
+        if self._info.block_offset == self._info.number_of_blocks - 1:
+            return self._info.filesize - self._last_block_size
+        return self._info.block_offset * self._block_size
+
+
+    def _read_checksum(self, length: int) -> int:
+        """Returns CRC16 (XModem) of first length bytes of file (blocks before block offset)"""
+        self._f.seek(0)
+        checksum = 0
+        while length > 0:
+            data = self._f.read(min(length, 1 << 20))
+            if len(data) == 0:
+                raise ValueError(f"File is shorter than block offset {self._info.block_offset}")
+            checksum = Crc16.crc16_xmodem(data, checksum)
+            length -= len(data)
+        return checksum
+
+
+    def _write(self, position: int, data: bytes):
+        """Writes data at position, runs in background thread"""
+        try:
+            self._f.seek(position)
+            self._f.write(data)
+        except OSError as e:
+            self._write_error = e
@@ -0,0 +1,117 @@
+"""Provides a detector for lost and duplicated dyscom live data packets"""
+
+import numpy as np
+
+from .dyscom_live_data_batch import DyscomLiveDataBatch
+
+
+class DyscomGapDetector:
+    """Detects lost and duplicated live data packets by comparing time offset of each packet with time offset
+    of newest accepted packet and with sample interval (time offset increment per sample) expected from output data rate.
+
+    A step of about n sample intervals means n - 1 samples were lost before the packet (e.g. because
+    host did not read fast enough and serial buffer overflowed), a step of less than half a sample
+    interval (including equal or older time offsets) is a duplicate. Duplicates are never used as
+    reference for following packets. Time offset is 32 bit and wraps around."""
+
+    _TIME_OFFSET_WRAP = 1 << 32
+
+
+    def __init__(self, sample_rate: float, time_offset_per_second: float = 1000000.0):
+        """sample_rate e.g. DyscomSampleStore.get_sample_rate(init_result.frequency_out),
+        time_offset_per_second is resolution of time offset, default is microseconds"""
+        if sample_rate <= 0:
+            raise ValueError(f"Invalid sample rate {sample_rate}")
+
+        self._sample_interval = time_offset_per_second / sample_rate
+        self._last_time_offset: int | None = None
+        self._packet_count = 0
+        self._lost_sample_count = 0
+        self._gap_count = 0
+        self._largest_gap = 0
+        self._duplicate_count = 0
+
+
+    @property
+    def sample_interval(self) -> float:
+        """Getter for expected time offset increment per sample"""
+        return self._sample_interval
+
+
+    @property
+    def packet_count(self) -> int:
+        """Getter for number of received packets"""
+        return self._packet_count
+
+
+    @property
+    def lost_sample_count(self) -> int:
+        """Getter for number of lost samples"""
+        return self._lost_sample_count
+
+
+    @property
+    def gap_count(self) -> int:
+        """Getter for number of gaps (one or more consecutive lost samples)"""
+        return self._gap_count
+
+
+    @property
+    def largest_gap(self) -> int:
+        """Getter for number of lost samples of largest gap"""
+        return self._largest_gap
+
+
+    @property
+    def duplicate_count(self) -> int:
+        """Getter for number of duplicated packets"""
+        return self._duplicate_count
+
+
+    def append(self, batch: DyscomLiveDataBatch) -> np.ndarray:
+        """Checks all packets of batch (e.g. from LayerDyscom.stream_live_data()), see process()"""
+        return self.process(batch.time_offset)
+
+
+    def process(self, time_offsets: np.ndarray) -> np.ndarray:
+        """Updates counters with time offsets of consecutive packets and returns number of lost samples
+        before each packet, -1 for duplicated packets"""
+        if len(time_offsets) == 0:
+            return np.zeros(0, np.int64)
+
+        time_offsets = np.asarray(time_offsets, np.int64)
+        has_baseline = self._last_time_offset is not None
+        baseline = self._last_time_offset if has_baseline else int(time_offsets[0])
+        # unwrap time offsets relative to baseline, steps of more than half of 32 bit range are decreasing time offsets
+        steps = np.diff(time_offsets, prepend=baseline) % DyscomGapDetector._TIME_OFFSET_WRAP
+        steps[steps >= DyscomGapDetector._TIME_OFFSET_WRAP >> 1] -= DyscomGapDetector._TIME_OFFSET_WRAP
+        sample_indices = np.rint(np.cumsum(steps) / self._sample_interval).astype(np.int64)
+
+        # compare each packet with newest accepted packet (running maximum), baseline has sample index 0
+        # and nothing is known about samples before first packet
+        newest_accepted = np.maximum.accumulate(np.concatenate(([0 if has_baseline else -1], sample_indices[:-1])))
+        duplicates = sample_indices <= newest_accepted
+        result = np.where(duplicates, -1, sample_indices - newest_accepted - 1)
+
+        accepted = np.flatnonzero(~duplicates)
+        if len(accepted) > 0:
+            self._last_time_offset = int(time_offsets[accepted[-1]])
+
+        gaps = result[result > 0]
+        self._packet_count += len(result)
+        self._duplicate_count += int(np.count_nonzero(duplicates))
+        if len(gaps) > 0:
+            self._gap_count += len(gaps)
+            self._lost_sample_count += int(gaps.sum())
+            self._largest_gap = max(self._largest_gap, int(gaps.max()))
+        return result
+
+
+    def reset(self):
+        """Resets counters and forgets last time offset"""
+        self._last_time_offset = None
+        self._packet_count = 0
+        self._lost_sample_count = 0
+        self._gap_count = 0
+        self._largest_gap = 0
+        self._duplicate_count = 0
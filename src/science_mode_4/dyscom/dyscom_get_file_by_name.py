@@ -2,6 +2,7 @@
 
 from typing import NamedTuple
 
+from science_mode_4.utils.byte_builder import ByteBuilder
 from .dyscom_types import DyscomFileByNameMode, DyscomGetType
 from .dyscom_helper import DyscomHelper
 from .dyscom_get import PacketDyscomGet, PacketDyscomGetAck
@@ -17,13 +18,29 @@ class DyscomGetFileByNameResult(NamedTuple):
 
 
 class PacketDyscomGetFileByName(PacketDyscomGet):
-    """Packet for dyscom get with type file by name"""
+    """Packet for dyscom get with type file by name, device starts sending file blocks
+    (see PacketDyscomSendFile) beginning with block offset"""
 
 
-    def __init__(self):
+    def __init__(self, filename: str = "", block_offset: int = 0, mode: DyscomFileByNameMode = DyscomFileByNameMode.MULTIBLOCK):
         super().__init__()
         self._type = DyscomGetType.FILE_BY_NAME
         self._kind = int(self._type)
+        self._filename = filename
+        self._block_offset = block_offset
+        self._mode = mode
+
+
+    def get_data(self) -> bytes:
+        # same layout as acknowledge, file size and number of blocks are unknown
+        bb = ByteBuilder()
+        bb.append_byte(self._type)
+        bb.append_bytes(DyscomHelper.str_to_bytes(self._filename, 128))
+        bb.append_value(self._block_offset, 4, False)
+        bb.append_value(0, 8, False)
+        bb.append_value(0, 4, False)
+        bb.append_byte(self._mode)
+        return bb.get_bytes()
 
 
 class PacketDyscomGetAckFileByName(PacketDyscomGetAck):
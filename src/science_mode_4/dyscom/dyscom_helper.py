@@ -43,10 +43,8 @@ class DyscomHelper:
     @staticmethod
     def str_to_bytes(value: str, byte_count: int) -> bytes:
         """Converts value to bytes with byte_count bytes, last byte will always be 0"""
-        temp = bytearray(value.zfill(byte_count), "ascii")
-        for x in range(len(value), byte_count):
-            temp[x] = 0
-        temp[byte_count-1] = 0
+        temp = bytearray(value[:byte_count - 1], "ascii")
+        temp.extend(bytes(byte_count - len(temp)))
         return bytes(temp)
 
 
@@ -1,7 +1,14 @@
 """Provides low level layer"""
 
+import asyncio
+import os
+from typing import AsyncIterator
+
 from science_mode_4.layer import Layer
-from .dyscom_types import DyscomGetOperationModeType, DyscomPowerModuleType, DyscomPowerModulePowerType, DyscomSysType
+from science_mode_4.protocol.commands import Commands
+from science_mode_4.protocol.types import ResultAndError
+from .dyscom_types import DyscomFileByNameMode, DyscomGetOperationModeType, DyscomGetType, DyscomPowerModuleType,\
+    DyscomPowerModulePowerType, DyscomSysType
 from .dyscom_init import DyscomInitResult, PacketDyscomInit, PacketDyscomInitAck, DyscomInitParams
 from .dyscom_get_file_system_status import PacketDyscomGetFileSystemStatus, PacketDyscomGetAckFileSystemStatus,\
     DyscomGetFileSystemStatusResult
@@ -16,7 +23,9 @@ from .dyscom_get_device_id import PacketDyscomGetAckDeviceId, PacketDyscomGetDev
 from .dyscom_get_file_info import DyscomGetFileInfoResult, PacketDyscomGetAckFileInfo, PacketDyscomGetFileInfo
 from .dyscom_get_battery_status import DyscomGetBatteryResult, PacketDyscomGetAckBatteryStatus, PacketDyscomGetBatteryStatus
 from .dyscom_sys import DyscomSysResult, PacketDyscomSys, PacketDyscomSysAck
-from .dyscom_send_file import PacketDyscomSendFileAck
+from .dyscom_send_file import DyscomDownloadFileResult, PacketDyscomSendFile, PacketDyscomSendFileAck
+from .dyscom_live_data_batch import DyscomLiveDataBatch, DyscomLiveDataDecoder
+from .dyscom_file_block_writer import DyscomFileBlockWriter
 
 
 class LayerDyscom(Layer):
@@ -24,6 +33,10 @@ class LayerDyscom(Layer):
     Class for dyscom layer
     """
 
+    # operation modes in which device sends live data
+    _LIVE_DATA_OPERATION_MODES = [DyscomGetOperationModeType.LIVE_MEASURING_PRE, DyscomGetOperationModeType.LIVE_MEASURING,
+                                  DyscomGetOperationModeType.RECORD_PRE, DyscomGetOperationModeType.RECORD]
+
 
     async def init(self, params = DyscomInitParams()) -> DyscomInitResult:
         """Send dyscom init command and waits for response"""
@@ -49,10 +62,12 @@ class LayerDyscom(Layer):
         return ack.number_of_measurements
 
 
-    async def get_file_by_name(self) -> DyscomGetFileByNameResult:
+    async def get_file_by_name(self, filename: str = "", block_offset: int = 0,
+                               mode: DyscomFileByNameMode = DyscomFileByNameMode.MULTIBLOCK) -> DyscomGetFileByNameResult:
         """Sends get dyscom get type file by name and waits for response, returns filename, block offset,
-        filesize, number of blocks and mode"""
-        p = PacketDyscomGetFileByName()
+        filesize, number of blocks and mode. Afterwards device sends file blocks beginning with block offset
+        (in single block mode only block at block offset, see download_file())"""
+        p = PacketDyscomGetFileByName(filename, block_offset, mode)
         ack: PacketDyscomGetAckFileByName = await self._send_packet_and_wait(p)
         self._check_result_error(ack.result_error, "DyscomGetFileByName")
         return DyscomGetFileByNameResult(ack.filename, ack.block_offset, ack.filesize, ack.number_of_blocks, ack.mode)
@@ -138,3 +153,174 @@ class LayerDyscom(Layer):
         p = PacketDyscomStop()
         ack: PacketDyscomStopAck = await self._send_packet_and_wait(p)
         self._check_result_error(ack.result_error, "DyscomStop")
+
+
+    async def stream_live_data(self, batch_size: int = 256, max_latency_in_seconds: float = 0.1,
+                               operation_mode_interval_in_seconds: float = 1.0) -> AsyncIterator[DyscomLiveDataBatch]:
+        """Async generator that yields arriving live data as batches (values per signal type are available
+        with DyscomLiveDataBatch.values_by_signal_type), call start() before iterating.
+
+        A batch is yielded as soon as it contains batch_size packets or its first packet arrived
+        max_latency_in_seconds ago. Operation mode is polled every operation_mode_interval_in_seconds,
+        generator yields remaining packets and ends when device is no longer measuring.
+        Other packets not waited for (see PacketBuffer) are discarded while iterating."""
+        loop = asyncio.get_running_loop()
+        payloads: list[bytes] = []
+        batch_start_time = 0.0
+        next_poll_time = loop.time()
+        is_measuring = True
+        while is_measuring:
+            if loop.time() >= next_poll_time:
+                self.send_get_operation_mode()
+                next_poll_time = loop.time() + operation_mode_interval_in_seconds
+
+            self._packet_buffer.update_buffer()
+            while True:
+                raw_packet = self._packet_buffer.get_raw_packet_from_buffer(False)
+                if raw_packet is None:
+                    break
+                if raw_packet[0] != Commands.DlSendLiveData:
+                    is_measuring = is_measuring and self._is_measuring(raw_packet)
+                    continue
+
+                # all packets of a batch must have the same number of channels
+                if payloads and payloads[0][0] != raw_packet[2][0]:
+                    yield DyscomLiveDataDecoder.decode(payloads)
+                    payloads = []
+                if not payloads:
+                    batch_start_time = loop.time()
+                payloads.append(raw_packet[2])
+                if len(payloads) == batch_size:
+                    yield DyscomLiveDataDecoder.decode(payloads)
+                    payloads = []
+
+            if payloads and (not is_measuring or loop.time() - batch_start_time >= max_latency_in_seconds):
+                yield DyscomLiveDataDecoder.decode(payloads)
+                payloads = []
+
+            if is_measuring:
+                timeout = next_poll_time - loop.time()
+                if payloads:
+                    timeout = min(timeout, batch_start_time + max_latency_in_seconds - loop.time())
+                await self._packet_buffer.connection.wait_for_data(max(0.0, timeout))
+
+
+    async def download_file(self, filename: str, destination: str, block_offset: int = 0, block_timeout_in_seconds: float = 1.0,
+                            max_resume_count: int = 3) -> DyscomDownloadFileResult:
+        """Downloads file from device memory card to destination and returns statistics (e.g. MB/s).
+
+        Blocks are acknowledged as soon as they arrive without waiting (all acknowledges of
+        available blocks are send with one write) and written to destination by a background thread
+        (see DyscomFileBlockWriter). If a block is missing (a later block arrived or no block arrived within
+        block_timeout_in_seconds), download is requested again beginning with first missing block,
+        download fails after max_resume_count resumes without progress. Blocks with
+        inconsistent size are requested again one by one in single block mode.
+
+        Checksum calculated while blocks arrived is compared with checksum from get_file_info(),
+        a ValueError is raised if they differ. With block_offset > 0 an existing
+        destination is kept, e.g. to continue a download that failed before (see ValueError message
+        for first missing block). Other packets not waited for (see PacketBuffer) are discarded while downloading."""
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        with open(destination, "r+b" if block_offset > 0 and os.path.exists(destination) else "wb") as f:
+            info = await self.get_file_by_name(filename, block_offset)
+            writer = DyscomFileBlockWriter(f, info)
+            try:
+                resume_count = await self._receive_file_blocks(writer, info.block_offset, DyscomFileByNameMode.MULTIBLOCK,
+                                                               block_timeout_in_seconds, max_resume_count)
+                for block_number in writer.damaged_blocks:
+                    await self.get_file_by_name(info.filename, block_number, DyscomFileByNameMode.SINGLEBLOCK)
+                    resume_count += await self._receive_file_blocks(writer, block_number, DyscomFileByNameMode.SINGLEBLOCK,
+                                                                    block_timeout_in_seconds, max_resume_count)
+                checksum = await writer.finish()
+            finally:
+                writer.close()
+
+        file_info = await self.get_file_info()
+        if file_info.checksum != checksum:
+            raise ValueError(f"Checksum of {info.filename} is {checksum:#06x}, expected {file_info.checksum:#06x}")
+
+        return DyscomDownloadFileResult(info.filename, info.filesize, info.number_of_blocks, writer.byte_count,
+                                        loop.time() - start_time, resume_count, checksum)
+
+
+    async def _receive_file_blocks(self, writer: DyscomFileBlockWriter, next_block: int, mode: DyscomFileByNameMode,
+                                   block_timeout_in_seconds: float, max_resume_count: int) -> int:
+        """Receives requested blocks of file until last block (or in single block mode requested block)
+        is written, returns number of resumes. If a block after a missing block arrives, file is requested
+        again immediately beginning with missing block, otherwise after block_timeout_in_seconds without
+        a new block. Download fails after max_resume_count resumes without a new block."""
+        loop = asyncio.get_running_loop()
+        info = writer.info
+        end_block = next_block + 1 if mode == DyscomFileByNameMode.SINGLEBLOCK else info.number_of_blocks
+        resume_count = 0
+        # resumes since last new block
+        stall_resume_count = 0
+        # block the file was last requested from because of a gap, to request it only once
+        gap_resume_block = -1
+        deadline = loop.time() + block_timeout_in_seconds
+        while next_block < end_block:
+            previous_block = next_block
+            next_block, has_gap = self._process_file_blocks(writer, next_block, mode)
+            if next_block > previous_block:
+                stall_resume_count = 0
+                deadline = loop.time() + block_timeout_in_seconds
+            if next_block >= end_block:
+                break
+
+            if has_gap and gap_resume_block != next_block:
+                # a block got lost, so do not wait for timeout
+                gap_resume_block = next_block
+            elif next_block > previous_block:
+                continue
+            elif loop.time() < deadline:
+                await self._packet_buffer.connection.wait_for_data(deadline - loop.time())
+                continue
+            elif stall_resume_count < max_resume_count:
+                stall_resume_count += 1
+            else:
+                raise ValueError(f"Download of {info.filename} interrupted, first missing block {next_block}")
+
+            # request file again beginning with first missing block
+            resume_count += 1
+            await self.get_file_by_name(info.filename, next_block, mode)
+            deadline = loop.time() + block_timeout_in_seconds
+        return resume_count
+
+
+    def _process_file_blocks(self, writer: DyscomFileBlockWriter, next_block: int, mode: DyscomFileByNameMode) -> tuple[int, bool]:
+        """Acknowledges and writes all available blocks in order beginning with next_block,
+        returns next missing block and if a block after next missing block arrived"""
+        self._packet_buffer.update_buffer()
+        has_gap = False
+        # all acknowledges are written with one write
+        with self._packet_buffer.transmit_buffer.batch():
+            while True:
+                raw_packet = self._packet_buffer.get_raw_packet_from_buffer(False)
+                if raw_packet is None:
+                    break
+                if raw_packet[0] != Commands.DlSendFile:
+                    continue
+
+                block: PacketDyscomSendFile = self._packet_factory.create_packet_with_data(*raw_packet)
+                # ignore blocks after a missing block, they are requested again
+                if block.block_number != next_block:
+                    has_gap = has_gap or block.block_number > next_block
+                    continue
+                has_gap = False
+                self.send_send_file_ack(block.block_number)
+                # damaged blocks are skipped in multi block mode and requested again later
+                if writer.write_block(block) or mode == DyscomFileByNameMode.MULTIBLOCK:
+                    next_block += 1
+        return next_block, has_gap
+
+
+    def _is_measuring(self, raw_packet: tuple[int, int, bytes]) -> bool:
+        """Returns false if raw packet is a get operation mode acknowledge indicating that device
+        is no longer measuring, true otherwise"""
+        command, _, data = raw_packet
+        if command != Commands.DlGetAck or data[1] != DyscomGetType.OPERATION_MODE:
+            return True
+
+        ack: PacketDyscomGetAckOperationMode = self._packet_factory.create_packet_with_data(*raw_packet)
+        return ack.result_error == ResultAndError.NO_ERROR and ack.operation_mode in LayerDyscom._LIVE_DATA_OPERATION_MODES
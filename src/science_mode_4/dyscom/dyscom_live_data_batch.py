@@ -0,0 +1,103 @@
+"""Provides classes for batch decoding of dyscom send live data packets"""
+
+from typing import NamedTuple, Sequence
+import numpy as np
+
+from .dyscom_send_live_data import PacketDyscomSendLiveData
+from .dyscom_types import DyscomSignalType
+
+
+class DyscomLiveDataBatch(NamedTuple):
+    """Live data of multiple packets as column arrays, one row per packet and one column per channel"""
+    # shape (packets), uint32
+    time_offset: np.ndarray
+    # shape (packets, channels), float32
+    value: np.ndarray
+    # shape (packets, channels), uint8, values of DyscomSignalType
+    signal_type: np.ndarray
+    # shape (packets, channels), uint8, raw status byte
+    status: np.ndarray
+    # structured array with packet layout, one record per packet
+    records: np.ndarray
+
+
+    @property
+    def number_of_packets(self) -> int:
+        """Getter for number of packets"""
+        return self.value.shape[0]
+
+
+    @property
+    def number_of_channels(self) -> int:
+        """Getter for number of channels"""
+        return self.value.shape[1]
+
+
+    @property
+    def values_by_signal_type(self) -> dict[DyscomSignalType, np.ndarray]:
+        """Getter for values as one array (view with shape (packets)) per signal type,
+        signal types of channels are taken from first packet"""
+        if self.number_of_packets == 0:
+            return {}
+        return {DyscomSignalType(x): self.value[:, index] for index, x in enumerate(self.signal_type[0])}
+
+
+    def get_packet(self, index: int) -> PacketDyscomSendLiveData:
+        """Returns packet at index as PacketDyscomSendLiveData object (packet number is not available)"""
+        return PacketDyscomSendLiveData(self.records[index].tobytes())
+
+
+class DyscomLiveDataDecoder:
+    """Decodes payloads of many send live data packets at once into NumPy arrays,
+    without creating Python objects per sample"""
+
+    _dtypes: dict[int, np.dtype] = {}
+
+
+    @staticmethod
+    def get_dtype(number_of_channels: int) -> np.dtype:
+        """Returns structured dtype for payload of a send live data packet with number_of_channels"""
+        result = DyscomLiveDataDecoder._dtypes.get(number_of_channels)
+        if result is None:
+            sample = np.dtype([("value", ">f4"), ("signal_type", "u1"), ("status", "u1")])
+            result = np.dtype([("number_of_channels", "u1"), ("time_offset", ">u4"),
+                               ("samples", sample, (number_of_channels,))])
+            DyscomLiveDataDecoder._dtypes[number_of_channels] = result
+        return result
+
+
+    @staticmethod
+    def decode_records(payloads: Sequence[bytes]) -> np.ndarray:
+        """Decodes payloads into a structured array with one record per packet, all payloads
+        must have the same number of channels"""
+        if len(payloads) == 0:
+            return np.empty(0, DyscomLiveDataDecoder.get_dtype(0))
+
+        number_of_channels = payloads[0][0]
+        dtype = DyscomLiveDataDecoder.get_dtype(number_of_channels)
+        if any(len(x) != dtype.itemsize for x in payloads):
+            raise ValueError(f"Send live data payloads must all have {number_of_channels} channels ({dtype.itemsize} bytes)")
+
+        records = np.frombuffer(b"".join(payloads), dtype)
+        if np.any(records["number_of_channels"] != number_of_channels):
+            raise ValueError(f"Send live data payloads must all have {number_of_channels} channels")
+        return records
+
+
+    @staticmethod
+    def decode(payloads: Sequence[bytes]) -> DyscomLiveDataBatch:
+        """Decodes payloads into column arrays with native byte order, all payloads must have the same number of channels"""
+        return DyscomLiveDataDecoder.create_batch(DyscomLiveDataDecoder.decode_records(payloads))
+
+
+    @staticmethod
+    def create_batch(records: np.ndarray) -> DyscomLiveDataBatch:
+        """Converts structured array with payload layout (see get_dtype()) into column arrays with native byte order"""
+        samples = records["samples"]
+        # make sure shape is (packets, channels) even for no packets
+        shape = (len(records), records.dtype["samples"].shape[0])
+        return DyscomLiveDataBatch(records["time_offset"].astype(np.uint32),
+                                   samples["value"].astype(np.float32).reshape(shape),
+                                   samples["signal_type"].astype(np.uint8).reshape(shape),
+                                   samples["status"].astype(np.uint8).reshape(shape),
+                                   records)
@@ -0,0 +1,335 @@
+"""Provides a recorder that writes dyscom live data columns to a binary file and a memory mapped reader"""
+
+import queue
+import struct
+import threading
+from typing import NamedTuple
+import numpy as np
+
+from .dyscom_types import DyscomInitParams, DyscomSignalType
+from .dyscom_live_data_batch import DyscomLiveDataBatch
+
+
+class DyscomLiveDataRecordingChunk(NamedTuple):
+    """Columns of a chunk of a recording, all arrays are views of the memory mapped file"""
+    # shape (packets), uint32
+    time_offset: np.ndarray
+    # one float32 array with shape (packets) per signal type
+    values: dict[DyscomSignalType, np.ndarray]
+    # one uint8 array with shape (packets) per signal type, raw status byte
+    status: dict[DyscomSignalType, np.ndarray]
+
+
+class DyscomLiveDataRecorder():
+    """Writes live data batches in a background thread to a binary file.
+
+    File starts with a header (see DyscomLiveDataRecording) containing signal types, sample rate
+    and data of DyscomInitParams, followed by chunks of chunk_size packets. Each chunk has a small
+    header with its packet count followed by columns: time offset (uint32), values (float32) of each
+    channel and status (uint8) of each channel. Only last chunk may contain less than chunk_size packets.
+
+    At most queue_capacity batches wait for background thread, if queue is full (disk is too slow)
+    batches are dropped and counted. If writing fails (e.g. disk full), append() and stop() raise the error."""
+
+    DEFAULT_CHUNK_SIZE = 4096
+    DEFAULT_QUEUE_CAPACITY = 1024
+
+
+    def __init__(self, filename: str, init_params: DyscomInitParams, sample_rate: float = 0.0,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, queue_capacity: int = DEFAULT_QUEUE_CAPACITY):
+        """sample_rate is only stored in header, e.g. DyscomSampleStore.get_sample_rate(init_result.frequency_out)"""
+        if chunk_size <= 0:
+            raise ValueError(f"Chunk size must be greater than 0 {chunk_size}")
+        if queue_capacity <= 0:
+            raise ValueError(f"Queue capacity must be greater than 0 {queue_capacity}")
+
+        self._filename = filename
+        self._signal_types = list(init_params.signal_type)
+        # round up, so columns of all chunks are aligned to 4 bytes
+        self._chunk_size = DyscomLiveDataRecording.align(chunk_size)
+        self._header = DyscomLiveDataRecording.create_header(self._signal_types, sample_rate, self._chunk_size, init_params.get_data())
+        self._queue: queue.Queue[DyscomLiveDataBatch | None] = queue.Queue(queue_capacity)
+        self._thread: threading.Thread | None = None
+        self._packet_count = 0
+        self._chunk_count = 0
+        self._dropped_packet_count = 0
+        self._error: Exception | None = None
+
+
+    @property
+    def filename(self) -> str:
+        """Getter for filename"""
+        return self._filename
+
+
+    @property
+    def packet_count(self) -> int:
+        """Getter for number of packets written to file"""
+        return self._packet_count
+
+
+    @property
+    def chunk_count(self) -> int:
+        """Getter for number of chunks written to file"""
+        return self._chunk_count
+
+
+    @property
+    def dropped_packet_count(self) -> int:
+        """Getter for number of packets not written because queue was full"""
+        return self._dropped_packet_count
+
+
+    @property
+    def queue_depth(self) -> int:
+        """Getter for number of batches not written yet"""
+        return self._queue.qsize()
+
+
+    @property
+    def error(self) -> Exception | None:
+        """Getter for exception that stopped background thread"""
+        return self._error
+
+
+    def start(self):
+        """Creates file and starts background thread"""
+        if self._thread is not None:
+            return
+
+        self._packet_count = 0
+        self._chunk_count = 0
+        self._dropped_packet_count = 0
+        self._error = None
+        # discard batches left by a failed recording
+        self._queue = queue.Queue(self._queue.maxsize)
+        self._thread = threading.Thread(target=self._run, name="DyscomLiveDataRecorder", daemon=True)
+        self._thread.start()
+
+
+    def stop(self):
+        """Writes all pending batches and remaining packets as last chunk, waits for background thread,
+        raises error of background thread if writing failed"""
+        if self._thread is None:
+            return
+
+        # background thread does not take anything from queue anymore after an error
+        while self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+        self._thread.join()
+        self._thread = None
+        self._raise_error()
+
+
+    def append(self, batch: DyscomLiveDataBatch):
+        """Queues batch for writing, returns immediately, batch is dropped if queue is full.
+        Raises error of background thread if writing failed"""
+        self._raise_error()
+        if batch.number_of_packets == 0:
+            return
+        if batch.number_of_channels != len(self._signal_types):
+            raise ValueError(f"Batch must have {len(self._signal_types)} channels {batch.number_of_channels}")
+        try:
+            self._queue.put_nowait(batch)
+        except queue.Full:
+            self._dropped_packet_count += batch.number_of_packets
+
+
+    def _raise_error(self):
+        """Raises error of background thread if there is one"""
+        if self._error is not None:
+            raise self._error
+
+
+    def _run(self):
+        """Thread function"""
+        try:
+            with open(self._filename, "wb") as f:
+                f.write(self._header)
+                # columns (time offset, value, status) of packets not written yet
+                pending: list[tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+                pending_count = 0
+                while True:
+                    # blocks until data is available
+                    batch = self._queue.get()
+                    if batch is not None:
+                        pending.append((batch.time_offset, batch.value, batch.status))
+                        pending_count += batch.number_of_packets
+                        if pending_count < self._chunk_size:
+                            continue
+
+                    time_offset, value, status = (np.concatenate(x) for x in zip(*pending)) if pending else ([], [], [])
+                    # write all full chunks, when stopping also remaining packets
+                    write_count = pending_count if batch is None else pending_count - pending_count % self._chunk_size
+                    for start in range(0, write_count, self._chunk_size):
+                        end = min(start + self._chunk_size, write_count)
+                        self._write_chunk(f, time_offset[start:end], value[start:end], status[start:end])
+                    pending = [(time_offset[write_count:], value[write_count:], status[write_count:])]
+                    pending_count -= write_count
+
+                    if batch is None:
+                        break
+        except Exception as e: # pylint:disable=broad-exception-caught
+            self._error = e
+
+
+    def _write_chunk(self, f, time_offset: np.ndarray, value: np.ndarray, status: np.ndarray):
+        """Writes a chunk with columns to file"""
+        f.write(DyscomLiveDataRecording.CHUNK_HEADER.pack(DyscomLiveDataRecording.CHUNK_MAGIC, len(time_offset)))
+        f.write(time_offset.astype("<u4").tobytes())
+        # transpose, so each channel is a contiguous column
+        f.write(np.ascontiguousarray(value.T, "<f4").tobytes())
+        f.write(np.ascontiguousarray(status.T, np.uint8).tobytes())
+        self._packet_count += len(time_offset)
+        self._chunk_count += 1
+
+
+class DyscomLiveDataRecording():
+    """Reads a file written by DyscomLiveDataRecorder. File is memory mapped, so opening takes
+    constant time regardless of file size and columns are only read from disk when accessed.
+
+    An incomplete last chunk (e.g. recorder was not stopped) is ignored."""
+
+    FILE_MAGIC = b"SM4LIVE\x01"
+    # magic, number of channels, chunk size, sample rate, size of init params data
+    HEADER = struct.Struct("<8sHIfH")
+    CHUNK_MAGIC = b"CHNK"
+    # magic, number of packets
+    CHUNK_HEADER = struct.Struct("<4sI")
+
+
+    def __init__(self, filename: str):
+        self._filename = filename
+        self._data = np.memmap(filename, np.uint8, "r")
+        if len(self._data) < DyscomLiveDataRecording.HEADER.size or\
+            bytes(self._data[:len(DyscomLiveDataRecording.FILE_MAGIC)]) != DyscomLiveDataRecording.FILE_MAGIC:
+            raise ValueError(f"File is not a live data recording {filename}")
+
+        _, number_of_channels, chunk_size, self._sample_rate, init_params_size =\
+            DyscomLiveDataRecording.HEADER.unpack_from(self._data)
+        position = DyscomLiveDataRecording.HEADER.size
+        self._signal_types = [DyscomSignalType(x) for x in self._data[position:position + number_of_channels]]
+        position += number_of_channels
+        self._init_params_data = bytes(self._data[position:position + init_params_size])
+        self._chunk_start = DyscomLiveDataRecording.align(position + init_params_size)
+
+        self._chunk_size = chunk_size
+        self._full_chunk_bytes = self._get_chunk_bytes(self._chunk_size)
+        full_chunk_count, rest = divmod(len(self._data) - self._chunk_start, self._full_chunk_bytes)
+        # only last chunk needs to be checked, all other chunks are full
+        self._last_chunk_size = 0
+        if rest >= DyscomLiveDataRecording.CHUNK_HEADER.size:
+            last_chunk_size = self._read_chunk_header(full_chunk_count)
+            if last_chunk_size < self._chunk_size and rest >= self._get_chunk_bytes(last_chunk_size):
+                self._last_chunk_size = last_chunk_size
+        self._chunk_count = full_chunk_count + (1 if self._last_chunk_size > 0 else 0)
+
+
+    @staticmethod
+    def create_header(signal_types: list[DyscomSignalType], sample_rate: float, chunk_size: int, init_params_data: bytes) -> bytes:
+        """Creates file header, header is padded to a multiple of 4 bytes"""
+        result = DyscomLiveDataRecording.HEADER.pack(DyscomLiveDataRecording.FILE_MAGIC, len(signal_types), chunk_size,
+                                                     sample_rate, len(init_params_data))
+        result += bytes(signal_types) + init_params_data
+        return result + bytes(DyscomLiveDataRecording.align(len(result)) - len(result))
+
+
+    @property
+    def filename(self) -> str:
+        """Getter for filename"""
+        return self._filename
+
+
+    @property
+    def signal_types(self) -> list[DyscomSignalType]:
+        """Getter for signal types of channels"""
+        return self._signal_types
+
+
+    @property
+    def sample_rate(self) -> float:
+        """Getter for sample rate, 0 if unknown"""
+        return self._sample_rate
+
+
+    @property
+    def init_params_data(self) -> bytes:
+        """Getter for data of DyscomInitParams used for measurement (see DyscomInitParams.get_data())"""
+        return self._init_params_data
+
+
+    @property
+    def chunk_count(self) -> int:
+        """Getter for number of chunks"""
+        return self._chunk_count
+
+
+    @property
+    def packet_count(self) -> int:
+        """Getter for number of packets"""
+        full_chunk_count = self._chunk_count - (1 if self._last_chunk_size > 0 else 0)
+        return full_chunk_count * self._chunk_size + self._last_chunk_size
+
+
+    def get_chunk(self, index: int) -> DyscomLiveDataRecordingChunk:
+        """Returns columns of chunk at index without copying"""
+        if index < 0 or index >= self._chunk_count:
+            raise IndexError(f"Chunk index out of range {index}")
+
+        count = self._chunk_size if index < self._chunk_count - 1 or self._last_chunk_size == 0 else self._last_chunk_size
+        position = self._chunk_start + index * self._full_chunk_bytes + DyscomLiveDataRecording.CHUNK_HEADER.size
+        time_offset = self._data[position:position + 4 * count].view("<u4")
+        position += 4 * count
+        values = {}
+        for signal_type in self._signal_types:
+            values[signal_type] = self._data[position:position + 4 * count].view("<f4")
+            position += 4 * count
+        status = {}
+        for signal_type in self._signal_types:
+            status[signal_type] = self._data[position:position + count]
+            position += count
+        return DyscomLiveDataRecordingChunk(time_offset, values, status)
+
+
+    def get_time_offsets(self) -> np.ndarray:
+        """Returns time offsets of all packets (copies all chunks into one array)"""
+        return np.concatenate([self.get_chunk(x).time_offset for x in range(self._chunk_count)] + [np.empty(0, "<u4")])
+
+
+    def get_values(self, signal_type: DyscomSignalType) -> np.ndarray:
+        """Returns values of all packets for signal_type (copies all chunks into one array)"""
+        return np.concatenate([self.get_chunk(x).values[signal_type] for x in range(self._chunk_count)] + [np.empty(0, "<f4")])
+
+
+    def close(self):
+        """Releases memory mapped file, file is unmapped as soon as no view returned by get_chunk() exists anymore"""
+        self._data = np.empty(0, np.uint8)
+        self._chunk_count = 0
+        self._last_chunk_size = 0
+
+
+    def _get_chunk_bytes(self, count: int) -> int:
+        """Returns size of a chunk with count packets"""
+        return DyscomLiveDataRecording.get_chunk_bytes(len(self._signal_types), count)
+
+
+    def _read_chunk_header(self, index: int) -> int:
+        """Returns number of packets from chunk header or 0 if header is invalid"""
+        magic, count = DyscomLiveDataRecording.CHUNK_HEADER.unpack_from(self._data, self._chunk_start + index * self._full_chunk_bytes)
+        return count if magic == DyscomLiveDataRecording.CHUNK_MAGIC else 0
+
+
+    @staticmethod
+    def get_chunk_bytes(number_of_channels: int, count: int) -> int:
+        """Returns size of a chunk with count packets of number_of_channels channels"""
+        return DyscomLiveDataRecording.CHUNK_HEADER.size + count * (4 + 5 * number_of_channels)
+
+
+    @staticmethod
+    def align(value: int) -> int:
+        """Rounds value up to a multiple of 4"""
+        return (value + 3) & ~3
@@ -0,0 +1,191 @@
+"""Provides a decoder for measurement files recorded on device memory card"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+import numpy as np
+
+from .ads129x.ads129x_config_register_1 import Ads129xPowerMode
+from .dyscom_types import DyscomFrequencyOut, DyscomInitParams, DyscomSignalType
+from .dyscom_live_data_batch import DyscomLiveDataBatch, DyscomLiveDataDecoder
+from .dyscom_live_data_recorder import DyscomLiveDataRecorder, DyscomLiveDataRecording
+from .dyscom_sample_store import DyscomSampleStore
+from .dyscom_send_measurement_meta_info import PacketDyscomSendMeasurementMetaInfo
+
+
+class _DecodeTask(NamedTuple):
+    """Part of a measurement file decoded by one worker process"""
+    source: str
+    # position of first packet in source
+    source_position: int
+    number_of_channels: int
+    packet_count: int
+    destination: str
+    # position of first chunk in destination
+    destination_position: int
+    chunk_size: int
+
+
+def _decode_task(task: _DecodeTask):
+    """Decodes packets of task into chunks of a recording, runs in a worker process"""
+    records = np.memmap(task.source, DyscomLiveDataDecoder.get_dtype(task.number_of_channels), "r",
+                        task.source_position, (task.packet_count,))
+    full_chunk_count, rest = divmod(task.packet_count, task.chunk_size)
+    size = full_chunk_count * DyscomLiveDataRecording.get_chunk_bytes(task.number_of_channels, task.chunk_size) +\
+        (DyscomLiveDataRecording.get_chunk_bytes(task.number_of_channels, rest) if rest > 0 else 0)
+    output = np.memmap(task.destination, np.uint8, "r+", task.destination_position, (size,))
+
+    position = 0
+    for start in range(0, task.packet_count, task.chunk_size):
+        chunk = records[start:start + task.chunk_size]
+        invalid = np.flatnonzero(chunk["number_of_channels"] != task.number_of_channels)
+        if len(invalid) > 0:
+            raise ValueError(f"Packet at position {task.source_position + (start + invalid[0]) * records.itemsize} "
+                             f"does not have {task.number_of_channels} channels")
+
+        # same layout as DyscomLiveDataRecorder writes: header, time offset column, value and status column per channel
+        count = len(chunk)
+        header = DyscomLiveDataRecording.CHUNK_HEADER.pack(DyscomLiveDataRecording.CHUNK_MAGIC, count)
+        output[position:position + len(header)] = np.frombuffer(header, np.uint8)
+        position += len(header)
+        output[position:position + 4 * count].view("<u4")[:] = chunk["time_offset"]
+        position += 4 * count
+        value_size = 4 * count * task.number_of_channels
+        output[position:position + value_size].view("<f4").reshape(task.number_of_channels, count)[:] = chunk["samples"]["value"].T
+        position += value_size
+        status_size = count * task.number_of_channels
+        output[position:position + status_size].reshape(task.number_of_channels, count)[:] = chunk["samples"]["status"].T
+        position += status_size
+    output.flush()
+
+
+class DyscomMeasurementFileDecoder():
+    """Decodes a measurement file recorded with DyscomInitFlag.ENABLE_SD_STORAGE_MODE and downloaded
+    from device memory card (see LayerDyscom.download_file()).
+
+    File starts with measurement meta info (same layout as payload of PacketDyscomSendMeasurementMetaInfo),
+    which contains init params with signal types and output data rate, followed by packets with the same
+    layout as payload of PacketDyscomSendLiveData. All packets have the same size, so file can be split in
+    independent parts that are decoded in parallel, an incomplete last packet is ignored."""
+
+    META_INFO_SIZE = 483
+
+
+    def __init__(self, filename: str):
+        self._filename = filename
+        with open(filename, "rb") as f:
+            data = f.read(DyscomMeasurementFileDecoder.META_INFO_SIZE)
+            size = f.seek(0, os.SEEK_END)
+        if len(data) < DyscomMeasurementFileDecoder.META_INFO_SIZE:
+            raise ValueError(f"File is too short for measurement meta info {filename}")
+
+        self._meta_info = PacketDyscomSendMeasurementMetaInfo(data)
+        self._init_params_data = data[0:361]
+        self._signal_types = list(self._meta_info.init_params.signal_type)
+        if len(self._signal_types) == 0:
+            raise ValueError(f"Measurement meta info has no signal types {filename}")
+
+        self._dtype = DyscomLiveDataDecoder.get_dtype(len(self._signal_types))
+        self._packet_count = (size - DyscomMeasurementFileDecoder.META_INFO_SIZE) // self._dtype.itemsize
+        self._sample_rate = DyscomSampleStore.get_sample_rate(DyscomMeasurementFileDecoder.get_frequency_out(self._meta_info.init_params))
+
+
+    @staticmethod
+    def get_frequency_out(init_params: DyscomInitParams) -> DyscomFrequencyOut:
+        """Returns frequency out for output data rate and power mode of init params, low power mode halves sample rate"""
+        config_register_1 = init_params.register_map_ads129x.config_register_1
+        low_power = 1 if config_register_1.power_mode == Ads129xPowerMode.LOW_POWER else 0
+        return DyscomFrequencyOut(DyscomFrequencyOut.SAMPLES_PER_SECOND_32K + config_register_1.output_data_rate + low_power)
+
+
+    @property
+    def filename(self) -> str:
+        """Getter for filename"""
+        return self._filename
+
+
+    @property
+    def meta_info(self) -> PacketDyscomSendMeasurementMetaInfo:
+        """Getter for measurement meta info at start of file"""
+        return self._meta_info
+
+
+    @property
+    def signal_types(self) -> list[DyscomSignalType]:
+        """Getter for signal types of channels"""
+        return self._signal_types
+
+
+    @property
+    def sample_rate(self) -> int:
+        """Getter for samples per second"""
+        return self._sample_rate
+
+
+    @property
+    def packet_count(self) -> int:
+        """Getter for number of packets"""
+        return self._packet_count
+
+
+    def decode(self, start: int = 0, count: int | None = None) -> DyscomLiveDataBatch:
+        """Decodes count packets (all remaining if None) beginning with packet start in this process,
+        intended for parts of a file, use convert() for whole files"""
+        if start < 0 or start > self._packet_count:
+            raise IndexError(f"Packet index out of range {start}")
+        count = self._packet_count - start if count is None else min(count, self._packet_count - start)
+        if count <= 0:
+            return DyscomLiveDataDecoder.create_batch(np.empty(0, self._dtype))
+
+        records = np.memmap(self._filename, self._dtype, "r", self._get_packet_position(start), (count,))
+        if np.any(records["number_of_channels"] != len(self._signal_types)):
+            raise ValueError(f"Packets must all have {len(self._signal_types)} channels")
+        return DyscomLiveDataDecoder.create_batch(records)
+
+
+    def convert(self, destination: str, max_workers: int | None = None,
+                chunk_size: int = DyscomLiveDataRecorder.DEFAULT_CHUNK_SIZE) -> DyscomLiveDataRecording:
+        """Decodes whole file into a recording (see DyscomLiveDataRecording) at destination using a pool of
+        max_workers processes (default number of CPUs) and returns opened recording.
+
+        Destination is created with its final size first, then each worker decodes a range of packets
+        memory mapped and writes their columns directly at the position of their chunks, so no data is
+        transferred between processes and decoding scales with number of CPUs."""
+        number_of_channels = len(self._signal_types)
+        chunk_size = DyscomLiveDataRecording.align(max(1, chunk_size))
+        header = DyscomLiveDataRecording.create_header(self._signal_types, self._sample_rate, chunk_size, self._init_params_data)
+        full_chunk_bytes = DyscomLiveDataRecording.get_chunk_bytes(number_of_channels, chunk_size)
+        full_chunk_count, rest = divmod(self._packet_count, chunk_size)
+        with open(destination, "wb") as f:
+            f.write(header)
+            f.truncate(len(header) + full_chunk_count * full_chunk_bytes +\
+                       (DyscomLiveDataRecording.get_chunk_bytes(number_of_channels, rest) if rest > 0 else 0))
+
+        worker_count = max_workers if max_workers is not None else os.cpu_count() or 1
+        tasks = self._create_tasks(destination, len(header), chunk_size, worker_count)
+        if worker_count == 1 or len(tasks) <= 1:
+            for task in tasks:
+                _decode_task(task)
+        else:
+            with ProcessPoolExecutor(worker_count) as executor:
+                # consume results to raise exceptions of workers
+                list(executor.map(_decode_task, tasks))
+
+        return DyscomLiveDataRecording(destination)
+
+
+    def _create_tasks(self, destination: str, header_size: int, chunk_size: int, worker_count: int) -> list[_DecodeTask]:
+        """Splits packets into tasks of whole chunks, several tasks per worker, so workers finishing
+        early take over remaining tasks"""
+        full_chunk_bytes = DyscomLiveDataRecording.get_chunk_bytes(len(self._signal_types), chunk_size)
+        chunk_count = -(-self._packet_count // chunk_size)
+        chunks_per_task = max(1, -(-chunk_count // (4 * worker_count)))
+        return [_DecodeTask(self._filename, self._get_packet_position(x * chunk_size), len(self._signal_types),
+                            min(chunks_per_task * chunk_size, self._packet_count - x * chunk_size),
+                            destination, header_size + x * full_chunk_bytes, chunk_size)
+                for x in range(0, chunk_count, chunks_per_task)]
+
+
+    def _get_packet_position(self, index: int) -> int:
+        """Returns position of packet at index in file"""
+        return DyscomMeasurementFileDecoder.META_INFO_SIZE + index * self._dtype.itemsize
@@ -0,0 +1,212 @@
+"""Provides a preallocated store for dyscom live data samples"""
+
+import numpy as np
+
+from .dyscom_types import DyscomFrequencyOut, DyscomInitParams, DyscomSignalType
+from .dyscom_init import DyscomInitResult
+from .dyscom_live_data_batch import DyscomLiveDataBatch
+from .dyscom_gap_detector import DyscomGapDetector
+
+
+class DyscomSampleStore:
+    """Keeps the most recent samples of a measurement in one preallocated float32 ring per signal type,
+    capacity is sample rate multiplied by retention time.
+
+    Each ring holds every sample twice (at index and index + capacity), so appending is a constant
+    number of slice assignments per batch and the last samples are always available as contiguous
+    views without copying. Timestamps are time offsets of live data packets extended to 64 bit,
+    so they keep increasing when 32 bit time offset wraps around.
+
+    With fill_gaps, lost samples are detected from time offsets (see DyscomGapDetector) and stored
+    as NaN values, so samples in store stay equally spaced in time, duplicated packets are dropped."""
+
+    _TIME_OFFSET_WRAP = 1 << 32
+
+
+    def __init__(self, signal_types: list[DyscomSignalType], sample_rate: float, retention_in_seconds: float = 10.0,
+                 fill_gaps: bool = False):
+        if sample_rate <= 0:
+            raise ValueError(f"Invalid sample rate {sample_rate}")
+
+        self._signal_types = list(signal_types)
+        self._sample_rate = sample_rate
+        self._capacity = max(1, int(sample_rate * retention_in_seconds))
+        self._values = {x: np.zeros(2 * self._capacity, np.float32) for x in self._signal_types}
+        self._timestamps = np.zeros(2 * self._capacity, np.int64)
+        self._position = 0
+        self._count = 0
+        self._total_count = 0
+        self._last_time_offset: int | None = None
+        self._time_offset_base = 0
+        self._gap_detector = DyscomGapDetector(sample_rate) if fill_gaps else None
+
+
+    @staticmethod
+    def create(init_params: DyscomInitParams, init_result: DyscomInitResult, retention_in_seconds: float = 10.0,
+               fill_gaps: bool = False) -> "DyscomSampleStore":
+        """Creates a store for signal types of init params and output data rate returned by LayerDyscom.init()"""
+        return DyscomSampleStore(init_params.signal_type, DyscomSampleStore.get_sample_rate(init_result.frequency_out),
+                                 retention_in_seconds, fill_gaps)
+
+
+    @staticmethod
+    def get_sample_rate(frequency_out: DyscomFrequencyOut) -> int:
+        """Returns samples per second for frequency out"""
+        if frequency_out == DyscomFrequencyOut.UNUSED:
+            raise ValueError("Frequency out is unused")
+        return 32000 >> (frequency_out - DyscomFrequencyOut.SAMPLES_PER_SECOND_32K)
+
+
+    @property
+    def signal_types(self) -> list[DyscomSignalType]:
+        """Getter for signal types"""
+        return self._signal_types
+
+
+    @property
+    def sample_rate(self) -> float:
+        """Getter for samples per second"""
+        return self._sample_rate
+
+
+    @property
+    def capacity(self) -> int:
+        """Getter for maximum number of samples per signal type"""
+        return self._capacity
+
+
+    @property
+    def gap_detector(self) -> DyscomGapDetector | None:
+        """Getter for gap detector with counters of lost samples, None if gaps are not filled"""
+        return self._gap_detector
+
+
+    @property
+    def count(self) -> int:
+        """Getter for number of samples currently available"""
+        return self._count
+
+
+    @property
+    def total_count(self) -> int:
+        """Getter for number of samples appended since creation or clear(), including NaN values of lost samples"""
+        return self._total_count
+
+
+    def append(self, batch: DyscomLiveDataBatch):
+        """Appends all packets of batch (e.g. from LayerDyscom.stream_live_data()), channels
+        with a signal type not in store are ignored"""
+        if batch.number_of_packets == 0:
+            return
+        values = {DyscomSignalType(x): batch.value[:, index] for index, x in enumerate(batch.signal_type[0])}
+        self.append_values(batch.time_offset, values)
+
+
+    def append_values(self, time_offsets: np.ndarray, values: dict[DyscomSignalType, np.ndarray]):
+        """Appends samples, values contains one array per signal type with same length as time_offsets,
+        signal types without values are filled with NaN"""
+        if self._gap_detector is not None:
+            time_offsets, values = self._insert_gap_markers(np.asarray(time_offsets, np.int64), values)
+
+        count = len(time_offsets)
+        if count == 0:
+            return
+
+        timestamps = self._extend_time_offsets(np.asarray(time_offsets, np.int64))
+        # only last samples fit into ring
+        skip = max(0, count - self._capacity)
+        self._write(self._timestamps, timestamps[skip:])
+        for signal_type, ring in self._values.items():
+            signal_values = values.get(signal_type)
+            if signal_values is None:
+                signal_values = np.full(count, np.nan, np.float32)
+            self._write(ring, signal_values[skip:])
+
+        self._position = (self._position + count - skip) % self._capacity
+        self._count = min(self._capacity, self._count + count)
+        self._total_count += count
+
+
+    def get_timestamps(self, sample_count: int | None = None) -> np.ndarray:
+        """Returns view of timestamps of last sample_count samples (all available if None)"""
+        return self._get_view(self._timestamps, sample_count)
+
+
+    def get_values(self, signal_type: DyscomSignalType, sample_count: int | None = None) -> np.ndarray:
+        """Returns view of values of last sample_count samples (all available if None) for signal_type"""
+        return self._get_view(self._values[signal_type], sample_count)
+
+
+    def get_last_seconds(self, signal_type: DyscomSignalType, seconds: float) -> tuple[np.ndarray, np.ndarray]:
+        """Returns views of timestamps and values of samples from last seconds (based on sample rate)"""
+        sample_count = int(seconds * self._sample_rate)
+        return self.get_timestamps(sample_count), self.get_values(signal_type, sample_count)
+
+
+    def get_time_range(self, signal_type: DyscomSignalType, start_timestamp: int, end_timestamp: int) -> tuple[np.ndarray, np.ndarray]:
+        """Returns views of timestamps and values of samples with start_timestamp <= timestamp < end_timestamp"""
+        timestamps = self.get_timestamps()
+        start, end = np.searchsorted(timestamps, [start_timestamp, end_timestamp])
+        return timestamps[start:end], self.get_values(signal_type)[start:end]
+
+
+    def clear(self):
+        """Removes all samples"""
+        self._position = 0
+        self._count = 0
+        self._total_count = 0
+        self._last_time_offset = None
+        self._time_offset_base = 0
+        if self._gap_detector is not None:
+            self._gap_detector.reset()
+
+
+    def _insert_gap_markers(self, time_offsets: np.ndarray, values: dict[DyscomSignalType, np.ndarray]) ->\
+        tuple[np.ndarray, dict[DyscomSignalType, np.ndarray]]:
+        """Inserts NaN values with interpolated time offsets for lost samples and removes duplicated packets"""
+        lost = self._gap_detector.process(time_offsets)
+        if not np.any(lost != 0):
+            return time_offsets, values
+
+        # each packet is preceded by its lost samples, only last samples of a gap fit into ring
+        repeats = np.where(lost < 0, 0, np.minimum(lost, self._capacity) + 1)
+        packet_positions = np.cumsum(repeats) - 1
+        owners = np.repeat(np.arange(len(time_offsets)), repeats)
+        distances = packet_positions[owners] - np.arange(len(owners))
+        result_time_offsets = time_offsets[owners] - np.rint(distances * self._gap_detector.sample_interval).astype(np.int64)
+        result_time_offsets %= DyscomSampleStore._TIME_OFFSET_WRAP
+
+        kept = lost >= 0
+        result_values = {}
+        for signal_type, signal_values in values.items():
+            result_values[signal_type] = np.full(len(owners), np.nan, np.float32)
+            result_values[signal_type][packet_positions[kept]] = np.asarray(signal_values)[kept]
+        return result_time_offsets, result_values
+
+
+    def _write(self, ring: np.ndarray, data: np.ndarray):
+        """Writes data at current position and at mirrored position, data must not be larger than capacity"""
+        first = min(len(data), self._capacity - self._position)
+        for offset in [0, self._capacity]:
+            start = self._position + offset
+            ring[start:start + first] = data[:first]
+            ring[offset:offset + len(data) - first] = data[first:]
+
+
+    def _get_view(self, ring: np.ndarray, sample_count: int | None) -> np.ndarray:
+        """Returns view of last sample_count samples of ring"""
+        count = self._count if sample_count is None else max(0, min(sample_count, self._count))
+        end = self._position + self._capacity
+        return ring[end - count:end]
+
+
+    def _extend_time_offsets(self, time_offsets: np.ndarray) -> np.ndarray:
+        """Converts 32 bit time offsets to increasing 64 bit timestamps, a decrease by more than half
+        of 32 bit range is a wrap around"""
+        previous = time_offsets[0] if self._last_time_offset is None else self._last_time_offset
+        steps = np.diff(time_offsets, prepend=previous)
+        wraps = np.cumsum(steps < -(DyscomSampleStore._TIME_OFFSET_WRAP >> 1))
+        result = time_offsets + (self._time_offset_base + wraps * DyscomSampleStore._TIME_OFFSET_WRAP)
+        self._last_time_offset = int(time_offsets[-1])
+        self._time_offset_base += int(wraps[-1]) * DyscomSampleStore._TIME_OFFSET_WRAP
+        return result
@@ -1,18 +1,39 @@
 """Provides packet classes for dyscom send file"""
 
 import struct
+from typing import NamedTuple
 
 from science_mode_4.protocol.commands import Commands
 from science_mode_4.protocol.packet import Packet, PacketAck
 from science_mode_4.utils.byte_builder import ByteBuilder
 
 
+class DyscomDownloadFileResult(NamedTuple):
+    """Helper class for dyscom download file"""
+    filename: str
+    filesize: int
+    number_of_blocks: int
+    # number of bytes received during this download (without blocks before block offset)
+    byte_count: int
+    duration_in_seconds: float
+    # number of times download or a block was requested again
+    resume_count: int
+    # CRC16 (XModem) of file, calculated while blocks arrived
+    checksum: int
+
+
+    @property
+    def megabytes_per_second(self) -> float:
+        """Getter for download rate in MB/s"""
+        return self.byte_count / self.duration_in_seconds / 1e6 if self.duration_in_seconds > 0 else 0.0
+
+
 class PacketDyscomSendFile(PacketAck):
     """Packet for dyscom send file (this is technically not an acknowledge, but it is handled as such,
     because it is send automatically from device)"""
 
 
-    _unpack_func = struct.Struct(">IH").unpack
+    _unpack_func = struct.Struct(">IH").unpack_from
 
 
     def __init__(self, data: bytes):
@@ -23,8 +44,8 @@ class PacketDyscomSendFile(PacketAck):
         self._data: bytes = bytes()
 
         if not data is None:
-            self._block_number, self._block_size = PacketDyscomSendFile._unpack_func(">IH", data)
-            self._data = data[6:self._block_size]
+            self._block_number, self._block_size = PacketDyscomSendFile._unpack_func(data)
+            self._data = data[6:6 + self._block_size]
 
 
     @property
@@ -58,5 +79,5 @@ class PacketDyscomSendFileAck(Packet):
 
     def get_data(self) -> bytes:
         bb = ByteBuilder()
-        bb.append_bytes(self._block_number)
+        bb.append_value(self._block_number, 4, True)
         return bb.get_bytes()
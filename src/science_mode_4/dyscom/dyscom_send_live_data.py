@@ -1,63 +1,103 @@
 """Provides packet classes for dyscom send live data"""
 
 import struct
+import numpy as np
 from science_mode_4.protocol.commands import Commands
 from science_mode_4.protocol.packet import PacketAck
 from .dyscom_types import DyscomElectrodeSample, DyscomSignalType, DyscomPowerLiveDataStatusFlag
 
 
+def _status_to_flags(status: int) -> frozenset[DyscomPowerLiveDataStatusFlag]:
+    """Converts status byte of a sample to status flags"""
+    result = set()
+    for f in DyscomPowerLiveDataStatusFlag:
+        if status & (1 << f) == 1:
+            result.add(f)
+    return frozenset(result)
+
+
 class PacketDyscomSendLiveData(PacketAck):
     """Packet for dyscom send live data (this is technically not an acknowledge, but it is handled as such,
-    because it is send automatically from device)"""
+    because it is send automatically from device). Payload is only decoded when accessed."""
+
+    __slots__ = ("_samples",)
+
+    # payload starts with number of channels and time offset, followed by 6 bytes per channel
+    _HEADER_SIZE = 5
+    _SAMPLE_SIZE = 6
+    _time_offset_struct = struct.Struct(">I")
+    _value_struct = struct.Struct(">f")
+    _sample_struct = struct.Struct(">fBB")
+    # status flags for every possible status byte
+    _status_flags = tuple(_status_to_flags(x) for x in range(256))
+    _value_dtype = np.dtype(">f4")
 
 
     def __init__(self, data: bytes):
         super().__init__(data)
         self._command = Commands.DlSendLiveData
-        self._number_of_channels = 0
-        self._time_offset = 0
-        self._samples: list[DyscomElectrodeSample] = []
-
-        if not data is None:
-            self._number_of_channels = data[0]
-            self._time_offset = int.from_bytes(data[1:5], "big")
-
-            for x in range(self._number_of_channels):
-                start_index = 5 + x * 6
-
-                sample = DyscomElectrodeSample()
-                sample.value = struct.unpack_from(">f", data[start_index:start_index+4])[0]
-                sample.signal_type = DyscomSignalType(data[start_index+4])
-                status = data[start_index+5]
-                for f in DyscomPowerLiveDataStatusFlag:
-                    if status & (1 << f) == 1:
-                        sample.status.add(f)
-
-                self._samples.append(sample)
+        self._samples: list[DyscomElectrodeSample] | None = None
 
 
     @property
     def number_of_channels(self) -> int:
         """Getter for number of channels"""
-        return self._number_of_channels
+        if self._payload is None:
+            return 0
+        return self._payload[0]
 
 
     @property
     def time_offset(self) -> int:
         """Getter for time offset"""
-        return self._time_offset
+        if self._payload is None:
+            return 0
+        return PacketDyscomSendLiveData._time_offset_struct.unpack_from(self._payload, 1)[0]
 
 
     @property
     def samples(self) -> list[DyscomElectrodeSample]:
-        """Getter for samples"""
+        """Getter for samples, samples are created on first access"""
+        if self._samples is None:
+            self._samples = []
+            status_flags = PacketDyscomSendLiveData._status_flags
+            for value, signal_type, status in PacketDyscomSendLiveData._sample_struct.iter_unpack(self._get_sample_data()):
+                self._samples.append(DyscomElectrodeSample(value, DyscomSignalType(signal_type), set(status_flags[status])))
         return self._samples
 
 
     @property
     def status_error(self) -> bool:
         """Returns true if in any sample a status flag is set, false otherwise"""
-        for x in self._samples:
-            if len(x.status) != 0:
-                return True
-        return False
+        if self._samples is not None:
+            return any(len(x.status) != 0 for x in self._samples)
+
+        status_flags = PacketDyscomSendLiveData._status_flags
+        sample_data = self._get_sample_data()
+        return any(status_flags[x] for x in sample_data[PacketDyscomSendLiveData._SAMPLE_SIZE - 1::PacketDyscomSendLiveData._SAMPLE_SIZE])
+
+
+    def values_as_array(self) -> np.ndarray:
+        """Returns values of all channels as float32 array"""
+        sample_data = self._get_sample_data()
+        values = np.ndarray((len(sample_data) // PacketDyscomSendLiveData._SAMPLE_SIZE,), PacketDyscomSendLiveData._value_dtype,
+                            sample_data, strides=(PacketDyscomSendLiveData._SAMPLE_SIZE,))
+        return values.astype(np.float32)
+
+
+    def value_of(self, signal_type: DyscomSignalType) -> float | None:
+        """Returns value of first channel with signal_type or None if there is no such channel"""
+        sample_data = self._get_sample_data()
+        # signal type is the fifth byte of every sample
+        index = bytes(sample_data[4::PacketDyscomSendLiveData._SAMPLE_SIZE]).find(signal_type)
+        if index == -1:
+            return None
+        return PacketDyscomSendLiveData._value_struct.unpack_from(sample_data, index * PacketDyscomSendLiveData._SAMPLE_SIZE)[0]
+
+
+    def _get_sample_data(self) -> memoryview:
+        """Returns part of payload containing samples"""
+        if self._payload is None:
+            return memoryview(b"")
+        end = PacketDyscomSendLiveData._HEADER_SIZE + self._payload[0] * PacketDyscomSendLiveData._SAMPLE_SIZE
+        return memoryview(self._payload)[PacketDyscomSendLiveData._HEADER_SIZE:end]
@@ -14,7 +14,7 @@ class PacketDyscomSendMeasurementMetaInfo(PacketAck):
 
     def __init__(self, data: bytes):
         super().__init__(data)
-        self._command = Commands.DlSendFile
+        self._command = Commands.DlMmi
         self._init_params: DyscomInitParams = DyscomInitParams()
         self._file_name = ""
         self._file_size = 0
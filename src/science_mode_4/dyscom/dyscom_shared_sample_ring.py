@@ -0,0 +1,228 @@
+"""Provides a ring buffer in shared memory for decoded dyscom live data samples"""
+
+import multiprocessing
+import os
+import sys
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import NamedTuple, Sequence
+import numpy as np
+
+from .dyscom_live_data_batch import DyscomLiveDataDecoder
+
+
+class DyscomSharedSampleRingReadResult(NamedTuple):
+    """Result of DyscomSharedSampleRing.read()"""
+    # structured array with ring record layout, see DyscomSharedSampleRing.get_dtype()
+    records: np.ndarray
+    # sequence to pass to next read()
+    next_sequence: int
+    # number of records that were overwritten before they could be read
+    lost_count: int
+
+
+class DyscomSharedSampleRing():
+    """Ring buffer in shared memory with one record per send live data packet, that can be mapped
+    by other processes with attach() without copying.
+
+    There must be only one writing process. Each record gets a sequence number (number of records
+    written before), readers keep track of their own sequence. Writer announces records it is going
+    to overwrite before writing them, so a reader can check with is_valid() after processing a view
+    that the records were not overwritten in the meantime."""
+
+    HEADER_SIZE = 64
+    # indices in header
+    _WRITE_SEQUENCE = 0
+    _RESERVE_SEQUENCE = 1
+    _CAPACITY = 2
+    _NUMBER_OF_CHANNELS = 3
+    _INVALID_PACKET_COUNT = 4
+
+    # names of rings created by this process
+    _created_names: set[str] = set()
+
+
+    def __init__(self, shm: SharedMemory):
+        """Use create() or attach() to get an instance"""
+        self._shm = shm
+        self._header = np.ndarray((DyscomSharedSampleRing.HEADER_SIZE // 8,), np.int64, shm.buf)
+        capacity = int(self._header[DyscomSharedSampleRing._CAPACITY])
+        number_of_channels = int(self._header[DyscomSharedSampleRing._NUMBER_OF_CHANNELS])
+        self._records = np.ndarray((capacity,), DyscomSharedSampleRing.get_dtype(number_of_channels),
+                                   shm.buf, DyscomSharedSampleRing.HEADER_SIZE)
+
+
+    @staticmethod
+    def get_dtype(number_of_channels: int) -> np.dtype:
+        """Returns structured dtype of a ring record with native byte order"""
+        return np.dtype([("time_offset", np.uint32), ("value", np.float32, (number_of_channels,)),
+                         ("signal_type", np.uint8, (number_of_channels,)), ("status", np.uint8, (number_of_channels,))])
+
+
+    @staticmethod
+    def create(number_of_channels: int, capacity: int, name: str | None = None) -> "DyscomSharedSampleRing":
+        """Creates a new ring in shared memory, caller is responsible to call unlink() when ring is not needed anymore"""
+        if capacity <= 0:
+            raise ValueError(f"Capacity must be greater than 0 {capacity}")
+
+        size = DyscomSharedSampleRing.HEADER_SIZE + capacity * DyscomSharedSampleRing.get_dtype(number_of_channels).itemsize
+        shm = SharedMemory(name, True, size)
+        header = np.ndarray((DyscomSharedSampleRing.HEADER_SIZE // 8,), np.int64, shm.buf)
+        header[:] = 0
+        header[DyscomSharedSampleRing._CAPACITY] = capacity
+        header[DyscomSharedSampleRing._NUMBER_OF_CHANNELS] = number_of_channels
+        del header
+        DyscomSharedSampleRing._created_names.add(shm.name)
+        return DyscomSharedSampleRing(shm)
+
+
+    @staticmethod
+    def attach(name: str) -> "DyscomSharedSampleRing":
+        """Maps an existing ring created by another process. Ring is not tracked by resource tracker
+        of this process, so it is not destroyed (and no leak is reported) when this process ends,
+        only creator calls unlink()"""
+        if sys.version_info >= (3, 13):
+            return DyscomSharedSampleRing(SharedMemory(name, track=False)) # pylint:disable=unexpected-keyword-arg
+
+        shm = SharedMemory(name)
+        # before Python 3.13 attaching registers shared memory at resource tracker (only on posix), creator
+        # and child processes of multiprocessing share resource tracker with creator, so registration is kept there
+        if os.name == "posix" and multiprocessing.parent_process() is None and name not in DyscomSharedSampleRing._created_names:
+            resource_tracker.unregister(shm._name, "shared_memory") # pylint:disable=protected-access
+        return DyscomSharedSampleRing(shm)
+
+
+    @property
+    def name(self) -> str:
+        """Getter for name of shared memory, use it to attach() from another process"""
+        return self._shm.name
+
+
+    @property
+    def capacity(self) -> int:
+        """Getter for maximum number of records in ring"""
+        return len(self._records)
+
+
+    @property
+    def number_of_channels(self) -> int:
+        """Getter for number of channels of each record"""
+        return int(self._header[DyscomSharedSampleRing._NUMBER_OF_CHANNELS])
+
+
+    @property
+    def write_sequence(self) -> int:
+        """Getter for number of records written, all records with a lower sequence are complete"""
+        return int(self._header[DyscomSharedSampleRing._WRITE_SEQUENCE])
+
+
+    @property
+    def oldest_sequence(self) -> int:
+        """Getter for sequence of oldest record that is not overwritten (or about to be overwritten)"""
+        return max(0, int(self._header[DyscomSharedSampleRing._RESERVE_SEQUENCE]) - len(self._records))
+
+
+    @property
+    def invalid_packet_count(self) -> int:
+        """Getter for number of payloads that were not written, because number of channels did not match"""
+        return int(self._header[DyscomSharedSampleRing._INVALID_PACKET_COUNT])
+
+
+    @property
+    def records(self) -> np.ndarray:
+        """Getter for structured array view of all records in ring, record with sequence s is at index s % capacity"""
+        return self._records
+
+
+    def write(self, payload_records: np.ndarray):
+        """Writes records with send live data packet layout (see DyscomLiveDataDecoder.decode_records()) to ring"""
+        capacity = len(self._records)
+        count = len(payload_records)
+        if count > capacity:
+            # only the newest records fit into ring
+            payload_records = payload_records[count - capacity:]
+            write_sequence = self.write_sequence + count - capacity
+            count = capacity
+        else:
+            write_sequence = self.write_sequence
+
+        if count == 0:
+            return
+
+        # announce records that are going to be overwritten
+        self._header[DyscomSharedSampleRing._RESERVE_SEQUENCE] = write_sequence + count
+        samples = payload_records["samples"]
+        start = write_sequence % capacity
+        first = min(count, capacity - start)
+        for dst, src in ((self._records[start:start + first], slice(0, first)),
+                         (self._records[:count - first], slice(first, count))):
+            if len(dst) == 0:
+                continue
+            dst["time_offset"] = payload_records["time_offset"][src]
+            dst["value"] = samples["value"][src]
+            dst["signal_type"] = samples["signal_type"][src]
+            dst["status"] = samples["status"][src]
+        # publish records
+        self._header[DyscomSharedSampleRing._WRITE_SEQUENCE] = write_sequence + count
+
+
+    def write_payloads(self, payloads: Sequence[bytes]):
+        """Decodes payloads of send live data packets and writes them to ring, payloads with
+        a different number of channels are counted as invalid and skipped"""
+        number_of_channels = self.number_of_channels
+        size = DyscomLiveDataDecoder.get_dtype(number_of_channels).itemsize
+        valid = [x for x in payloads if len(x) == size and x[0] == number_of_channels]
+        if len(valid) != len(payloads):
+            self._header[DyscomSharedSampleRing._INVALID_PACKET_COUNT] += len(payloads) - len(valid)
+        self.write(DyscomLiveDataDecoder.decode_records(valid))
+
+
+    def is_valid(self, sequence: int) -> bool:
+        """Checks if record with sequence was not overwritten, call it after processing views
+        from get_views() to make sure data was not changed by writer during processing"""
+        return sequence >= self.oldest_sequence
+
+
+    def get_views(self, start_sequence: int, stop_sequence: int) -> list[np.ndarray]:
+        """Returns up to two views (ring wrap around) of records from start_sequence up to
+        stop_sequence (exclusive) without copying"""
+        capacity = len(self._records)
+        if stop_sequence - start_sequence > capacity:
+            raise ValueError(f"Range exceeds capacity {start_sequence} {stop_sequence}")
+        if stop_sequence <= start_sequence:
+            return []
+
+        start = start_sequence % capacity
+        stop = start + stop_sequence - start_sequence
+        if stop <= capacity:
+            return [self._records[start:stop]]
+        return [self._records[start:], self._records[:stop - capacity]]
+
+
+    def read(self, sequence: int) -> DyscomSharedSampleRingReadResult:
+        """Returns copy of all complete records from sequence on, records that were overwritten
+        are skipped and counted as lost"""
+        write_sequence = self.write_sequence
+        start_sequence = max(sequence, self.oldest_sequence)
+        views = self.get_views(start_sequence, write_sequence)
+        records = np.concatenate(views) if views else self._records[:0].copy()
+        # writer may have overwritten records while copying
+        oldest_sequence = self.oldest_sequence
+        if oldest_sequence > start_sequence:
+            records = records[oldest_sequence - start_sequence:]
+            start_sequence = oldest_sequence
+        return DyscomSharedSampleRingReadResult(records, max(write_sequence, start_sequence),
+                                                start_sequence - sequence)
+
+
+    def close(self):
+        """Unmaps shared memory, ring and all views must not be used afterwards"""
+        self._header = None
+        self._records = None
+        self._shm.close()
+
+
+    def unlink(self):
+        """Destroys shared memory, should be called once by the creator"""
+        self._shm.unlink()
+        DyscomSharedSampleRing._created_names.discard(self._shm.name)
@@ -199,3 +199,16 @@ class DyscomInitParams():
 
     def set_data(self, data: bytes):
         """Convert bytes to information"""
+        self.register_map_ads129x = Ads129x()
+        self.register_map_ads129x.set_data(data[0:26])
+        self.start_time = DyscomHelper.bytes_to_datetime(data[26:37])
+        self.system_time = DyscomHelper.bytes_to_datetime(data[37:48])
+        self.proband_name = DyscomHelper.bytes_to_str(data[48:177], 129)
+        self.investigator_name = DyscomHelper.bytes_to_str(data[177:306], 129)
+        self.proband_number = DyscomHelper.bytes_to_str(data[306:343], 37)
+        signal_type_count = min(int.from_bytes(data[343:345], "big"), 8)
+        self.duration = datetime.timedelta(seconds=int.from_bytes(data[345:349], "big"))
+        self.signal_type = [DyscomSignalType(x) for x in data[349:349 + signal_type_count]]
+        self.sync_signal = data[358] != 0
+        self.filter = DyscomFilterType(data[359])
+        self.flags = {x for x in DyscomInitFlag if data[360] & (1 << x)}
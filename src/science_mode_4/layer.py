@@ -9,13 +9,17 @@ from .utils.packet_buffer import PacketBuffer
 
 
 class Layer():
-    """Base class for all layers"""
+    """Base class for all layers, functions waiting for a response can be called concurrently
+    (e.g. with asyncio.gather()), requests are correlated by packet number"""
+
+    DEFAULT_TIMEOUT_IN_SECONDS = 5
 
 
     def __init__(self, packet_buffer: PacketBuffer, packet_factory: PacketFactory, packet_number_generator: PacketNumberGenerator):
         self._packet_factory = packet_factory
         self._packet_number_generator = packet_number_generator
         self._packet_buffer = packet_buffer
+        self._timeout_in_seconds = Layer.DEFAULT_TIMEOUT_IN_SECONDS
 
 
     @property
@@ -24,6 +28,18 @@ class Layer():
         return self._packet_buffer
 
 
+    @property
+    def timeout_in_seconds(self) -> float:
+        """Getter for timeout of each request waiting for a response"""
+        return self._timeout_in_seconds
+
+
+    @timeout_in_seconds.setter
+    def timeout_in_seconds(self, value: float):
+        """Setter for timeout of each request waiting for a response"""
+        self._timeout_in_seconds = value
+
+
     def _send_packet(self, packet: Packet):
         """Generates a new packet number and send packet"""
         ack = ProtocolHelper.send_packet(packet, self._packet_number_generator.get_next_number(),
@@ -32,9 +48,12 @@ class Layer():
 
 
     async def _send_packet_and_wait(self, packet: Packet) -> PacketAck:
-        """Generates a new packet number, send packet and waits for response"""
-        ack = await ProtocolHelper.send_packet_and_wait(packet, self._packet_number_generator.get_next_number(),
-                                                        self._packet_buffer)
+        """Reserves a free packet number, send packet and waits for response, packet number is
+        not used by other requests until response arrived (after a timeout until late response arrived
+        or grace period elapsed, see ProtocolHelper.send_packet_and_wait())"""
+        packet_number = await self._packet_number_generator.acquire_number()
+        ack = await ProtocolHelper.send_packet_and_wait(packet, packet_number, self._packet_buffer,
+                                                        self._timeout_in_seconds, self._packet_number_generator)
         return ack
 
 
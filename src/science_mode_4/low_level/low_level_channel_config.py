@@ -1,5 +1,7 @@
 """Provides packet classes for low level channel config"""
 
+from typing import Sequence
+import numpy as np
 from science_mode_4.protocol.commands import Commands
 from science_mode_4.protocol.types import Connector, Channel
 from science_mode_4.protocol.packet import Packet, PacketAck
@@ -87,6 +89,12 @@ class PacketLowLevelChannelConfig(Packet):
 class PacketLowLevelChannelConfigAck(PacketAck):
     """Packet for low level channel config acknowledge"""
 
+    MEASUREMENT_SAMPLE_COUNT = 128
+    # measurement samples are big endian unsigned 16 bit values starting at offset 5
+    _MEASUREMENT_SAMPLE_OFFSET = 5
+    _measurement_sample_dtype = np.dtype(">u2")
+
+
     def __init__(self, data: bytes):
         super().__init__(data)
         self._command = Commands.LowLevelChannelConfigAck
@@ -97,23 +105,33 @@ class PacketLowLevelChannelConfigAck(PacketAck):
         # only present when measurement is active
         self._sampling_time_in_microseconds: int = 0
         self._measurement_samples: list[float] = None
+        self._measurement_samples_array: np.ndarray = None
 
         if not data is None:
-            bb = ByteBuilder()
-            bb.append_bytes(data)
             self._result = LowLevelResult(data[0])
-            self._channel = bb.get_bit_from_position(8, 4)
-            self._connector = bb.get_bit_from_position(12, 4)
+            self._channel = data[1] & 0x0F
+            self._connector = data[1] >> 4
             self._mode = LowLevelMode(data[2])
             # only present when measurement is active
             if self._mode != LowLevelMode.NO_MEASUREMENT:
-                bb.swap(3, 2)
-                self._sampling_time_in_microseconds = bb.get_bit_from_position(24, 16)
-                self._measurement_samples = [0] * 128
-                for index, _ in enumerate(self._measurement_samples):
-                    bb.swap(5 + index * 2, 2)
-                    self._measurement_samples[index] = bb.get_bit_from_position(40 + index * 16, 16) / 100.0
+                self._sampling_time_in_microseconds = int.from_bytes(data[3:5], "big")
+                # check that all samples are present, samples are decoded on first access
+                sample_data = PacketLowLevelChannelConfigAck._get_measurement_sample_data(data)
+                if len(sample_data) != PacketLowLevelChannelConfigAck.MEASUREMENT_SAMPLE_COUNT * 2:
+                    raise ValueError(f"Low level channel config acknowledge too short for measurement samples {len(data)}")
+
+
+    @staticmethod
+    def stack_measurement_samples(acks: Sequence["PacketLowLevelChannelConfigAck"]) -> np.ndarray:
+        """Returns measurement samples of all acks as 2-D array (pulse x sample), all acks must contain measurement samples"""
+        payloads = []
+        for x in acks:
+            if x.mode == LowLevelMode.NO_MEASUREMENT:
+                raise ValueError("Low level channel config acknowledge without measurement samples")
+            payloads.append(PacketLowLevelChannelConfigAck._get_measurement_sample_data(x.payload))
 
+        result = np.frombuffer(b"".join(payloads), PacketLowLevelChannelConfigAck._measurement_sample_dtype) / 100.0
+        return result.reshape(len(payloads), PacketLowLevelChannelConfigAck.MEASUREMENT_SAMPLE_COUNT)
 
 
     @property
@@ -151,4 +169,23 @@ class PacketLowLevelChannelConfigAck(PacketAck):
         """Getter for measurement samples,
         by design negative values are measured as positive values,
         unit depends on choosen measurement mode"""
+        if self._measurement_samples is None and self._mode != LowLevelMode.NO_MEASUREMENT:
+            self._measurement_samples = self.measurement_samples_array.tolist()
         return self._measurement_samples
+
+
+    @property
+    def measurement_samples_array(self) -> np.ndarray:
+        """Getter for measurement samples as array (float64), see measurement_samples,
+        None if measurement is not active"""
+        if self._measurement_samples_array is None and self._mode != LowLevelMode.NO_MEASUREMENT:
+            sample_data = PacketLowLevelChannelConfigAck._get_measurement_sample_data(self._payload)
+            self._measurement_samples_array = np.frombuffer(sample_data, PacketLowLevelChannelConfigAck._measurement_sample_dtype) / 100.0
+        return self._measurement_samples_array
+
+
+    @staticmethod
+    def _get_measurement_sample_data(data: bytes) -> bytes:
+        """Returns part of payload with measurement samples"""
+        start = PacketLowLevelChannelConfigAck._MEASUREMENT_SAMPLE_OFFSET
+        return data[start:start + PacketLowLevelChannelConfigAck.MEASUREMENT_SAMPLE_COUNT * 2]
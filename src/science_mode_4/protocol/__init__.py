@@ -2,6 +2,7 @@
 
 from .channel_point import *
 from .commands import *
+from .frame_decoder import *
 from .packet_factory import *
 from .packet_number_generator import *
 from .packet import *
@@ -0,0 +1,193 @@
+"""Provides a frame decoder to separate packets from a stream of bytes"""
+
+import re
+from typing import Iterator
+
+from science_mode_4.utils.crc16 import Crc16
+from .protocol import Protocol
+
+
+class FrameDecoder():
+    """Incremental frame decoder, it remembers where it stopped searching and uses
+    packet length from packet header to jump directly to expected stop byte,
+    so every received byte is only examined once and every packet is returned exactly once.
+
+    Received data is stored in a fixed-capacity buffer with read and write position,
+    processed data is discarded by moving remaining data to the front of the buffer,
+    so memory usage is bounded no matter how long a session runs"""
+
+    # start byte, stuffed packet length (2 bytes) and stuffed crc (2 bytes)
+    HEADER_LENGTH = 9
+    # header, command with packet number (2 bytes) and stop byte
+    MINIMUM_PACKET_LENGTH = 12
+    # packet length is a 16-bit value, so this size can hold a couple of maximum size packets
+    DEFAULT_CAPACITY = 1024 * 1024
+
+    # start of packet (0xF0 does not always indicate a packet start, so check additionally for stuffing byte)
+    _START_SEQUENCE = bytes([Protocol.START_BYTE, Protocol.STUFFING_BYTE])
+    # start and stop byte are always stuffed inside a packet
+    _FRAMING_BYTE_PATTERN = re.compile(b"[\xF0\x0F]")
+
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        if capacity < 0xFFFF:
+            raise ValueError(f"Frame decoder capacity must be at least 65535 {capacity}")
+
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        # index in buffer where search for next packet continues
+        self._position = 0
+        # index in buffer where new data is written to
+        self._write_position = 0
+        # index in buffer up to which current packet candidate was checked for framing bytes
+        self._checked_position = 0
+        # number of bytes discarded because buffer was full
+        self._overflow_count = 0
+
+
+    @property
+    def buffer(self) -> bytes:
+        """Getter for data not yet returned as packet"""
+        return bytes(self._view[self._position:self._write_position])
+
+
+    @property
+    def capacity(self) -> int:
+        """Getter for capacity"""
+        return len(self._buffer)
+
+
+    @property
+    def overflow_count(self) -> int:
+        """Getter for number of received bytes that were discarded because buffer was full"""
+        return self._overflow_count
+
+
+    def feed(self, data: bytes):
+        """Copies data into internal buffer, packets returned from next_frame() are only valid until
+        this function is called again"""
+        data_length = len(data)
+        if data_length == 0:
+            return
+
+        capacity = len(self._buffer)
+        if self._write_position + data_length > capacity:
+            self._compact()
+
+            free = capacity - self._write_position
+            if data_length > free:
+                # not enough space, so discard oldest data
+                overflow = data_length - free
+                self._overflow_count += overflow
+                if data_length > capacity:
+                    data = memoryview(data)[data_length - capacity:]
+                    data_length = capacity
+                self._position += min(overflow, self._write_position)
+                self._checked_position = 0
+                self._compact()
+
+        self._view[self._write_position:self._write_position + data_length] = data
+        self._write_position += data_length
+
+
+    def next_frame(self) -> memoryview | None:
+        """Returns next complete and valid packet (still stuffed, from start to stop byte)
+        or None if there is no complete packet in buffer, returned packet is a view into internal buffer"""
+        buffer = self._buffer
+        buffer_length = self._write_position
+        while True:
+            start = buffer.find(FrameDecoder._START_SEQUENCE, self._position, buffer_length)
+            if start == -1:
+                # keep last byte, because it may be the start byte of next packet
+                self._position = max(self._position, buffer_length - 1)
+                return None
+
+            if start != self._position:
+                self._position = start
+                self._checked_position = 0
+
+            if buffer_length - start < FrameDecoder.HEADER_LENGTH:
+                # header is incomplete
+                return None
+
+            stop = self._find_stop(start)
+            if stop == -1:
+                # header is corrupted, so this is not a packet start
+                self._skip_candidate(start)
+                continue
+
+            if stop >= buffer_length:
+                # packet is incomplete, check that there is no unstuffed framing byte in received part,
+                # otherwise packet length is corrupted and we would wait for data that never belongs to this packet
+                check_start = max(self._checked_position, start + FrameDecoder.HEADER_LENGTH)
+                if FrameDecoder._FRAMING_BYTE_PATTERN.search(buffer, check_start, buffer_length) is not None:
+                    self._skip_candidate(start)
+                    continue
+
+                # remember checked range and wait for more data
+                self._checked_position = buffer_length
+                return None
+
+            frame = self._view[start:stop + 1]
+            if buffer[stop] == Protocol.STOP_BYTE and self._crc_matches(frame):
+                self._position = stop + 1
+                self._checked_position = 0
+                return frame
+
+            self._skip_candidate(start)
+
+
+    def frames(self) -> Iterator[memoryview]:
+        """Returns an iterator over all complete and valid packets in buffer, see next_frame()"""
+        while True:
+            frame = self.next_frame()
+            if frame is None:
+                return
+            yield frame
+
+
+    def clear(self):
+        """Discards all buffered data"""
+        self._position = 0
+        self._write_position = 0
+        self._checked_position = 0
+
+
+    def _compact(self):
+        """Moves data that is not processed yet to the front of the buffer"""
+        if self._position == 0:
+            return
+
+        remaining = self._write_position - self._position
+        self._view[0:remaining] = self._view[self._position:self._write_position]
+        self._checked_position = max(self._checked_position - self._position, 0)
+        self._position = 0
+        self._write_position = remaining
+
+
+    def _find_stop(self, start: int) -> int:
+        """Returns index of expected stop byte using packet length from header or -1 if header is invalid"""
+        buffer = self._buffer
+        # packet length and crc are always stuffed
+        if buffer[start + 3] != Protocol.STUFFING_BYTE or buffer[start + 5] != Protocol.STUFFING_BYTE\
+            or buffer[start + 7] != Protocol.STUFFING_BYTE:
+            return -1
+
+        packet_length = (Protocol.unstuff_byte(buffer[start + 2]) << 8) | Protocol.unstuff_byte(buffer[start + 4])
+        if packet_length < FrameDecoder.MINIMUM_PACKET_LENGTH:
+            return -1
+
+        return start + packet_length - 1
+
+
+    def _skip_candidate(self, start: int):
+        """Continue search for a packet start after start"""
+        self._position = start + 1
+        self._checked_position = 0
+
+
+    @staticmethod
+    def _crc_matches(frame: memoryview) -> bool:
+        """Checks crc of frame"""
+        crc = (Protocol.unstuff_byte(frame[6]) << 8) | Protocol.unstuff_byte(frame[8])
+        return crc == Crc16.crc16_xmodem(frame[FrameDecoder.HEADER_LENGTH:-1])
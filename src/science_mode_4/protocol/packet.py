@@ -4,6 +4,8 @@
 class Packet():
     """Base class for all packets"""
 
+    __slots__ = ("_command", "_kind", "_number")
+
 
     def __init__(self):
         self._command = -1
@@ -54,12 +56,20 @@ class Packet():
 
 
 class PacketAck(Packet):
-    """Base class for all acknowledge packets"""
+    """Base class for all acknowledge packets, raw payload is kept for lazy decoding in subclasses"""
+
+    __slots__ = ("_payload",)
 
 
     def __init__(self, data: bytes):
-        _ = data
         super().__init__()
+        self._payload = data
+
+
+    @property
+    def payload(self) -> bytes:
+        """Getter for raw payload"""
+        return self._payload
 
 
     def get_kind(self, data: bytes) -> int:
@@ -1,5 +1,6 @@
 """Provides a paket factory class"""
 
+from typing import Callable
 from .packet import Packet, PacketAck
 
 
@@ -7,12 +8,30 @@ class PacketFactory():
     """Packet factory class, it is possible to register multiple packet classes
     per command distinguished by kind"""
 
+    # number of subclasses of Packet, registered packets and dispatch tables of all subclasses of Packet,
+    # only build again if number of subclasses changed (e.g. a packet module was imported later)
+    # and copied for each instance
+    _default_tables: tuple[int, dict, dict, dict] = (-1, {}, {}, {})
+
 
     def __init__(self):
         # keys for dict: command, kind, packet class
         self.data: dict[int, int, Packet] = {}
-        # register all subclasses of Packet (exclude Packet and PacketAck, because these are base classes)
-        self.handle_class(Packet)
+        # dispatch tables for acknowledges, key for decoders is command and kind,
+        # key for kind extractors is command (only commands with multiple kinds have an extractor)
+        self._decoders: dict[tuple[int, int], Callable[[bytes], PacketAck]] = {}
+        self._kind_extractors: dict[int, Callable[[bytes], int]] = {}
+
+        class_count = PacketFactory._count_subclasses(Packet)
+        default_class_count, data, decoders, kind_extractors = PacketFactory._default_tables
+        if default_class_count == class_count:
+            self.data = dict(data)
+            self._decoders = dict(decoders)
+            self._kind_extractors = dict(kind_extractors)
+        else:
+            # register all subclasses of Packet (exclude Packet and PacketAck, because these are base classes)
+            self.handle_class(Packet)
+            PacketFactory._default_tables = class_count, dict(self.data), dict(self._decoders), dict(self._kind_extractors)
 
 
     def handle_class(self, cls: type[Packet]):
@@ -31,11 +50,23 @@ class PacketFactory():
             self.handle_class(x)
 
 
+    @staticmethod
+    def _count_subclasses(packet_class: type[Packet]) -> int:
+        """Returns number of all subclasses from packet_class, much cheaper than registering them"""
+        return sum(1 + PacketFactory._count_subclasses(x) for x in packet_class.__subclasses__())
+
+
     def register_packet(self, packet: Packet):
         """Register a packet"""
         # print(f"Register type {packet.__class__.__name__} command {packet.command} kind {packet.kind}")
         self.data[packet.command, packet.kind] = packet
 
+        if isinstance(packet, PacketAck):
+            self._decoders[packet.command, packet.kind] = packet.create_copy_with_data
+            # packet with default kind of -1 is able to read kind from data
+            if packet.kind == -1 and type(packet).get_kind is not PacketAck.get_kind:
+                self._kind_extractors[packet.command] = packet.get_kind
+
 
     def create_packet(self, command: int) -> Packet:
         """Create a packet based on command number"""
@@ -45,13 +76,9 @@ class PacketFactory():
 
     def create_packet_with_data(self, command: int, number: int, data: bytes) -> PacketAck:
         """Create a acknowledge packet based on command number with data"""
-        # we use default kind of -1 to have a packet class who is able to read kind from data
-        proto: PacketAck = self.data[command, -1]
-        copy = proto.create_copy_with_data(data)
-        # check if we have a specialized kind
-        kind = copy.get_kind(data)
-        if kind != -1:
-            proto = self.data[command, kind]
-            copy = proto.create_copy_with_data(data)
+        # check if we have a specialized kind, so data is only decoded once
+        kind_extractor = self._kind_extractors.get(command)
+        kind = -1 if kind_extractor is None else kind_extractor(data)
+        copy = self._decoders[command, kind](data)
         copy.number = number
         return copy
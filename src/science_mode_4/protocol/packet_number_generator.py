@@ -1,19 +1,90 @@
 """Provides a packet number generator"""
 
+import asyncio
+
 
 class PacketNumberGenerator():
-    """Packet number generator class that increases number for each packet by 1"""
+    """Packet number generator class that increases number for each packet by 1.
+
+    Numbers of requests waiting for an acknowledge can be reserved with acquire_number(), these numbers
+    are not handed out again until release_number() is called, so concurrent requests can be correlated
+    by packet number. Numbers of unanswered requests can be quarantined with quarantine_number() until
+    their late acknowledge arrived, so it is not correlated with a later request"""
+
+    # packet number is a 6-bit value
+    NUMBER_COUNT = 64
 
 
     def __init__(self):
         self._current_number = 0
+        self._in_use: set[int] = set()
+        self._quarantined: set[int] = set()
+        # created when a request waits for a number, so it belongs to running event loop
+        self._number_released: asyncio.Event | None = None
+
+
+    @property
+    def in_use_count(self) -> int:
+        """Getter for number of reserved packet numbers"""
+        return len(self._in_use)
+
+
+    @property
+    def quarantined_count(self) -> int:
+        """Getter for number of reserved packet numbers waiting for a late acknowledge"""
+        return len(self._quarantined)
 
 
     def get_next_number(self) -> int:
-        """Returns next packet number, this function modifies state of class"""
-        self._current_number += 1
-        # packet number is a 6-bit value
-        if self._current_number > 63:
-            self._current_number = 0
+        """Returns next packet number, this function modifies state of class.
+        Reserved numbers are skipped, if all numbers are reserved the next number is returned anyway"""
+        number = self._find_free_number()
+        if number is None:
+            number = (self._current_number + 1) % PacketNumberGenerator.NUMBER_COUNT
+            self._current_number = number
+        return number
+
+
+    async def acquire_number(self) -> int:
+        """Returns next free packet number and reserves it until release_number() is called,
+        waits if all numbers are reserved"""
+        while True:
+            number = self._find_free_number()
+            if number is not None:
+                self._in_use.add(number)
+                return number
+
+            if self._number_released is None:
+                self._number_released = asyncio.Event()
+            await self._number_released.wait()
+
+
+    def release_number(self, number: int):
+        """Releases number reserved with acquire_number()"""
+        self._in_use.discard(number)
+        self._quarantined.discard(number)
+        if self._number_released is not None:
+            # wake all waiting requests, event is created again by next waiting request in its event loop
+            self._number_released.set()
+            self._number_released = None
+
+
+    def quarantine_number(self, number: int, late_acknowledge: asyncio.Future):
+        """Keeps number reserved with acquire_number() until late_acknowledge is done (acknowledge
+        arrived or grace period elapsed, see ProtocolHelper.send_packet_and_wait()) and releases it afterwards"""
+        if late_acknowledge.done():
+            self.release_number(number)
+            return
+
+        self._quarantined.add(number)
+        late_acknowledge.add_done_callback(lambda _: self.release_number(number))
+
 
-        return self._current_number
+    def _find_free_number(self) -> int | None:
+        """Returns next number that is not reserved or None if all numbers are reserved"""
+        for x in range(1, PacketNumberGenerator.NUMBER_COUNT + 1):
+            number = (self._current_number + x) % PacketNumberGenerator.NUMBER_COUNT
+            if number not in self._in_use:
+                self._current_number = number
+                return number
+        return None
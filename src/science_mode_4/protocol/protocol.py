@@ -1,6 +1,7 @@
 """Provides helper class for ScienceMode protocol"""
 
-from science_mode_4.utils.byte_builder import ByteBuilder
+import re
+
 from science_mode_4.utils.crc16 import Crc16
 from .packet import Packet
 
@@ -13,42 +14,64 @@ class Protocol:
     STUFFING_BYTE = 0x81
     STUFFING_KEY = 0x55
 
+    # matches all bytes that needs to be stuffed (start, stop and stuffing byte)
+    _STUFF_PATTERN = re.compile(b"[\xF0\x0F\x81]")
+    # matches stuffing byte and its follower
+    _UNSTUFF_PATTERN = re.compile(b"\x81.", re.DOTALL)
+    # lookup tables with stuffed/unstuffed replacements
+    _STUFF_TABLE = {b"\xF0": b"\x81\xA5", b"\x0F": b"\x81\x5A", b"\x81": b"\x81\xD4"}
+    _UNSTUFF_TABLE = {bytes([0x81, x]): bytes([0x55 ^ x]) for x in range(256)}
+
 
     @staticmethod
     def packet_to_bytes(packet: Packet) -> bytes:
         """Builds bytes from a packet"""
-        # build payload
-        bb = ByteBuilder()
-        # command and packet number
-        bb.set_bit_to_position(packet.command, 0, 10)
-        bb.set_bit_to_position(packet.number, 10, 6)
-        # swap command and packet number to ensure little endianess
-        bb.swap(0, 2)
-        # append packet data
-        bb.append_bytes(packet.get_data())
-        # stuff packet data
-        stuffed_packet_data = Protocol.stuff(bb.get_bytes())
-
-        bb.clear()
+        result = bytearray()
+        Protocol.packet_to_buffer(packet, result)
+        # print(f"Outgoing {result.hex(" ").upper()}")
+        return bytes(result)
 
-        # stop byte
-        bb.append_byte(Protocol.START_BYTE)
+
+    @staticmethod
+    def packet_to_buffer(packet: Packet, target: bytearray) -> int:
+        """Builds bytes from a packet and appends them to target, returns number of appended bytes"""
+        # get payload before touching target, get_data() may raise (e.g. on invalid parameters)
+        data = packet.get_data()
+        if not isinstance(data, (bytes, bytearray)):
+            data = bytes(data)
+        return Protocol.raw_packet_to_buffer(packet.command, packet.number, data, target)
+
+
+    @staticmethod
+    def raw_packet_to_buffer(command: int, number: int, data: bytes, target: bytearray) -> int:
+        """Builds bytes from command, packet number and payload and appends them to target,
+        returns number of appended bytes"""
+        start = len(target)
+        try:
+            # start byte, packet length and crc are filled in after payload is stuffed
+            target += bytes(9)
+            # command (10 bits) and packet number (6 bits) are big endian
+            command_and_number = ((number & 0x3F) << 10) | (command & 0x3FF)
+            Protocol.stuff_into(command_and_number.to_bytes(2, "big"), target)
+            # append packet data
+            Protocol.stuff_into(data, target)
+        except BaseException:
+            # target may be shared with other packets, so never leave a partial frame behind
+            del target[start:]
+            raise
+
+        payload_start = start + 9
         # packet length
-        packet_length: int = len(stuffed_packet_data) + 10
-        bb.append_bytes(Protocol.stuff_byte(packet_length >> 8))
-        bb.append_bytes(Protocol.stuff_byte(packet_length))
+        packet_length = len(target) - payload_start + 10
         # crc
-        crc_16 = Crc16.crc16_xmodem(stuffed_packet_data)
-        bb.append_bytes(Protocol.stuff_byte(crc_16 >> 8))
-        bb.append_bytes(Protocol.stuff_byte(crc_16))
-        # payload
-        bb.append_bytes(stuffed_packet_data)
+        with memoryview(target) as view:
+            crc_16 = Crc16.crc16_xmodem(view[payload_start:])
+        target[start] = Protocol.START_BYTE
+        target[start + 1:payload_start] = Protocol.stuff_byte(packet_length >> 8) + Protocol.stuff_byte(packet_length) +\
+            Protocol.stuff_byte(crc_16 >> 8) + Protocol.stuff_byte(crc_16)
         # stop byte
-        bb.append_byte(Protocol.STOP_BYTE)
-
-        # print(f"Outgoing {bb}")
-        result = bb.get_bytes()
-        return bytes(result)
+        target.append(Protocol.STOP_BYTE)
+        return len(target) - start
 
 
     @staticmethod
@@ -97,53 +120,60 @@ class Protocol:
     @staticmethod
     def extract_packet_data(buffer: bytes) -> tuple[int, int, bytes]:
         """Extract command, packet number and payload from buffer and returns these as tuple, buffer must contain valid packet data"""
-        bb = ByteBuilder()
-        # command prefix with command and packet number may be stuffed and can be from 2 to 4 bytes long
-        command_prefix_count = 0
-        for _ in range(2):
-            if buffer[9+command_prefix_count] == Protocol.STUFFING_BYTE:
-                command_prefix_count += 2
-            else:
-                command_prefix_count += 1
-
-        bb.append_bytes(Protocol.unstuff(buffer[9:9+command_prefix_count]))
-        bb.swap(0, 2)
-
-        command = bb.get_bit_from_position(0, 10)
-        nr = bb.get_bit_from_position(10, 6)
-        payload = Protocol.unstuff(buffer[9+command_prefix_count:-1])
+        data = Protocol.unstuff(buffer[9:-1])
+        # command (10 bits) and packet number (6 bits) are big endian
+        command_and_number = (data[0] << 8) | data[1]
+        command = command_and_number & 0x3FF
+        nr = command_and_number >> 10
+        payload = data[2:]
 
         return command, nr, payload
 
 
     @staticmethod
     def stuff(packet_data: bytes) -> bytes:
-        """Stuff data"""
-        result: bytearray = bytearray()
-        for b in packet_data:
-            if b in [Protocol.START_BYTE, Protocol.STOP_BYTE, Protocol.STUFFING_BYTE]:
-                result.extend(Protocol.stuff_byte(b))
-            else:
-                result.append(b)
+        """Stuff data, bytes without need for stuffing are copied as a whole"""
+        if Protocol._STUFF_PATTERN.search(packet_data) is None:
+            return bytes(packet_data)
+        return Protocol._STUFF_PATTERN.sub(Protocol._stuff_match, packet_data)
 
-        return bytes(result)
+
+    @staticmethod
+    def stuff_into(packet_data: bytes, target: bytearray) -> int:
+        """Stuff data and append result to target, returns number of appended bytes"""
+        data = memoryview(packet_data)
+        length = len(target)
+        position = 0
+        for match in Protocol._STUFF_PATTERN.finditer(data):
+            start = match.start()
+            target += data[position:start]
+            target += Protocol._STUFF_TABLE[match.group()]
+            position = start + 1
+        target += data[position:]
+        return len(target) - length
 
 
     @staticmethod
     def unstuff(stuffed_packet_data: bytes) -> bytes:
-        """Unstuff data"""
-        result = bytearray()
-        index: int = 0
-        while index < len(stuffed_packet_data):
-            if stuffed_packet_data[index] == Protocol.STUFFING_BYTE:
-                index += 1
-                result.append(Protocol.unstuff_byte(stuffed_packet_data[index]))
-            else:
-                result.append(stuffed_packet_data[index])
+        """Unstuff data, bytes without stuffing are copied as a whole"""
+        if Protocol._UNSTUFF_PATTERN.search(stuffed_packet_data) is None:
+            return bytes(stuffed_packet_data)
+        return Protocol._UNSTUFF_PATTERN.sub(Protocol._unstuff_match, stuffed_packet_data)
 
-            index += 1
 
-        return bytes(result)
+    @staticmethod
+    def unstuff_into(stuffed_packet_data: bytes, target: bytearray) -> int:
+        """Unstuff data and append result to target, returns number of appended bytes"""
+        data = memoryview(stuffed_packet_data)
+        length = len(target)
+        position = 0
+        for match in Protocol._UNSTUFF_PATTERN.finditer(data):
+            start = match.start()
+            target += data[position:start]
+            target += Protocol._UNSTUFF_TABLE[match.group()]
+            position = start + 2
+        target += data[position:]
+        return len(target) - length
 
 
     @staticmethod
@@ -156,3 +186,15 @@ class Protocol:
     def unstuff_byte(b: int) -> int:
         """Unstuff a byte, b must be follower of stuffing byte"""
         return Protocol.STUFFING_KEY ^ (b & 0xFF)
+
+
+    @staticmethod
+    def _stuff_match(match: re.Match) -> bytes:
+        """Returns stuffed replacement for a match of _STUFF_PATTERN"""
+        return Protocol._STUFF_TABLE[match.group()]
+
+
+    @staticmethod
+    def _unstuff_match(match: re.Match) -> bytes:
+        """Returns unstuffed replacement for a match of _UNSTUFF_PATTERN"""
+        return Protocol._UNSTUFF_TABLE[match.group()]
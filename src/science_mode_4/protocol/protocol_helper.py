@@ -1,18 +1,19 @@
 """Helper class for sending packets to connection"""
 
 import asyncio
+import functools
 
-from science_mode_4.general.general_error import PacketGeneralError
-from science_mode_4.general.general_unknown_command import PacketGeneralUnknownCommand
 from science_mode_4.utils.packet_buffer import PacketBuffer
-from .protocol import Protocol
-from .commands import Commands
 from .packet import Packet, PacketAck
+from .packet_number_generator import PacketNumberGenerator
 
 
 class ProtocolHelper:
     """Helper class for Protocol"""
 
+    # time to wait for acknowledge of a request that ended without acknowledge (e.g. timeout)
+    LATE_ACKNOWLEDGE_GRACE_IN_SECONDS = 5.0
+
 
     @staticmethod
     def send_packet(packet: Packet, packet_number: int, packet_buffer: PacketBuffer) -> PacketAck:
@@ -21,46 +22,80 @@ class ProtocolHelper:
         packet_buffer.add_open_acknowledge(packet)
 
         # print(f"O {packet}")
-        packet_buffer.connection.write(Protocol.packet_to_bytes(packet))
+        packet_buffer.transmit_buffer.write_packet(packet)
 
 
     @staticmethod
-    async def send_packet_and_wait(packet: Packet, packet_number: int, packet_buffer: PacketBuffer, timeout_in_seconds = 5) -> PacketAck:
+    async def send_packet_and_wait(packet: Packet, packet_number: int, packet_buffer: PacketBuffer, timeout_in_seconds = 5,
+                                   packet_number_generator: PacketNumberGenerator | None = None) -> PacketAck:
         """Send a packet and wait for response, if no response arrives raise an exception,
         this function assumes that the response has the same packet number and ack command must be command+1
-        
-        Clears all incoming data from connection and packet buffer"""
 
-        # discard all packets because we don"t need them anymore
-        packet_buffer.clear_buffer()
-        ProtocolHelper.send_packet(packet, packet_number, packet_buffer)
+        Incoming data is not discarded, all packets that do not belong to this request are kept in packet buffer
+        stream queue (see PacketBuffer.get_packet_from_buffer()), so multiple requests can wait concurrently.
+
+        If no response arrives (timeout or cancellation), a late response is still waited for up to
+        LATE_ACKNOWLEDGE_GRACE_IN_SECONDS and discarded, so it is not taken as response of a later request.
+        If packet_number_generator is given, packet_number must be reserved with acquire_number(), it is
+        released when response arrived and quarantined until late response arrived otherwise."""
 
-        # calculate number of loops to reach timeout
-        sleep_duration = 0.01
-        counter = timeout_in_seconds / sleep_duration
-        while counter > 0:
+        packet.number = packet_number
+        future = packet_buffer.add_pending_acknowledge(packet)
+        is_sent = False
+        try:
+            ProtocolHelper.send_packet(packet, packet_number, packet_buffer)
+            is_sent = True
+            # we wait for a response, so packet must not wait for end of a batch
+            if packet_buffer.transmit_buffer.is_batching:
+                packet_buffer.transmit_buffer.flush()
+
+            loop = asyncio.get_running_loop()
+            start_time = loop.time()
+            deadline = start_time + timeout_in_seconds
             while True:
-                ack = packet_buffer.get_packet_from_buffer()
-                if ack:
-                    if (ack.command == packet.command + 1) and (ack.number == packet.number):
-                        return ack
+                # route all available packets, our acknowledge may also be routed by another waiting request
+                packet_buffer.process_incoming()
+                if future.done():
+                    ack = future.result()
+                    packet_buffer.statistics.add_request_latency(loop.time() - start_time)
+                    return ack
+
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+
+                # wait for new data or until another request routed our acknowledge
+                waiter = asyncio.ensure_future(packet_buffer.connection.wait_for_data(remaining))
+                await asyncio.wait((future, waiter), return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+        finally:
+            if future.done() or not is_sent:
+                packet_buffer.remove_pending_acknowledge(packet, future)
+                if packet_number_generator is not None:
+                    packet_number_generator.release_number(packet_number)
+            else:
+                # no response (timeout or cancelled), it may still arrive
+                ProtocolHelper._wait_for_late_acknowledge(packet, future, packet_buffer)
+                if packet_number_generator is not None:
+                    packet_number_generator.quarantine_number(packet_number, future)
 
-                    # check if we got an error
-                    if ack.command == Commands.GeneralError:
-                        ge: PacketGeneralError = ack
-                        raise ValueError(f"General error packet {ge.error}")
-                    if ack.command == Commands.UnkownCommand:
-                        uc: PacketGeneralUnknownCommand = ack
-                        raise ValueError(f"Unknown command packet {uc.error}")
+        # we got no response in time, so remove open acknowledges
+        packet_buffer.remove_open_acknowledge(packet)
+        raise ValueError(f"No valid answer for packet {packet.command}")
 
-                    # discard ackowledge and continue
 
-                # no acknowledge arrived, sleep and check again
-                break
+    @staticmethod
+    def _wait_for_late_acknowledge(packet: Packet, future: asyncio.Future, packet_buffer: PacketBuffer):
+        """Keeps future of packet pending until late acknowledge arrived (it is discarded) or grace period elapsed"""
+        handle = asyncio.get_running_loop().call_later(ProtocolHelper.LATE_ACKNOWLEDGE_GRACE_IN_SECONDS, future.cancel)
+        future.add_done_callback(functools.partial(ProtocolHelper._late_acknowledge_done, packet, packet_buffer, handle))
 
-            await asyncio.sleep(sleep_duration)
-            counter -= 1
 
-        # we got no response in time, so remove open acknowledges
-        packet_buffer.remove_open_acknowledge(packet)
-        raise ValueError(f"No valid answer for packet {packet.command}")
+    @staticmethod
+    def _late_acknowledge_done(packet: Packet, packet_buffer: PacketBuffer, handle: asyncio.TimerHandle, future: asyncio.Future):
+        """Called when late acknowledge arrived or grace period elapsed"""
+        handle.cancel()
+        packet_buffer.remove_pending_acknowledge(packet, future)
+        # late error packets are not of interest anymore
+        if not future.cancelled():
+            future.exception()
@@ -1,10 +1,16 @@
 """Init file for utils"""
 
+from .async_serial_port_connection import *
 from .bit_vector import *
 from .byte_builder import *
 from .connection import *
 from .crc16 import *
 from .null_connection import *
 from .packet_buffer import *
+from .packet_statistics import *
+from .recording_connection import *
+from .replay_connection import *
 from .serial_port_connection import *
+from .threaded_frame_reader import *
+from .transmit_buffer import *
 from .usb_connection import *
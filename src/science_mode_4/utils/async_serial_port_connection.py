@@ -0,0 +1,117 @@
+"""Provides a class for a serial connection, that notifies asyncio about incoming data"""
+
+import asyncio
+import serial
+from .serial_port_connection import SerialPortConnection
+
+
+class AsyncSerialPortConnection(SerialPortConnection):
+    """Serial connection class, that registers the serial port file descriptor at the running asyncio
+    event loop (loop.add_reader()), so incoming data is read as soon as it arrives and waiters in
+    wait_for_data() are woken up immediately. If the event loop does not support readers
+    (e.g. ProactorEventLoop on Windows) or event_loop_reader_enabled is False (e.g. while a
+    ThreadedFrameReader reads from this connection) it behaves like SerialPortConnection."""
+
+
+    def __init__(self, port: str):
+        super().__init__(port)
+        self._received = bytearray()
+        self._data_available = asyncio.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._reader_supported = True
+        self._event_loop_reader_enabled = True
+
+
+    @property
+    def event_loop_reader_enabled(self) -> bool:
+        """Getter for event loop reader enabled"""
+        return self._event_loop_reader_enabled
+
+
+    @event_loop_reader_enabled.setter
+    def event_loop_reader_enabled(self, value: bool):
+        """Setter for event loop reader enabled, must be False if another thread reads from this
+        connection (only one reader is allowed), disabling unregisters reader from event loop"""
+        self._event_loop_reader_enabled = value
+        if not value:
+            self._remove_reader()
+
+
+    def suspend_event_loop_reader(self):
+        self.event_loop_reader_enabled = False
+
+
+    def resume_event_loop_reader(self):
+        self.event_loop_reader_enabled = True
+
+
+    def close(self):
+        self._remove_reader()
+        super().close()
+
+
+    def read(self) -> bytes:
+        # read directly from port in case reader is not registered yet
+        self._received += super().read()
+        result = bytes(self._received)
+        self._received.clear()
+        self._data_available.clear()
+        return result
+
+
+    def clear_buffer(self):
+        super().clear_buffer()
+        self._received.clear()
+        self._data_available.clear()
+
+
+    async def wait_for_data(self, timeout_in_seconds: float):
+        if not self._add_reader():
+            await super().wait_for_data(timeout_in_seconds)
+            return
+
+        try:
+            await asyncio.wait_for(self._data_available.wait(), timeout_in_seconds)
+        except TimeoutError:
+            pass
+
+
+    def _add_reader(self) -> bool:
+        """Register reader at running event loop, returns True if reader is registered"""
+        if not self._reader_supported or not self._event_loop_reader_enabled or not self.is_open():
+            return False
+
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return True
+
+        self._remove_reader()
+        # event is bound to the loop it is used first with
+        self._data_available = asyncio.Event()
+        try:
+            loop.add_reader(self._ser.fileno(), self._on_readable)
+        except (NotImplementedError, AttributeError):
+            # event loop or serial implementation does not support readers
+            self._reader_supported = False
+            return False
+
+        self._loop = loop
+        return True
+
+
+    def _remove_reader(self):
+        """Unregister reader from event loop"""
+        if self._loop is not None:
+            if not self._loop.is_closed():
+                self._loop.remove_reader(self._ser.fileno())
+            self._loop = None
+
+
+    def _on_readable(self):
+        """Called by event loop when data is available"""
+        try:
+            self._received += self._ser.read(max(self._ser.in_waiting, 1))
+        except serial.SerialException:
+            # port is not usable anymore, wake up waiters and let next read report the error
+            self._remove_reader()
+        self._data_available.set()
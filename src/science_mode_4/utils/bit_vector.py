@@ -2,7 +2,7 @@
 
 
 class BitVector():
-    """Simple bitvector class"""
+    """Simple bitvector class, bits are stored in an integer (bit 0 is least significant bit)"""
 
 
     @staticmethod
@@ -14,10 +14,14 @@ class BitVector():
 
 
     def __init__(self):
-        self._data: list[int] = []
-        self._current = 0
+        self._value = 0
+        self._length = 0
 
-        self.set_from_int(0, 0)
+
+    @property
+    def value(self) -> int:
+        """Getter for all bits as integer"""
+        return self._value
 
 
     def set_from_int(self, value: int = 0, bit_length: int = 0):
@@ -25,78 +29,86 @@ class BitVector():
         bl = bit_length
         if bl == 0:
             bl = value.bit_length()
-        self._data = [0] * bl
-
-        for x in range(bl):
-            self._data[x] = (value >> x) & 0x1
+        self._value = value & ((1 << bl) - 1)
+        self._length = bl
 
 
     def __getitem__(self, index: int) -> int:
-        if (index < 0) or (index >= len(self._data)):
-            raise ValueError(f"Bit vector index out of bounds {index} [0 - {len(self._data)}]")
+        if (index < 0) or (index >= self._length):
+            raise ValueError(f"Bit vector index out of bounds {index} [0 - {self._length}]")
 
-        return self._data[index]
+        return (self._value >> index) & 0x1
 
 
     def __setitem__(self, index: int, value: int):
         if not value in {0, 1}:
             raise ValueError(f"Bit vector wrong value {value}")
-        if (index < 0) or (index >= len(self._data)):
-            raise ValueError(f"Bit vector index out of bounds {index} [0 - {len(self._data)}]")
+        if (index < 0) or (index >= self._length):
+            raise ValueError(f"Bit vector index out of bounds {index} [0 - {self._length}]")
 
-        self._data[index] = value
+        if value:
+            self._value |= 1 << index
+        else:
+            self._value &= ~(1 << index)
 
 
     def __len__(self) -> int:
-        return len(self._data)
+        return self._length
 
 
     def __iter__(self):
-        yield from self._data
+        value = self._value
+        for x in range(self._length):
+            yield (value >> x) & 0x1
+
+
+    def get_bits(self, position: int, count: int) -> int:
+        """Returns count bits starting with position as integer"""
+        if count <= 0:
+            return 0
+        if (position < 0) or (position + count > self._length):
+            raise ValueError(f"Bit vector index out of bounds {position + count - 1} [0 - {self._length}]")
+
+        return (self._value >> position) & ((1 << count) - 1)
+
+
+    def set_bits(self, value: int, position: int, count: int):
+        """Set count bits starting with position to lowest bits of value, extends length if necessary"""
+        if position < 0:
+            raise ValueError(f"Bit vector index out of bounds {position} [0 - {self._length}]")
+
+        mask = ((1 << count) - 1) << position
+        self._value = (self._value & ~mask) | ((value << position) & mask)
+        self._length = max(self._length, position + count)
+
+
+    def append_bits(self, value: int, count: int):
+        """Appends lowest count bits of value"""
+        self._value |= (value & ((1 << count) - 1)) << self._length
+        self._length += count
 
 
     def set_length(self, new_length: int):
         """Set length to new_length, does preserve current data"""
-        length_difference = new_length - len(self._data)
-        if length_difference > 0:
-            self.extend(BitVector.init_from_int(0, length_difference))
-        elif length_difference < 0:
-            self._data = self._data[0:new_length]
+        if new_length < self._length:
+            self._value &= (1 << new_length) - 1
+        self._length = new_length
 
 
     def extend(self, value: "BitVector"):
         """Extends current data with value"""
         if isinstance(value, BitVector):
-            self._data += value._data # pylint: disable=protected-access
+            self.append_bits(value.value, len(value))
 
 
     def get_bytes(self) -> bytes:
         """Convert to bytes"""
-        result = bytearray()
-        position = 0
-
-        value = 0
-        bit_counter = 0
-        bl = len(self._data)
-        while position < bl:
-            if bit_counter == 8:
-                result.append(value)
-                value = 0
-                bit_counter = 0
-
-            value |= self[position] << bit_counter
-            position += 1
-            bit_counter += 1
-
-        if bit_counter > 0:
-            result.append(value)
-
-        return bytes(result)
+        return self._value.to_bytes((self._length + 7) // 8, "little")
 
 
     def __repr__(self) -> str:
-        return f"{type(self).__name__}(0b{self._data: _b})"
+        return f"{type(self).__name__}(0b{self._value:_b})"
 
 
     def __str__(self) -> str:
-        return "0b" + format(self._data, "_b")
+        return "0b" + format(self._value, "_b")
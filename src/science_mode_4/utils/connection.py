@@ -1,11 +1,15 @@
 """Provides a base class for a connection"""
 
+import asyncio
 from abc import ABC, abstractmethod
 
 
 class Connection(ABC):
     """Abstract base class for connection"""
 
+    # interval used by wait_for_data() for connections without notification about incoming data
+    POLL_INTERVAL_IN_SECONDS = 0.01
+
 
     @abstractmethod
     def open(self):
@@ -35,3 +39,18 @@ class Connection(ABC):
     @abstractmethod
     def clear_buffer(self):
         """Clear buffer from connection"""
+
+
+    async def wait_for_data(self, timeout_in_seconds: float):
+        """Wait until new data may be available or timeout elapsed, override in subclasses
+        that get notified about incoming data. Default implementation waits for poll interval."""
+        await asyncio.sleep(min(timeout_in_seconds, self.POLL_INTERVAL_IN_SECONDS))
+
+
+    def suspend_event_loop_reader(self):
+        """Called before another thread reads from this connection (e.g. ThreadedFrameReader), connections
+        reading in event loop must stop it, because only one reader is allowed. Default implementation does nothing"""
+
+
+    def resume_event_loop_reader(self):
+        """Called after other thread stopped reading from this connection, see suspend_event_loop_reader()"""
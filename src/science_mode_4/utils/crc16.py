@@ -1,5 +1,12 @@
 """Provides a class for CRC16"""
 
+from typing import Callable, Iterable
+
+try:
+    from binascii import crc_hqx as _crc_hqx
+except ImportError:
+    _crc_hqx = None
+
 
 class Crc16:
     """Class for CRC16 checksum calculation"""
@@ -41,9 +48,68 @@ class Crc16:
             ]
 
 
+    IMPLEMENTATION_PYTHON = "python"
+    IMPLEMENTATION_BINASCII = "binascii"
+
     @staticmethod
     def crc16_xmodem(data: bytes, crc: int = 0) -> int:
-        """Calculate CRC-CCITT (XModem) variant of CRC16 for data with crc as initial value and returns result"""
+        """Calculate CRC-CCITT (XModem) variant of CRC16 for data with crc as initial value and returns result,
+        data can be any bytes-like object (bytes, bytearray, memoryview), use result as crc for next
+        call to calculate crc incremental"""
+        return Crc16._implementation(data, crc)
+
+
+    @staticmethod
+    def crc16_xmodem_chunks(chunks: Iterable[bytes], crc: int = 0) -> int:
+        """Calculate CRC-CCITT (XModem) variant of CRC16 over all chunks with crc as initial value,
+        result is the same as for the concatenated chunks"""
+        implementation = Crc16._implementation
+        for chunk in chunks:
+            crc = implementation(chunk, crc)
+        return crc
+
+
+    @staticmethod
+    def crc16_xmodem_combine(crc1: int, crc2: int, length2: int) -> int:
+        """Returns CRC-CCITT (XModem) of concatenated data from crc1 of first part and crc2 and length
+        of second part (both calculated with initial value 0), without accessing data"""
+        # crc is linear, so crc of concatenated data is crc1 shifted by length2 zero bytes xor crc2
+        index = 0
+        while length2 > 0 and crc1 != 0:
+            if length2 & 1:
+                crc1 = Crc16._multiply(Crc16._get_zero_bytes_table(index), crc1)
+            length2 >>= 1
+            index += 1
+        return crc1 ^ crc2
+
+
+    @staticmethod
+    def get_implementation() -> str:
+        """Returns name of currently used implementation"""
+        return Crc16._implementation_name
+
+
+    @staticmethod
+    def get_available_implementations() -> list[str]:
+        """Returns names of available implementations"""
+        return list(Crc16._implementations)
+
+
+    @staticmethod
+    def set_implementation(name: str):
+        """Select implementation used for crc calculation, by default the fastest available
+        implementation is used"""
+        if not name in Crc16._implementations:
+            raise ValueError(f"CRC16 implementation not available {name}")
+        Crc16._implementation_name = name
+        Crc16._implementation = Crc16._implementations[name]
+
+
+    @staticmethod
+    def _crc16_xmodem_python(data: bytes, crc: int) -> int:
+        """Pure Python implementation of CRC-CCITT (XModem)"""
+        if isinstance(data, memoryview) and data.format != "B":
+            data = data.cast("B")
         return Crc16._crc16(data, crc, Crc16.CRC16_XMODEM_TABLE)
 
 
@@ -53,3 +119,44 @@ class Crc16:
         for byte in data:
             crc = ((crc << 8) & 0xFF00) ^ table[((crc >> 8) & 0xFF) ^ byte]
         return crc & 0xFFFF
+
+
+    @staticmethod
+    def _get_zero_bytes_table(index: int) -> list[int]:
+        """Returns table to update a crc with 2**index zero bytes, entry x is result for crc 1 << x"""
+        tables = Crc16._zero_bytes_tables
+        while len(tables) <= index:
+            if len(tables) == 0:
+                tables.append([Crc16._crc16(b"\x00", 1 << x, Crc16.CRC16_XMODEM_TABLE) for x in range(16)])
+            else:
+                # applying table twice doubles number of zero bytes
+                tables.append([Crc16._multiply(tables[-1], x) for x in tables[-1]])
+        return tables[index]
+
+
+    @staticmethod
+    def _multiply(table: list[int], crc: int) -> int:
+        """Applies a table from _get_zero_bytes_table() to crc"""
+        result = 0
+        bit = 0
+        while crc != 0:
+            if crc & 1:
+                result ^= table[bit]
+            crc >>= 1
+            bit += 1
+        return result
+
+
+    # tables to update crc with 2**index zero bytes
+    _zero_bytes_tables: list[list[int]] = []
+
+    # all implementations take data (bytes-like object) and initial crc value
+    _implementations: dict[str, Callable[[bytes, int], int]] = {IMPLEMENTATION_PYTHON: _crc16_xmodem_python}
+    _implementation_name = IMPLEMENTATION_PYTHON
+    _implementation = _crc16_xmodem_python
+
+
+if _crc_hqx is not None:
+    # binascii.crc_hqx calculates CRC-CCITT (XModem) in C
+    Crc16._implementations[Crc16.IMPLEMENTATION_BINASCII] = _crc_hqx # pylint: disable=protected-access
+    Crc16.set_implementation(Crc16.IMPLEMENTATION_BINASCII)
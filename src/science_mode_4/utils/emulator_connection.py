@@ -0,0 +1,647 @@
+"""Provides a connection that emulates a science mode device"""
+
+import asyncio
+from dataclasses import dataclass, field
+import heapq
+import math
+import random
+import struct
+import time
+
+from science_mode_4.protocol.commands import Commands
+from science_mode_4.protocol.frame_decoder import FrameDecoder
+from science_mode_4.protocol.protocol import Protocol
+from science_mode_4.protocol.types import ResultAndError, StimStatus
+from science_mode_4.low_level.low_level_types import LowLevelMode, LowLevelResult
+from science_mode_4.dyscom.ads129x.ads129x import Ads129x
+from science_mode_4.dyscom.dyscom_types import DyscomFileByNameMode, DyscomFrequencyOut, DyscomGetOperationModeType,\
+    DyscomGetType, DyscomInitState, DyscomSignalType, DyscomSysState, DyscomSysType
+from .connection import Connection
+from .crc16 import Crc16
+
+
+@dataclass
+class _EmulatorSettings:
+    """Fault injection and live data/file transfer settings of emulator, kept on device reset"""
+    file_block_size: int
+    file_transfer_window: int
+    latency_in_seconds: float = 0.0
+    jitter_in_seconds: float = 0.0
+    corruption_rate: float = 0.0
+    max_read_size: int | None = None
+    live_data_sample_rate: float | None = None
+    live_data_signal_types: list[DyscomSignalType] | None = None
+
+
+@dataclass
+class _EmulatorTransport:
+    """Data in transit between host and emulated device"""
+    random: random.Random
+    frame_decoder: FrameDecoder = field(default_factory=FrameDecoder)
+    # data for host as heap of due time, sequence and bytes
+    outgoing: list[tuple[float, int, bytes]] = field(default_factory=list)
+    sequence: int = 0
+    last_due_time: float = 0.0
+    read_remainder: bytearray = field(default_factory=bytearray)
+
+
+@dataclass
+class _EmulatorStatistics:
+    """Packet and byte counters of emulator"""
+    received_packet_count: int = 0
+    send_packet_count: int = 0
+    live_data_packet_count: int = 0
+    corrupted_byte_count: int = 0
+
+
+@dataclass
+class _GeneralState:
+    """General state of emulated device"""
+    stim_status: StimStatus = StimStatus.NO_LEVEL_INITIALIZED
+
+
+@dataclass
+class _LowLevelState:
+    """Low level state of emulated device"""
+    mode: LowLevelMode = LowLevelMode.NO_MEASUREMENT
+
+
+@dataclass
+class _MidLevelState:
+    """Mid level state of emulated device"""
+    active_channels: int = 0
+
+
+@dataclass
+class _DyscomState:
+    """Dyscom measurement state of emulated device"""
+    operation_mode: DyscomGetOperationModeType = DyscomGetOperationModeType.IDLE
+    init_sample_rate: float = 4000
+    init_signal_types: list[DyscomSignalType] = field(default_factory=lambda: [DyscomSignalType.BI, DyscomSignalType.EMG_1])
+    live_data_start_time: float = 0.0
+    live_data_sample_index: int = 0
+    live_data_struct: struct.Struct | None = None
+
+
+@dataclass
+class _FileTransferState:
+    """Dyscom file transfer state of emulated device"""
+    current_file: str = ""
+    next_block: int = 0
+    block_count: int = 0
+    acked_block: int = -1
+
+
+class EmulatorConnection(Connection):
+    """Connection that implements the device side of the protocol in process (general, low level,
+    mid level and dyscom commands), e.g. for testing and benchmarking without hardware.
+
+    Dyscom live data is generated with the sample rate and signal types from dyscom init
+    (can be overridden with live_data_sample_rate and live_data_signal_types), each channel
+    is a sine wave and time offset is in microseconds. Files (name to content) are send
+    as DlSendFile blocks after dyscom get file by name, file checksum is CRC16-XMODEM.
+
+    All data send to host can be delayed by latency plus a random jitter and bytes can
+    be corrupted randomly with corruption_rate (probability per byte)."""
+
+    DEFAULT_FILE_BLOCK_SIZE = 512
+    DEFAULT_FILE_TRANSFER_WINDOW = 16
+    # frequency of sine wave of live data channels
+    LIVE_DATA_SIGNAL_FREQUENCY = 10.0
+
+    _frequency_out = {32000: DyscomFrequencyOut.SAMPLES_PER_SECOND_32K, 16000: DyscomFrequencyOut.SAMPLES_PER_SECOND_16K,
+                      8000: DyscomFrequencyOut.SAMPLES_PER_SECOND_8K, 4000: DyscomFrequencyOut.SAMPLES_PER_SECOND_4K,
+                      2000: DyscomFrequencyOut.SAMPLES_PER_SECOND_2K, 1000: DyscomFrequencyOut.SAMPLES_PER_SECOND_1K,
+                      500: DyscomFrequencyOut.SAMPLES_PER_SECOND_500, 250: DyscomFrequencyOut.SAMPLES_PER_SECOND_250}
+
+
+    def __init__(self, device_id: str = "0000000000", files: dict[str, bytes] | None = None, seed: int | None = None):
+        self._is_open = False
+        self._device_id = device_id
+        self._files: dict[str, bytes] = {} if files is None else dict(files)
+        self._settings = _EmulatorSettings(EmulatorConnection.DEFAULT_FILE_BLOCK_SIZE, EmulatorConnection.DEFAULT_FILE_TRANSFER_WINDOW)
+        self._transport = _EmulatorTransport(random.Random(seed))
+        self._statistics = _EmulatorStatistics()
+
+        self._reset_device_state()
+
+
+    @property
+    def files(self) -> dict[str, bytes]:
+        """Getter for files on emulated memory card"""
+        return self._files
+
+
+    @property
+    def latency_in_seconds(self) -> float:
+        """Getter for latency"""
+        return self._settings.latency_in_seconds
+
+
+    @latency_in_seconds.setter
+    def latency_in_seconds(self, value: float):
+        """Setter for latency, minimum time between device sending data and data being readable"""
+        self._settings.latency_in_seconds = value
+
+
+    @property
+    def jitter_in_seconds(self) -> float:
+        """Getter for jitter"""
+        return self._settings.jitter_in_seconds
+
+
+    @jitter_in_seconds.setter
+    def jitter_in_seconds(self, value: float):
+        """Setter for jitter, maximum random time added to latency (order of data is kept)"""
+        self._settings.jitter_in_seconds = value
+
+
+    @property
+    def corruption_rate(self) -> float:
+        """Getter for corruption rate"""
+        return self._settings.corruption_rate
+
+
+    @corruption_rate.setter
+    def corruption_rate(self, value: float):
+        """Setter for corruption rate, probability for each byte send to host to get a random bit flipped"""
+        self._settings.corruption_rate = value
+
+
+    @property
+    def max_read_size(self) -> int | None:
+        """Getter for max read size"""
+        return self._settings.max_read_size
+
+
+    @max_read_size.setter
+    def max_read_size(self, value: int | None):
+        """Setter for max read size, if not None read() returns at most value bytes to emulate fragmentation"""
+        self._settings.max_read_size = value
+
+
+    @property
+    def live_data_sample_rate(self) -> float | None:
+        """Getter for live data sample rate"""
+        return self._settings.live_data_sample_rate
+
+
+    @live_data_sample_rate.setter
+    def live_data_sample_rate(self, value: float | None):
+        """Setter for live data sample rate in live data packets per second, if None
+        output data rate from dyscom init is used"""
+        self._settings.live_data_sample_rate = value
+
+
+    @property
+    def live_data_signal_types(self) -> list[DyscomSignalType] | None:
+        """Getter for live data signal types"""
+        return self._settings.live_data_signal_types
+
+
+    @live_data_signal_types.setter
+    def live_data_signal_types(self, value: list[DyscomSignalType] | None):
+        """Setter for live data signal types (one channel per signal type), if None
+        signal types from dyscom init are used"""
+        self._settings.live_data_signal_types = value
+
+
+    @property
+    def file_block_size(self) -> int:
+        """Getter for file block size"""
+        return self._settings.file_block_size
+
+
+    @file_block_size.setter
+    def file_block_size(self, value: int):
+        """Setter for number of file bytes per DlSendFile block"""
+        self._settings.file_block_size = value
+
+
+    @property
+    def file_transfer_window(self) -> int:
+        """Getter for file transfer window"""
+        return self._settings.file_transfer_window
+
+
+    @file_transfer_window.setter
+    def file_transfer_window(self, value: int):
+        """Setter for maximum number of DlSendFile blocks send without acknowledge"""
+        self._settings.file_transfer_window = value
+
+
+    @property
+    def received_packet_count(self) -> int:
+        """Getter for number of packets received from host"""
+        return self._statistics.received_packet_count
+
+
+    @property
+    def send_packet_count(self) -> int:
+        """Getter for number of packets send to host"""
+        return self._statistics.send_packet_count
+
+
+    @property
+    def live_data_packet_count(self) -> int:
+        """Getter for number of live data packets send to host"""
+        return self._statistics.live_data_packet_count
+
+
+    @property
+    def corrupted_byte_count(self) -> int:
+        """Getter for number of corrupted bytes send to host"""
+        return self._statistics.corrupted_byte_count
+
+
+    def open(self):
+        self._is_open = True
+
+
+    def close(self):
+        self._is_open = False
+
+
+    def is_open(self) -> bool:
+        return self._is_open
+
+
+    def write(self, data: bytes):
+        self._transport.frame_decoder.feed(data)
+        for frame in self._transport.frame_decoder.frames():
+            self._statistics.received_packet_count += 1
+            self._handle_packet(*Protocol.extract_packet_data(frame))
+
+
+    def read(self) -> bytes:
+        now = time.perf_counter()
+        self._generate_live_data(now)
+
+        result = self._transport.read_remainder
+        outgoing = self._transport.outgoing
+        while outgoing and outgoing[0][0] <= now:
+            result += heapq.heappop(outgoing)[2]
+
+        if self._settings.max_read_size is not None and len(result) > self._settings.max_read_size:
+            self._transport.read_remainder = result[self._settings.max_read_size:]
+            del result[self._settings.max_read_size:]
+        else:
+            self._transport.read_remainder = bytearray()
+
+        if self._settings.corruption_rate > 0:
+            self._corrupt(result)
+        return bytes(result)
+
+
+    def clear_buffer(self):
+        self._transport.outgoing.clear()
+        self._transport.read_remainder.clear()
+
+
+    async def wait_for_data(self, timeout_in_seconds: float):
+        if self._transport.read_remainder:
+            return
+
+        due_time = self._get_next_due_time()
+        if due_time is None:
+            await asyncio.sleep(timeout_in_seconds)
+        else:
+            await asyncio.sleep(max(0.0, min(timeout_in_seconds, due_time - time.perf_counter())))
+
+
+    def _reset_device_state(self):
+        """Resets state of emulated device"""
+        self._general = _GeneralState()
+        self._low_level = _LowLevelState()
+        self._mid_level = _MidLevelState()
+        self._dyscom = _DyscomState()
+        self._file_transfer = _FileTransferState()
+
+
+    def _send(self, command: int, number: int, data: bytes):
+        """Schedules packet for host with latency and jitter"""
+        self._send_at(time.perf_counter(), command, number, data)
+
+
+    def _send_at(self, send_time: float, command: int, number: int, data: bytes):
+        """Schedules packet send by device at send_time for host"""
+        due_time = send_time + self._settings.latency_in_seconds
+        if self._settings.jitter_in_seconds > 0:
+            due_time += self._transport.random.uniform(0, self._settings.jitter_in_seconds)
+        # a serial line keeps order of data
+        due_time = max(due_time, self._transport.last_due_time)
+        self._transport.last_due_time = due_time
+
+        buffer = bytearray()
+        Protocol.raw_packet_to_buffer(command, number, data, buffer)
+        heapq.heappush(self._transport.outgoing, (due_time, self._transport.sequence, bytes(buffer)))
+        self._transport.sequence += 1
+        self._statistics.send_packet_count += 1
+
+
+    def _get_next_due_time(self) -> float | None:
+        """Returns time when next data for host is available or None if there is no data"""
+        due_time = self._transport.outgoing[0][0] if self._transport.outgoing else None
+        if self._dyscom.operation_mode == DyscomGetOperationModeType.LIVE_MEASURING:
+            live_due_time = self._get_live_data_send_time(self._dyscom.live_data_sample_index) + self._settings.latency_in_seconds
+            due_time = live_due_time if due_time is None else min(due_time, live_due_time)
+        return due_time
+
+
+    def _corrupt(self, data: bytearray):
+        """Flips a random bit of bytes with probability of corruption rate"""
+        rnd = self._transport.random
+        # distance to next corrupted byte is geometric distributed
+        position = -1
+        log_rate = math.log(1.0 - self._settings.corruption_rate) if self._settings.corruption_rate < 1 else None
+        while True:
+            position += 1 if log_rate is None else 1 + int(math.log(1.0 - rnd.random()) / log_rate)
+            if position >= len(data):
+                break
+            data[position] ^= 1 << rnd.randrange(8)
+            self._statistics.corrupted_byte_count += 1
+
+
+    def _handle_packet(self, command: int, number: int, data: bytes):
+        """Handles a packet from host"""
+        handler = EmulatorConnection._handlers.get(command)
+        if handler is None:
+            self._send(Commands.UnkownCommand, number, bytes([ResultAndError.PARAMETER_ERROR]))
+        else:
+            handler(self, number, data)
+
+
+    # general
+
+    def _handle_get_device_id(self, number: int, _data: bytes):
+        self._send(Commands.GetDeviceIdAck, number, bytes([ResultAndError.NO_ERROR]) + self._device_id.encode()[:10].ljust(10, b"\0"))
+
+
+    def _handle_reset(self, number: int, _data: bytes):
+        self._reset_device_state()
+        self._send(Commands.ResetAck, number, bytes([ResultAndError.NO_ERROR]))
+
+
+    def _handle_get_stim_status(self, number: int, _data: bytes):
+        high_voltage = 6 if self._general.stim_status != StimStatus.NO_LEVEL_INITIALIZED else 0
+        self._send(Commands.GetStimStatusAck, number, bytes([ResultAndError.NO_ERROR, self._general.stim_status, high_voltage]))
+
+
+    def _handle_get_extended_version(self, number: int, _data: bytes):
+        # firmware version, science mode version, firmware hash, hash type and valid hash
+        self._send(Commands.GetExtendedVersionAck, number, bytes([ResultAndError.NO_ERROR, 1, 0, 0, 4, 0, 0, 0, 0, 0, 0, 0, 0]))
+
+
+    # low level
+
+    def _handle_low_level_init(self, number: int, data: bytes):
+        self._low_level.mode = LowLevelMode((data[0] >> 4) & 0x07)
+        self._general.stim_status = StimStatus.LOW_LEVEL_INITIALIZED
+        self._send(Commands.LowLevelInitAck, number, bytes([ResultAndError.NO_ERROR]))
+
+
+    def _handle_low_level_channel_config(self, number: int, data: bytes):
+        connector = (data[0] >> 4) & 0x01
+        channel = (data[0] >> 5) & 0x03
+        execute_stimulation = (data[0] >> 7) & 0x01
+        if self._general.stim_status != StimStatus.LOW_LEVEL_INITIALIZED:
+            self._send(Commands.LowLevelChannelConfigAck, number,
+                       bytes([LowLevelResult.PARAMETER_ERROR, (connector << 4) | channel, LowLevelMode.NO_MEASUREMENT]))
+            return
+
+        mode = self._low_level.mode if execute_stimulation else LowLevelMode.NO_MEASUREMENT
+        ack = bytearray([LowLevelResult.SUCCESSFUL, (connector << 4) | channel, mode])
+        if mode != LowLevelMode.NO_MEASUREMENT:
+            # sampling time in microseconds and measurement samples in 1/100
+            ack += (10).to_bytes(2, "big")
+            ack += b"".join(min(int(1000 + 500 * math.sin(x / 10)), 0xFFFF).to_bytes(2, "big") for x in range(128))
+        self._send(Commands.LowLevelChannelConfigAck, number, bytes(ack))
+
+
+    def _handle_low_level_stop(self, number: int, _data: bytes):
+        self._general.stim_status = StimStatus.NO_LEVEL_INITIALIZED
+        self._send(Commands.LowLevelStopAck, number, bytes([ResultAndError.NO_ERROR]))
+
+
+    # mid level
+
+    def _handle_mid_level_init(self, number: int, _data: bytes):
+        self._general.stim_status = StimStatus.MID_LEVEL_INITIALIZED
+        self._send(Commands.MidLevelInitAck, number, bytes([ResultAndError.NO_ERROR]))
+
+
+    def _handle_mid_level_update(self, number: int, data: bytes):
+        if self._general.stim_status not in [StimStatus.MID_LEVEL_INITIALIZED, StimStatus.MID_LEVEL_RUNNING]:
+            self._send(Commands.MidLevelUpdateAck, number, bytes([ResultAndError.NOT_INITIALIZED]))
+            return
+
+        self._mid_level.active_channels = data[0] if len(data) > 0 else 0
+        self._general.stim_status = StimStatus.MID_LEVEL_RUNNING
+        self._send(Commands.MidLevelUpdateAck, number, bytes([ResultAndError.NO_ERROR]))
+
+
+    def _handle_mid_level_stop(self, number: int, _data: bytes):
+        self._mid_level.active_channels = 0
+        self._general.stim_status = StimStatus.NO_LEVEL_INITIALIZED
+        self._send(Commands.MidLevelStopAck, number, bytes([ResultAndError.NO_ERROR]))
+
+
+    def _handle_mid_level_get_current_data(self, number: int, _data: bytes):
+        active_channels = self._mid_level.active_channels if self._general.stim_status == StimStatus.MID_LEVEL_RUNNING else 0
+        # data selection 4 (errors of all channels), active channels and no channel errors
+        self._send(Commands.MidLevelGetCurrentDataAck, number, bytes([ResultAndError.NO_ERROR, 4, active_channels, 0, 0, 0, 0]))
+
+
+    # dyscom
+
+    def _handle_dyscom_init(self, number: int, data: bytes):
+        register_map = Ads129x()
+        register_map.set_data(data[0:26])
+        config_register_1 = register_map.config_register_1
+        # output data rate is halved in low power mode
+        self._dyscom.init_sample_rate = 32000 >> (config_register_1.output_data_rate + 1 - config_register_1.power_mode)
+        signal_type_count = int.from_bytes(data[343:345], "big")
+        self._dyscom.init_signal_types = [DyscomSignalType(x) for x in data[349:349 + min(signal_type_count, 8)]]
+        self._dyscom.operation_mode = DyscomGetOperationModeType.LIVE_MEASURING_PRE
+
+        frequency_out = EmulatorConnection._frequency_out.get(int(self._get_sample_rate()), DyscomFrequencyOut.UNUSED)
+        ack = bytes([ResultAndError.NO_ERROR]) + bytes(data[0:26]) + bytes(60) + bytes([DyscomInitState.SUCESS, frequency_out])
+        self._send(Commands.DlInitAck, number, ack)
+
+
+    def _handle_dyscom_start(self, number: int, _data: bytes):
+        self._send(Commands.DlStartAck, number, bytes([ResultAndError.NO_ERROR]))
+        signal_types = self._get_signal_types()
+        self._dyscom.live_data_struct = struct.Struct(">BI" + "fBB" * len(signal_types))
+        self._dyscom.live_data_start_time = time.perf_counter()
+        self._dyscom.live_data_sample_index = 0
+        self._dyscom.operation_mode = DyscomGetOperationModeType.LIVE_MEASURING
+
+
+    def _handle_dyscom_stop(self, number: int, _data: bytes):
+        self._generate_live_data(time.perf_counter())
+        self._dyscom.operation_mode = DyscomGetOperationModeType.IDLE
+        self._send(Commands.DlStopAck, number, bytes([ResultAndError.NO_ERROR]))
+
+
+    def _handle_dyscom_power_module(self, number: int, data: bytes):
+        self._send(Commands.DlPowerModuleAck, number, bytes([ResultAndError.NO_ERROR, data[0], data[1]]))
+
+
+    def _handle_dyscom_sys(self, number: int, data: bytes):
+        filename = EmulatorConnection._bytes_to_str(data[0:129])
+        sys_type = DyscomSysType(data[129])
+        if sys_type == DyscomSysType.DELETE_FILE:
+            self._files.pop(filename, None)
+        self._send(Commands.DlSysAck, number, bytes([ResultAndError.NO_ERROR, sys_type, DyscomSysState.SUCCESSFUL]) +
+                   EmulatorConnection._str_to_bytes(filename, 128))
+
+
+    def _handle_dyscom_get(self, number: int, data: bytes):
+        get_type = DyscomGetType(data[0])
+        header = bytes([ResultAndError.NO_ERROR, get_type])
+        if get_type == DyscomGetType.BATTERY:
+            # energy state, percentage, temperature, current and voltage
+            result = struct.pack("<BBbiI", 0, 100, 25, 0, 4100)
+        elif get_type == DyscomGetType.FILESYSTEM_STATUS:
+            used_size = sum(len(x) for x in self._files.values())
+            result = bytes([1]) + used_size.to_bytes(8, "little") + (2**32).to_bytes(8, "little")
+        elif get_type == DyscomGetType.LIST_OF_MEASUREMENT_META_INFO:
+            result = len(self._files).to_bytes(2, "little")
+        elif get_type == DyscomGetType.OPERATION_MODE:
+            result = bytes([self._dyscom.operation_mode])
+        elif get_type == DyscomGetType.DEVICE_ID:
+            result = EmulatorConnection._str_to_bytes(self._device_id, 128)
+        elif get_type == DyscomGetType.FIRMWARE_VERSION:
+            result = EmulatorConnection._str_to_bytes("1.0.0", 128)
+        elif get_type == DyscomGetType.FILE_INFO:
+            content = self._files.get(self._file_transfer.current_file, b"")
+            result = EmulatorConnection._str_to_bytes(self._file_transfer.current_file, 128) + len(content).to_bytes(4, "little") +\
+                Crc16.crc16_xmodem(content).to_bytes(2, "little")
+        else:
+            self._handle_dyscom_get_file_by_name(number, data)
+            return
+        self._send(Commands.DlGetAck, number, header + result)
+
+
+    def _handle_dyscom_get_file_by_name(self, number: int, data: bytes):
+        """Sends file information and starts sending file blocks beginning with requested block offset
+        (only this block in single block mode)"""
+        filename = EmulatorConnection._bytes_to_str(data[1:129])
+        if filename not in self._files:
+            # use first file, if no or unknown filename is requested
+            filename = next(iter(self._files), "")
+        content = self._files.get(filename, b"")
+        block_count = (len(content) + self._settings.file_block_size - 1) // self._settings.file_block_size
+        block_offset = min(int.from_bytes(data[129:133], "little"), block_count)
+        mode = data[145] if len(data) > 145 else DyscomFileByNameMode.MULTIBLOCK
+        ack = bytes([ResultAndError.NO_ERROR, DyscomGetType.FILE_BY_NAME]) + EmulatorConnection._str_to_bytes(filename, 128) +\
+            block_offset.to_bytes(4, "little") + len(content).to_bytes(8, "little") + block_count.to_bytes(4, "little") +\
+            bytes([DyscomFileByNameMode.MULTIBLOCK])
+        self._send(Commands.DlGetAck, number, ack)
+
+        self._file_transfer.current_file = filename
+        self._file_transfer.next_block = block_offset
+        # in single block mode only requested block is send
+        self._file_transfer.block_count = min(block_offset + 1, block_count) if mode == DyscomFileByNameMode.SINGLEBLOCK else block_count
+        self._file_transfer.acked_block = block_offset - 1
+        self._dyscom.operation_mode = DyscomGetOperationModeType.DATATRANSFER
+        self._send_file_blocks()
+
+
+    def _handle_dyscom_send_file_ack(self, _number: int, data: bytes):
+        block_number = int.from_bytes(data[0:4], "big")
+        self._file_transfer.acked_block = max(self._file_transfer.acked_block, block_number)
+        self._send_file_blocks()
+
+
+    def _send_file_blocks(self):
+        """Sends file blocks as long as window allows"""
+        content = self._files.get(self._file_transfer.current_file, b"")
+        block_size = self._settings.file_block_size
+        while self._file_transfer.next_block < self._file_transfer.block_count and \
+            self._file_transfer.next_block - self._file_transfer.acked_block <= self._settings.file_transfer_window:
+            block_number = self._file_transfer.next_block
+            block = content[block_number * block_size:(block_number + 1) * block_size]
+            self._send(Commands.DlSendFile, 0, block_number.to_bytes(4, "big") + len(block).to_bytes(2, "big") + block)
+            self._file_transfer.next_block += 1
+
+        if self._file_transfer.acked_block + 1 >= self._file_transfer.block_count and \
+            self._dyscom.operation_mode == DyscomGetOperationModeType.DATATRANSFER:
+            self._dyscom.operation_mode = DyscomGetOperationModeType.IDLE
+
+
+    def _get_sample_rate(self) -> float:
+        """Returns live data sample rate"""
+        return self._dyscom.init_sample_rate if self._settings.live_data_sample_rate is None else self._settings.live_data_sample_rate
+
+
+    def _get_signal_types(self) -> list[DyscomSignalType]:
+        """Returns live data signal types"""
+        return self._dyscom.init_signal_types if self._settings.live_data_signal_types is None else self._settings.live_data_signal_types
+
+
+    def _get_live_data_send_time(self, sample_index: int) -> float:
+        """Returns time when device sends live data packet with sample_index"""
+        return self._dyscom.live_data_start_time + (sample_index + 1) / self._get_sample_rate()
+
+
+    def _generate_live_data(self, now: float):
+        """Sends all live data packets up to now"""
+        if self._dyscom.operation_mode != DyscomGetOperationModeType.LIVE_MEASURING:
+            return
+
+        signal_types = self._get_signal_types()
+        sample_rate = self._get_sample_rate()
+        pack = self._dyscom.live_data_struct.pack
+        omega = 2 * math.pi * EmulatorConnection.LIVE_DATA_SIGNAL_FREQUENCY
+        sample_index = self._dyscom.live_data_sample_index
+        while True:
+            send_time = self._get_live_data_send_time(sample_index)
+            if send_time + self._settings.latency_in_seconds > now:
+                break
+            t = sample_index / sample_rate
+            time_offset = (sample_index * 1000000 // int(sample_rate)) & 0xFFFFFFFF
+            values = []
+            for channel, signal_type in enumerate(signal_types):
+                values += [math.sin(omega * t + channel), signal_type, 0]
+            self._send_at(send_time, Commands.DlSendLiveData, 0,
+                          pack(len(signal_types), time_offset, *values))
+            sample_index += 1
+            self._statistics.live_data_packet_count += 1
+        self._dyscom.live_data_sample_index = sample_index
+
+
+    @staticmethod
+    def _str_to_bytes(value: str, byte_count: int) -> bytes:
+        """Converts value to zero terminated bytes with byte_count bytes"""
+        return value.encode()[:byte_count - 1].ljust(byte_count, b"\0")
+
+
+    @staticmethod
+    def _bytes_to_str(value: bytes) -> str:
+        """Converts zero terminated bytes to str"""
+        end = value.find(0)
+        return bytes(value if end == -1 else value[:end]).decode(errors="replace")
+
+
+    _handlers = {
+        Commands.GetDeviceId: _handle_get_device_id,
+        Commands.Reset: _handle_reset,
+        Commands.GetStimStatus: _handle_get_stim_status,
+        Commands.GetExtendedVersion: _handle_get_extended_version,
+        Commands.LowLevelInit: _handle_low_level_init,
+        Commands.LowLevelChannelConfig: _handle_low_level_channel_config,
+        Commands.LowLevelStop: _handle_low_level_stop,
+        Commands.MidLevelInit: _handle_mid_level_init,
+        Commands.MidLevelUpdate: _handle_mid_level_update,
+        Commands.MidLevelStop: _handle_mid_level_stop,
+        Commands.MidLevelGetCurrentData: _handle_mid_level_get_current_data,
+        Commands.DlInit: _handle_dyscom_init,
+        Commands.DlStart: _handle_dyscom_start,
+        Commands.DlStop: _handle_dyscom_stop,
+        Commands.DlPowerModule: _handle_dyscom_power_module,
+        Commands.DlSys: _handle_dyscom_sys,
+        Commands.DlGet: _handle_dyscom_get,
+        Commands.DlSendFileAck: _handle_dyscom_send_file_ack,
+    }
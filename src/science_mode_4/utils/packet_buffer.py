@@ -1,19 +1,47 @@
 """Provides a packet buffer functionality for more async handling of packets and acknowledges"""
 
+import asyncio
+from collections import deque
+
 from science_mode_4.protocol.packet import Packet
 from science_mode_4.protocol.packet_factory import PacketFactory
 from science_mode_4.protocol.protocol import Protocol
+from science_mode_4.protocol.frame_decoder import FrameDecoder
 from science_mode_4.protocol.commands import Commands
 from .connection import Connection
+from .transmit_buffer import TransmitBuffer
+from .packet_statistics import PacketStatistics
+from .threaded_frame_reader import ThreadedFrameReader
+
+
+class PacketBuffer(): # pylint:disable=too-many-public-methods
+    """Class for handling a buffer and provides methods to take care of arriving acknowledges.
+
+    Acknowledges somebody waits for (see add_pending_acknowledge()) are routed to the waiting future,
+    all other packets (e.g. live data) are kept in a stream queue in order of arrival until they are
+    fetched with get_packet_from_buffer() or get_raw_packet_from_buffer(). Incoming data is never discarded
+    when waiting for an acknowledge.
+
+    Counters (stream_drop_count, overflow_count) are cumulative since creation."""
 
+    # maximum number of packets in stream queue, oldest packets are dropped when queue is full
+    DEFAULT_STREAM_CAPACITY = 65536
 
-class PacketBuffer():
-    """Class for handling a buffer and provides methods to take care of arriving acknowledges"""
 
-    def __init__(self, conn: Connection, packet_factory: PacketFactory):
-        self._buffer: bytes = b""
+    def __init__(self, conn: Connection, packet_factory: PacketFactory, buffer_size: int = FrameDecoder.DEFAULT_CAPACITY,
+                 stream_capacity: int = DEFAULT_STREAM_CAPACITY):
+        self._frame_decoder = FrameDecoder(buffer_size)
         self._open_acknowledges: dict[tuple[int, int], int] = {}
+        # keys for dict: ack command and packet number, futures in order of request
+        self._pending_acknowledges: dict[tuple[int, int], deque[asyncio.Future]] = {}
+        # raw packets (command, packet number, payload) not routed to a pending acknowledge
+        self._stream: deque[tuple[int, int, bytes]] = deque(maxlen=stream_capacity)
+        self._stream_drop_count = 0
+        self._statistics = PacketStatistics()
         self._connection = conn
+        # discarded packets are not send, so nobody waits for their acknowledge
+        self._transmit_buffer = TransmitBuffer(conn, self.remove_open_acknowledge)
+        self._reader: ThreadedFrameReader | None = None
         self._packet_factory = packet_factory
 
 
@@ -23,15 +51,82 @@ class PacketBuffer():
         return self._connection
 
 
+    @property
+    def transmit_buffer(self) -> TransmitBuffer:
+        """Getter for transmit buffer, all outgoing packets are send via transmit buffer"""
+        return self._transmit_buffer
+
+
     @property
     def buffer(self) -> bytes:
-        """Getter for buffer"""
-        return self._buffer
+        """Getter for buffer (data that was not yet returned as packet)"""
+        return self._frame_decoder.buffer
+
+
+    @property
+    def overflow_count(self) -> int:
+        """Getter for number of received bytes that were discarded because buffer was full"""
+        return self._frame_decoder.overflow_count
+
+
+    @property
+    def stream_count(self) -> int:
+        """Getter for number of packets waiting in stream queue"""
+        return len(self._stream)
+
+
+    @property
+    def stream_drop_count(self) -> int:
+        """Getter for number of packets dropped because stream queue was full"""
+        return self._stream_drop_count
+
+
+    @property
+    def statistics(self) -> PacketStatistics:
+        """Getter for received packet and request latency statistics"""
+        return self._statistics
+
+
+    @property
+    def reader(self) -> ThreadedFrameReader | None:
+        """Getter for reader thread, None if reader thread is not started"""
+        return self._reader
+
+
+    def start_reader_thread(self, queue_capacity: int = ThreadedFrameReader.DEFAULT_QUEUE_CAPACITY):
+        """Starts a dedicated thread that reads continuously from connection and decodes packets,
+        afterwards packets are taken from reader queue instead of reading from connection,
+        so a slow consumer does not let the connection buffer overflow. If reader thread stops
+        because of an exception, it is raised when all packets in reader queue were taken"""
+        if self._reader is not None:
+            return
+
+        self._reader = ThreadedFrameReader(self._connection, self._frame_decoder.capacity, queue_capacity)
+        self._reader.start()
+
+
+    def stop_reader_thread(self):
+        """Stops reader thread, packets still in reader queue are moved to stream queue"""
+        if self._reader is None:
+            return
+
+        self._reader.stop()
+        reader = self._reader
+        self._reader = None
+        while True:
+            raw_packet = reader.get_raw_packet()
+            if raw_packet is None:
+                break
+            self._account_acknowledge(raw_packet)
+            if not self._route_to_pending(raw_packet):
+                self._append_to_stream(raw_packet)
 
 
     def update_buffer(self):
-        """Reads all data from connection and appends to internal buffer"""
-        self._buffer += self._connection.read()
+        """Reads all data from connection and appends to internal buffer, does nothing
+        if reader thread is running"""
+        if self._reader is None:
+            self._frame_decoder.feed(self._connection.read())
 
 
     def add_open_acknowledge(self, packet: Packet):
@@ -58,35 +153,165 @@ class PacketBuffer():
             print(f"{key} {value}")
 
 
+    def add_pending_acknowledge(self, packet: Packet) -> asyncio.Future:
+        """Returns a future, that receives the acknowledge for packet (ack command must be command+1 with same packet number).
+        The future gets a ValueError as exception, if a general error or unknown command packet with same packet
+        number arrives. Packet number must be set before calling this function."""
+        future = asyncio.get_running_loop().create_future()
+        key = packet.command + 1, packet.number
+        self._pending_acknowledges.setdefault(key, deque()).append(future)
+        return future
+
+
+    def remove_pending_acknowledge(self, packet: Packet, future: asyncio.Future):
+        """Remove future returned by add_pending_acknowledge(), e.g. after a timeout"""
+        key = packet.command + 1, packet.number
+        futures = self._pending_acknowledges.get(key)
+        if futures is not None and future in futures:
+            futures.remove(future)
+            if not futures:
+                del self._pending_acknowledges[key]
+
+
+    def process_incoming(self, do_update_buffer = True):
+        """Decodes all complete packets, routes acknowledges to pending futures and
+        appends all other packets to stream queue"""
+        if do_update_buffer:
+            self.update_buffer()
+
+        while True:
+            raw_packet = self._decode_next_raw_packet()
+            if raw_packet is None:
+                break
+            if not self._route_to_pending(raw_packet):
+                self._append_to_stream(raw_packet)
+
+
     def get_packet_from_buffer(self, do_update_buffer = True) -> Packet | None:
         """Search for a valid packet in buffer and returns found packet. Does adjust internal buffer accordingly.
         Returns None if no valid packet was found
         """
+        raw_packet = self.get_raw_packet_from_buffer(do_update_buffer)
+        if raw_packet is None:
+            return None
+
+        return self.create_packet(raw_packet)
+
+
+    def get_raw_packet_from_buffer(self, do_update_buffer = True) -> tuple[int, int, bytes] | None:
+        """Search for a valid packet in buffer and returns command, packet number and payload of found packet
+        without creating a packet object (e.g. to decode many live data packets at once with DyscomLiveDataDecoder).
+        Does adjust internal buffer accordingly. Returns None if no valid packet was found
+        """
+        if self._stream:
+            return self._stream.popleft()
+
         if do_update_buffer:
             self.update_buffer()
 
-        start_stop = Protocol.find_packet_in_buffer(self._buffer)
-        if start_stop is None:
-            return None
+        while True:
+            raw_packet = self._decode_next_raw_packet()
+            if raw_packet is None or not self._route_to_pending(raw_packet):
+                return raw_packet
 
-        packet_data = self._buffer[start_stop[0]: start_stop[1] + 1]
-        ack_data = Protocol.extract_packet_data(packet_data)
+
+    def create_packet(self, raw_packet: tuple[int, int, bytes]) -> Packet:
+        """Creates packet object from result of get_raw_packet_from_buffer()"""
+        return self._packet_factory.create_packet_with_data(*raw_packet)
+
+
+    def clear_buffer(self):
+        """Clear internal buffer, stream queue and buffer from connection"""
+        if self._reader is None:
+            self._connection.clear_buffer()
+        else:
+            # reader thread is the only one allowed to read from connection, so it clears connection
+            self._reader.clear()
+        self._frame_decoder.clear()
+        self._stream.clear()
+
+
+    def _decode_next_raw_packet(self) -> tuple[int, int, bytes] | None:
+        """Returns command, packet number and payload of next complete packet or None"""
+        if self._reader is not None:
+            # error is set after last packet was queued, so get it before queue is checked
+            error = self._reader.error
+            ack_data = self._reader.get_raw_packet()
+            if ack_data is None:
+                if error is not None:
+                    # reader thread stopped, e.g. connection was closed
+                    raise error
+                return None
+        else:
+            packet_data = self._frame_decoder.next_frame()
+            if packet_data is None:
+                return None
+            ack_data = Protocol.extract_packet_data(packet_data)
+
+        self._account_acknowledge(ack_data)
+        return ack_data
+
+
+    def _account_acknowledge(self, ack_data: tuple[int, int, bytes]):
+        """Updates open acknowledges and statistics for arrived packet"""
+        self._statistics.add_received_packet(len(ack_data[2]))
         # check if we wait for this acknowledge
         key = ack_data[0], ack_data[1]
         wait_ack = self._open_acknowledges.get(key)
         if wait_ack is None:
-            if ack_data[0] not in [Commands.DlSendLiveData]:
+            # live data and file blocks are send by device without request
+            if ack_data[0] not in [Commands.DlSendLiveData, Commands.DlSendFile]:
                 print(f"Unexpected acknowledge command {ack_data[0]}, number {ack_data[1]}")
         else:
             self._open_acknowledges[ack_data[0], ack_data[1]] -= 1
 
-        # remove from buffer
-        self._buffer = self._buffer[start_stop[0] + start_stop[1] + 1:]
-        ack = self._packet_factory.create_packet_with_data(ack_data[0], ack_data[1], ack_data[2])
-        return ack
 
+    def _route_to_pending(self, raw_packet: tuple[int, int, bytes]) -> bool:
+        """Hands packet to pending future, returns False if nobody waits for this packet"""
+        if not self._pending_acknowledges:
+            return False
 
-    def clear_buffer(self):
-        """Clear internal buffer and buffer from connection"""
-        self._connection.clear_buffer()
-        self._buffer = b""
+        command, number, _ = raw_packet
+        if command in [Commands.GeneralError, Commands.UnkownCommand]:
+            return self._route_error_to_pending(raw_packet)
+
+        future = self._pop_pending((command, number))
+        if future is None:
+            return False
+
+        future.set_result(self._packet_factory.create_packet_with_data(*raw_packet))
+        return True
+
+
+    def _route_error_to_pending(self, raw_packet: tuple[int, int, bytes]) -> bool:
+        """Hands error packet as exception to pending future with same packet number"""
+        command, number, _ = raw_packet
+        for key in list(self._pending_acknowledges):
+            if key[1] == number:
+                future = self._pop_pending(key)
+                packet = self._packet_factory.create_packet_with_data(*raw_packet)
+                if command == Commands.GeneralError:
+                    future.set_exception(ValueError(f"General error packet {packet.result_error.name}"))
+                else:
+                    future.set_exception(ValueError(f"Unknown command packet {packet.result_error.name}"))
+                return True
+        return False
+
+
+    def _pop_pending(self, key: tuple[int, int]) -> asyncio.Future | None:
+        """Removes and returns oldest not cancelled future for key"""
+        futures = self._pending_acknowledges.get(key)
+        while futures:
+            future = futures.popleft()
+            if not futures:
+                del self._pending_acknowledges[key]
+            if not future.done():
+                return future
+        return None
+
+
+    def _append_to_stream(self, raw_packet: tuple[int, int, bytes]):
+        """Append raw packet to stream queue, drop oldest packet if queue is full"""
+        if len(self._stream) == self._stream.maxlen:
+            self._stream_drop_count += 1
+        self._stream.append(raw_packet)
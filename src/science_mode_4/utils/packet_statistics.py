@@ -0,0 +1,67 @@
+"""Provides a class for throughput and latency statistics of a packet buffer"""
+
+
+class PacketStatistics():
+    """Class for counting received packets and measuring time between request and response"""
+
+
+    def __init__(self):
+        self._received_packet_count = 0
+        self._received_payload_byte_count = 0
+        self._request_count = 0
+        self._request_latency_sum = 0.0
+        self._request_latency_max = 0.0
+
+
+    @property
+    def received_packet_count(self) -> int:
+        """Getter for number of received packets"""
+        return self._received_packet_count
+
+
+    @property
+    def received_payload_byte_count(self) -> int:
+        """Getter for number of received payload bytes (without protocol overhead)"""
+        return self._received_payload_byte_count
+
+
+    @property
+    def request_count(self) -> int:
+        """Getter for number of requests that got a response"""
+        return self._request_count
+
+
+    @property
+    def mean_request_latency(self) -> float:
+        """Getter for mean time in seconds between sending a request and receiving its response"""
+        if self._request_count == 0:
+            return 0.0
+        return self._request_latency_sum / self._request_count
+
+
+    @property
+    def max_request_latency(self) -> float:
+        """Getter for maximum time in seconds between sending a request and receiving its response"""
+        return self._request_latency_max
+
+
+    def add_received_packet(self, payload_length: int):
+        """Adds received packet to statistics"""
+        self._received_packet_count += 1
+        self._received_payload_byte_count += payload_length
+
+
+    def add_request_latency(self, latency_in_seconds: float):
+        """Adds time between sending a request and receiving its response to statistics"""
+        self._request_count += 1
+        self._request_latency_sum += latency_in_seconds
+        self._request_latency_max = max(self._request_latency_max, latency_in_seconds)
+
+
+    def reset(self):
+        """Resets all statistics"""
+        self._received_packet_count = 0
+        self._received_payload_byte_count = 0
+        self._request_count = 0
+        self._request_latency_sum = 0.0
+        self._request_latency_max = 0.0
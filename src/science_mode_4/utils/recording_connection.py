@@ -0,0 +1,143 @@
+"""Provides a connection wrapper that records all data to a file"""
+
+import struct
+import threading
+import time
+from enum import IntEnum
+from typing import BinaryIO, NamedTuple
+
+from .connection import Connection
+
+
+class ConnectionRecordDirection(IntEnum):
+    """Represents direction of recorded data"""
+    READ = 0
+    WRITE = 1
+
+
+class ConnectionRecord(NamedTuple):
+    """Represents a chunk of data read from or written to a connection"""
+    # nanoseconds since connection was opened (monotonic clock)
+    timestamp: int
+    direction: ConnectionRecordDirection
+    data: bytes
+
+
+class RecordingConnection(Connection):
+    """Connection wrapper that forwards all calls to another connection and records each chunk
+    of read and written data with a monotonic timestamp to a file. Chunks are recorded as they
+    were returned by read(), so fragmentation of the original connection is kept.
+
+    File starts with FILE_MAGIC followed by records (direction, timestamp in nanoseconds
+    and length as little endian header followed by data). read() and write() may be called
+    from different threads (e.g. ThreadedFrameReader), records are written atomically."""
+
+    FILE_MAGIC = b"SM4REC\x00\x01"
+    _record_header = struct.Struct("<BQI")
+
+
+    def __init__(self, conn: Connection, filename: str):
+        self._connection = conn
+        self._filename = filename
+        self._file: BinaryIO | None = None
+        self._start_time = 0
+        self._record_count = 0
+        self._lock = threading.Lock()
+
+
+    @property
+    def connection(self) -> Connection:
+        """Getter for recorded connection"""
+        return self._connection
+
+
+    @property
+    def record_count(self) -> int:
+        """Getter for number of records written to file"""
+        return self._record_count
+
+
+    def open(self):
+        self._connection.open()
+        with self._lock:
+            self._file = open(self._filename, "wb") # pylint:disable=consider-using-with
+            self._file.write(RecordingConnection.FILE_MAGIC)
+            self._start_time = time.monotonic_ns()
+            self._record_count = 0
+
+
+    def close(self):
+        self._connection.close()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+    def is_open(self) -> bool:
+        return self._connection.is_open()
+
+
+    def write(self, data: bytes):
+        self._record(ConnectionRecordDirection.WRITE, data)
+        self._connection.write(data)
+
+
+    def read(self) -> bytes:
+        data = self._connection.read()
+        self._record(ConnectionRecordDirection.READ, data)
+        return data
+
+
+    def clear_buffer(self):
+        self._connection.clear_buffer()
+
+
+    async def wait_for_data(self, timeout_in_seconds: float):
+        await self._connection.wait_for_data(timeout_in_seconds)
+
+
+    def suspend_event_loop_reader(self):
+        self._connection.suspend_event_loop_reader()
+
+
+    def resume_event_loop_reader(self):
+        self._connection.resume_event_loop_reader()
+
+
+    @staticmethod
+    def read_records(filename: str) -> list[ConnectionRecord]:
+        """Reads all records from a file written by RecordingConnection"""
+        with open(filename, "rb") as f:
+            data = f.read()
+
+        magic_length = len(RecordingConnection.FILE_MAGIC)
+        if data[:magic_length] != RecordingConnection.FILE_MAGIC:
+            raise ValueError(f"File is not a connection recording {filename}")
+
+        result: list[ConnectionRecord] = []
+        header = RecordingConnection._record_header
+        position = magic_length
+        while position + header.size <= len(data):
+            direction, timestamp, length = header.unpack_from(data, position)
+            position += header.size
+            if position + length > len(data):
+                # last record is incomplete, e.g. recording was not closed
+                break
+            result.append(ConnectionRecord(timestamp, ConnectionRecordDirection(direction), data[position:position + length]))
+            position += length
+        return result
+
+
+    def _record(self, direction: ConnectionRecordDirection, data: bytes):
+        """Writes a record to file, empty data is not recorded"""
+        if len(data) == 0:
+            return
+
+        with self._lock:
+            if self._file is None:
+                return
+            timestamp = time.monotonic_ns() - self._start_time
+            # header and data with one write, so records of different threads do not interleave
+            self._file.write(RecordingConnection._record_header.pack(direction, timestamp, len(data)) + data)
+            self._record_count += 1
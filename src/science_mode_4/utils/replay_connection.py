@@ -0,0 +1,117 @@
+"""Provides a connection that replays data recorded by RecordingConnection"""
+
+import asyncio
+import time
+
+from .connection import Connection
+from .recording_connection import ConnectionRecord, ConnectionRecordDirection, RecordingConnection
+
+
+class ReplayConnection(Connection):
+    """Connection that returns data read during a recorded session (see RecordingConnection),
+    written data is ignored.
+
+    With original timing, read() returns all chunks whose timestamp elapsed since open()
+    (speed scales time). Otherwise data is replayed as fast as possible and each read()
+    returns exactly one recorded chunk, so fragmentation of original connection is kept."""
+
+
+    def __init__(self, filename: str | None = None, records: list[ConnectionRecord] | None = None,
+                 original_timing: bool = True, speed: float = 1.0):
+        if records is None:
+            if filename is None:
+                raise ValueError("Filename or records must be provided")
+            records = RecordingConnection.read_records(filename)
+
+        self._chunks = [x for x in records if x.direction == ConnectionRecordDirection.READ]
+        self._original_timing = original_timing
+        self._speed = speed
+        self._position = 0
+        self._start_time = 0
+        self._is_open = False
+        self._written_byte_count = 0
+
+
+    @property
+    def chunk_count(self) -> int:
+        """Getter for number of recorded chunks"""
+        return len(self._chunks)
+
+
+    @property
+    def byte_count(self) -> int:
+        """Getter for number of recorded bytes"""
+        return sum(len(x.data) for x in self._chunks)
+
+
+    @property
+    def duration_in_seconds(self) -> float:
+        """Getter for duration of recording"""
+        return self._chunks[-1].timestamp / 1e9 if self._chunks else 0.0
+
+
+    @property
+    def is_finished(self) -> bool:
+        """Getter for replay state, true if all chunks were returned"""
+        return self._position >= len(self._chunks)
+
+
+    @property
+    def written_byte_count(self) -> int:
+        """Getter for number of bytes written (and ignored) during replay"""
+        return self._written_byte_count
+
+
+    def open(self):
+        self._position = 0
+        self._start_time = time.monotonic_ns()
+        self._is_open = True
+
+
+    def close(self):
+        self._is_open = False
+
+
+    def is_open(self) -> bool:
+        return self._is_open
+
+
+    def write(self, data: bytes):
+        self._written_byte_count += len(data)
+
+
+    def read(self) -> bytes:
+        if self.is_finished:
+            return bytes()
+
+        if not self._original_timing:
+            self._position += 1
+            return self._chunks[self._position - 1].data
+
+        elapsed_time = self._get_elapsed_time()
+        start = self._position
+        while self._position < len(self._chunks) and self._chunks[self._position].timestamp <= elapsed_time:
+            self._position += 1
+        return b"".join(x.data for x in self._chunks[start:self._position])
+
+
+    def clear_buffer(self):
+        if self._original_timing:
+            # skip all chunks already due
+            self.read()
+
+
+    async def wait_for_data(self, timeout_in_seconds: float):
+        if self.is_finished:
+            await asyncio.sleep(timeout_in_seconds)
+        elif self._original_timing:
+            due_in_seconds = (self._chunks[self._position].timestamp - self._get_elapsed_time()) / 1e9 / self._speed
+            await asyncio.sleep(max(0.0, min(timeout_in_seconds, due_in_seconds)))
+        else:
+            # data is available immediately, but let other tasks run
+            await asyncio.sleep(0)
+
+
+    def _get_elapsed_time(self) -> int:
+        """Returns elapsed replay time in nanoseconds of recording time"""
+        return int((time.monotonic_ns() - self._start_time) * self._speed)
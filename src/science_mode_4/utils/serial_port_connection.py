@@ -32,7 +32,9 @@ class SerialPortConnection(Connection):
 
     def open(self):
         self._ser.open()
-        self._ser.set_buffer_size(4096*128)
+        # only available on Windows
+        if hasattr(self._ser, "set_buffer_size"):
+            self._ser.set_buffer_size(4096*128)
 
 
     def close(self):
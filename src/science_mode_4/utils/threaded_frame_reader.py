@@ -0,0 +1,171 @@
+"""Provides a background thread that reads and decodes packets from a connection"""
+
+import threading
+import time
+from collections import deque
+
+from science_mode_4.protocol.protocol import Protocol
+from science_mode_4.protocol.frame_decoder import FrameDecoder
+from .connection import Connection
+
+
+class ThreadedFrameReader():
+    """Reads continuously from connection in a dedicated thread, decodes frames and hands
+    command, packet number and payload of each packet to consumer via a bounded queue.
+
+    Queue has exactly one producer (reader thread) and one consumer, deque.append() and
+    deque.popleft() are atomic, so no lock is necessary. If queue is full, oldest packets are dropped.
+    While thread is running, it is the only one reading from connection (see Connection.suspend_event_loop_reader()),
+    clear() is executed by reader thread between two reads."""
+
+    DEFAULT_QUEUE_CAPACITY = 65536
+    # time reader thread sleeps if connection has no data
+    DEFAULT_IDLE_SLEEP_IN_SECONDS = 0.0005
+
+
+    def __init__(self, conn: Connection, buffer_size: int = FrameDecoder.DEFAULT_CAPACITY,
+                 queue_capacity: int = DEFAULT_QUEUE_CAPACITY, idle_sleep_in_seconds: float = DEFAULT_IDLE_SLEEP_IN_SECONDS):
+        self._connection = conn
+        self._frame_decoder = FrameDecoder(buffer_size)
+        self._queue: deque[tuple[int, int, bytes]] = deque(maxlen=queue_capacity)
+        self._idle_sleep_in_seconds = idle_sleep_in_seconds
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+        self._queue_overflow_count = 0
+        self._max_queue_depth = 0
+        self._packet_count = 0
+        self._error: Exception | None = None
+        # set by clear() while thread is running, reader thread clears and sets event afterwards
+        self._clear_request: threading.Event | None = None
+
+
+    @property
+    def is_running(self) -> bool:
+        """Getter for running state of reader thread"""
+        return self._thread is not None and self._thread.is_alive()
+
+
+    @property
+    def queue_depth(self) -> int:
+        """Getter for number of packets waiting in queue"""
+        return len(self._queue)
+
+
+    @property
+    def max_queue_depth(self) -> int:
+        """Getter for maximum number of packets that were waiting in queue at once"""
+        return self._max_queue_depth
+
+
+    @property
+    def queue_overflow_count(self) -> int:
+        """Getter for number of packets dropped because queue was full"""
+        return self._queue_overflow_count
+
+
+    @property
+    def overflow_count(self) -> int:
+        """Getter for number of received bytes that were discarded because frame decoder buffer was full"""
+        return self._frame_decoder.overflow_count
+
+
+    @property
+    def packet_count(self) -> int:
+        """Getter for number of decoded packets"""
+        return self._packet_count
+
+
+    @property
+    def error(self) -> Exception | None:
+        """Getter for exception that stopped reader thread"""
+        return self._error
+
+
+    def start(self):
+        """Starts reader thread"""
+        if self.is_running:
+            return
+
+        self._stop_event.clear()
+        self._error = None
+        self._connection.suspend_event_loop_reader()
+        self._thread = threading.Thread(target=self._run, name="ScienceModeFrameReader", daemon=True)
+        self._thread.start()
+
+
+    def stop(self):
+        """Stops reader thread and waits until it finished"""
+        if self._thread is None:
+            return
+
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        self._connection.resume_event_loop_reader()
+
+
+    def get_raw_packet(self) -> tuple[int, int, bytes] | None:
+        """Returns oldest packet from queue as command, packet number and payload or None if queue is empty"""
+        try:
+            return self._queue.popleft()
+        except IndexError:
+            return None
+
+
+    def clear(self):
+        """Discards all packets in queue, data in frame decoder and buffer from connection,
+        if reader thread is running, it does the clearing and this function waits until it is done"""
+        request = threading.Event()
+        if self.is_running:
+            self._clear_request = request
+            # reader thread may stop before it handled request
+            while not request.wait(0.1) and self.is_running:
+                pass
+        if not request.is_set():
+            self._clear_request = None
+            self._clear()
+
+
+    def _run(self):
+        """Thread function"""
+        try:
+            while not self._stop_event.is_set():
+                request = self._clear_request
+                if request is not None:
+                    self._clear_request = None
+                    self._clear()
+                    request.set()
+
+                data = self._connection.read()
+                if len(data) == 0:
+                    time.sleep(self._idle_sleep_in_seconds)
+                    continue
+
+                self._frame_decoder.feed(data)
+                while True:
+                    frame = self._frame_decoder.next_frame()
+                    if frame is None:
+                        break
+                    self._append(Protocol.extract_packet_data(frame))
+        except Exception as e: # pylint:disable=broad-exception-caught
+            # keep exception for consumer, e.g. connection was closed
+            self._error = e
+
+
+    def _clear(self):
+        """Discards all packets in queue, data in frame decoder and buffer from connection"""
+        self._connection.clear_buffer()
+        self._frame_decoder.clear()
+        self._queue.clear()
+
+
+    def _append(self, raw_packet: tuple[int, int, bytes]):
+        """Appends packet to queue"""
+        queue = self._queue
+        depth = len(queue)
+        if depth == queue.maxlen:
+            self._queue_overflow_count += 1
+        elif depth >= self._max_queue_depth:
+            self._max_queue_depth = depth + 1
+        queue.append(raw_packet)
+        self._packet_count += 1
@@ -0,0 +1,154 @@
+"""Provides a transmit buffer to send multiple packets with a single write"""
+
+import asyncio
+from contextlib import contextmanager
+from typing import Callable
+
+from science_mode_4.protocol.packet import Packet
+from science_mode_4.protocol.protocol import Protocol
+from .connection import Connection
+
+
+class TransmitBuffer():
+    """Class for encoding packets into one contiguous buffer, that is written to connection with a single write.
+
+    By default every packet is written immediately. Inside of batch() packets are collected and written
+    when the outermost batch ends. If coalesce_per_tick is enabled, packets are collected and written
+    at the end of the current event loop iteration. Packets that are discarded before they were written
+    (see clear() and batch()) are handed to discard_callback, e.g. to remove their open acknowledges."""
+
+
+    def __init__(self, conn: Connection, discard_callback: Callable[[Packet], None] | None = None):
+        self._connection = conn
+        self._discard_callback = discard_callback
+        self._data = bytearray()
+        # packets not written yet and their start in data
+        self._packets: list[tuple[Packet, int]] = []
+        self._batch_depth = 0
+        self._coalesce_per_tick = False
+        self._flush_scheduled = False
+        self._write_count = 0
+
+
+    @property
+    def connection(self) -> Connection:
+        """Getter for connection"""
+        return self._connection
+
+
+    @property
+    def pending_byte_count(self) -> int:
+        """Getter for number of bytes not written yet"""
+        return len(self._data)
+
+
+    @property
+    def write_count(self) -> int:
+        """Getter for number of writes to connection"""
+        return self._write_count
+
+
+    @property
+    def is_batching(self) -> bool:
+        """Getter for batch state, true if packets are currently collected by batch()"""
+        return self._batch_depth > 0
+
+
+    @property
+    def coalesce_per_tick(self) -> bool:
+        """Getter for coalesce per tick"""
+        return self._coalesce_per_tick
+
+
+    @coalesce_per_tick.setter
+    def coalesce_per_tick(self, value: bool):
+        """Setter for coalesce per tick, if true all packets send during one event loop iteration
+        are written together at end of iteration (only if there is a running event loop)"""
+        self._coalesce_per_tick = value
+        if not value and not self.is_batching:
+            self.flush()
+
+
+    def write_packet(self, packet: Packet):
+        """Encodes packet and writes it to connection or keeps it until flush"""
+        start = len(self._data)
+        Protocol.packet_to_buffer(packet, self._data)
+        self._packets.append((packet, start))
+
+        if self.is_batching:
+            return
+        if self._coalesce_per_tick and self._schedule_flush():
+            return
+        self.flush()
+
+
+    def flush(self):
+        """Writes all pending packets to connection"""
+        if len(self._data) == 0:
+            return
+
+        data = bytes(self._data)
+        self._data.clear()
+        self._packets.clear()
+        self._write_count += 1
+        self._connection.write(data)
+
+
+    def clear(self):
+        """Discards all pending packets"""
+        self._discard(0)
+
+
+    @contextmanager
+    def batch(self):
+        """Context manager, all packets send inside of this context are written with one write
+        when context ends, contexts can be nested. If context ends with an exception, packets
+        send inside of this context that were not written yet are discarded"""
+        self._batch_depth += 1
+        first_packet = len(self._packets)
+        write_count = self._write_count
+        try:
+            yield self
+        except BaseException:
+            # after a flush inside of context all pending packets belong to this context
+            self._discard(first_packet if self._write_count == write_count else 0)
+            raise
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.flush()
+
+
+    def _discard(self, first_packet: int):
+        """Discards pending packets beginning with index first_packet"""
+        packets = self._packets[first_packet:]
+        if not packets:
+            return
+
+        del self._data[packets[0][1]:]
+        del self._packets[first_packet:]
+        if self._discard_callback is not None:
+            for packet, _ in packets:
+                self._discard_callback(packet)
+
+
+    def _schedule_flush(self) -> bool:
+        """Schedules flush at end of current event loop iteration, returns false if there is no running event loop"""
+        if self._flush_scheduled:
+            return True
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+
+        self._flush_scheduled = True
+        loop.call_soon(self._scheduled_flush)
+        return True
+
+
+    def _scheduled_flush(self):
+        """Called by event loop"""
+        self._flush_scheduled = False
+        if not self.is_batching:
+            self.flush()
@@ -0,0 +1,145 @@
+"""Tests for ByteBuilder and BitVector"""
+
+import random
+
+import pytest
+
+from science_mode_4.utils.bit_vector import BitVector
+from science_mode_4.utils.byte_builder import ByteBuilder
+
+
+class _BitListByteBuilder():
+    """Reference implementation, stores one list entry per bit"""
+
+
+    def __init__(self):
+        self.bits: list[int] = []
+
+
+    def get_bit_from_position(self, bit_position: int, bit_count: int) -> int:
+        return sum(self.bits[bit_position + x] << x for x in range(bit_count))
+
+
+    def append_value(self, value: int, byte_count: int, do_swap: bool):
+        temp = range(byte_count)
+        if do_swap:
+            temp = reversed(temp)
+        for x in temp:
+            self.append_byte(value >> (x * 8))
+
+
+    def append_byte(self, value: int):
+        self.bits += [(value >> x) & 0x1 for x in range(8)]
+
+
+    def set_bit_to_position(self, value: int, bit_position: int, bit_count: int):
+        if len(self.bits) < bit_position + bit_count:
+            self.bits += [0] * (bit_position + bit_count - len(self.bits))
+        for x in range(bit_count):
+            self.bits[bit_position + x] = (value >> x) & 0x1
+
+
+    def swap(self, start: int, count: int):
+        tmp = self.get_bytes()
+        for x in range(count):
+            self.set_bit_to_position(tmp[start + x], (start + count - x - 1) * 8, 8)
+
+
+    def get_bytes(self) -> bytes:
+        padded = self.bits + [0] * (-len(self.bits) % 8)
+        return bytes(sum(padded[i + x] << x for x in range(8)) for i in range(0, len(padded), 8))
+
+
+def _apply_random_operations(rnd: random.Random, builders: list):
+    for _ in range(50):
+        length = len(builders[0].get_bytes())
+        bit_length = len(builders[1].bits)
+        operation = rnd.randrange(6)
+        if operation == 0:
+            byte_count = rnd.randint(0, 4)
+            value = rnd.getrandbits(40)
+            do_swap = rnd.random() < 0.5
+            for b in builders:
+                b.append_value(value, byte_count, do_swap)
+        elif operation == 1:
+            value = rnd.randrange(256)
+            for b in builders:
+                b.append_byte(value)
+        elif operation == 2:
+            data = bytes(rnd.randrange(256) for _ in range(rnd.randint(0, 5)))
+            for b in builders:
+                if isinstance(b, ByteBuilder):
+                    b.append_bytes(data)
+                else:
+                    for x in data:
+                        b.append_byte(x)
+        elif operation == 3:
+            # not byte aligned and may extend data
+            bit_position = rnd.randint(0, length * 8 + 16)
+            bit_count = rnd.randint(0, 20)
+            value = rnd.getrandbits(20)
+            for b in builders:
+                b.set_bit_to_position(value, bit_position, bit_count)
+        elif operation == 4 and length > 0:
+            start = rnd.randrange(length)
+            count = rnd.randint(0, length - start)
+            for b in builders:
+                b.swap(start, count)
+        elif operation == 5 and bit_length > 0:
+            bit_position = rnd.randrange(bit_length)
+            bit_count = rnd.randint(0, bit_length - bit_position)
+            results = [b.get_bit_from_position(bit_position, bit_count) for b in builders]
+            assert results[0] == results[1]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_byte_builder_matches_bit_list(seed: int):
+    rnd = random.Random(seed)
+    builders = [ByteBuilder(), _BitListByteBuilder()]
+    _apply_random_operations(rnd, builders)
+    assert builders[0].get_bytes() == builders[1].get_bytes()
+
+
+def test_byte_builder_swap():
+    bb = ByteBuilder()
+    bb.append_bytes(bytes([1, 2, 3, 4]))
+    bb.swap(1, 3)
+    assert bb.get_bytes() == bytes([1, 4, 3, 2])
+    # zero length swap does nothing, even beyond end of data
+    bb.swap(10, 0)
+    assert bb.get_bytes() == bytes([1, 4, 3, 2])
+    with pytest.raises(IndexError):
+        bb.swap(3, 2)
+
+
+def test_byte_builder_extend():
+    bb = ByteBuilder(0x0201, 2)
+    bb.extend_byte_builder(ByteBuilder(0x03, 1))
+    assert bb.get_bytes() == bytes([1, 2, 3])
+
+
+def test_bit_vector_round_trip():
+    rnd = random.Random(1)
+    for bit_length in [1, 7, 8, 9, 63, 64, 65, 200]:
+        value = rnd.getrandbits(bit_length)
+        bv = BitVector.init_from_int(value, bit_length)
+        assert len(bv) == bit_length
+        assert list(bv) == [(value >> x) & 0x1 for x in range(bit_length)]
+        assert bv.get_bytes() == value.to_bytes((bit_length + 7) // 8, "little")
+        assert bv.get_bits(0, bit_length) == value
+
+        bv.set_length(bit_length + 3)
+        assert bv.get_bytes() == value.to_bytes((bit_length + 10) // 8, "little")
+        bv.set_length(1)
+        assert bv.value == value & 0x1
+
+
+def test_bit_vector_index_errors():
+    bv = BitVector.init_from_int(0b101, 3)
+    assert [bv[0], bv[1], bv[2]] == [1, 0, 1]
+    with pytest.raises(ValueError):
+        _ = bv[3]
+    with pytest.raises(ValueError):
+        bv[0] = 2
+    with pytest.raises(ValueError):
+        bv.get_bits(2, 2)
@@ -0,0 +1,68 @@
+"""Tests for CRC16"""
+
+import array
+import random
+
+import pytest
+
+from science_mode_4.utils.crc16 import Crc16
+
+
+def _crc16_xmodem_bitwise(data: bytes, crc: int = 0) -> int:
+    """Reference implementation, processes one bit at a time (polynomial 0x1021)"""
+    for byte in data:
+        crc ^= byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else crc << 1
+            crc &= 0xFFFF
+    return crc
+
+
+def _random_data() -> list[bytes]:
+    rnd = random.Random(5)
+    return [b"", b"\x00", b"\xFF"] + [rnd.randbytes(length) for length in [1, 2, 3, 15, 16, 17, 255, 1000, 65535]]
+
+
+@pytest.fixture(params=Crc16.get_available_implementations())
+def implementation(request):
+    previous = Crc16.get_implementation()
+    Crc16.set_implementation(request.param)
+    yield request.param
+    Crc16.set_implementation(previous)
+
+
+def test_check_value(implementation: str): # pylint:disable=redefined-outer-name
+    assert Crc16.get_implementation() == implementation
+    assert Crc16.crc16_xmodem(b"123456789") == 0x31C3
+
+
+@pytest.mark.usefixtures("implementation")
+@pytest.mark.parametrize("data", _random_data())
+def test_matches_bitwise(data: bytes):
+    expected = _crc16_xmodem_bitwise(data)
+    assert Crc16.crc16_xmodem(data) == expected
+    assert Crc16.crc16_xmodem(bytearray(data)) == expected
+    assert Crc16.crc16_xmodem(memoryview(data)) == expected
+    assert Crc16.crc16_xmodem(data, 0x1D0F) == _crc16_xmodem_bitwise(data, 0x1D0F)
+
+
+@pytest.mark.usefixtures("implementation")
+@pytest.mark.parametrize("data", _random_data())
+def test_incremental(data: bytes):
+    expected = _crc16_xmodem_bitwise(data)
+    split = len(data) // 3
+    chunks = [memoryview(data)[:split], data[split:2 * split], bytearray(data[2 * split:])]
+    assert Crc16.crc16_xmodem(chunks[2], Crc16.crc16_xmodem(chunks[1], Crc16.crc16_xmodem(chunks[0]))) == expected
+    assert Crc16.crc16_xmodem_chunks(chunks) == expected
+    assert Crc16.crc16_xmodem_combine(Crc16.crc16_xmodem(data[:split]), Crc16.crc16_xmodem(data[split:]), len(data) - split) == expected
+
+
+@pytest.mark.usefixtures("implementation")
+def test_memoryview_with_other_format():
+    data = array.array("H", [0x1234, 0xF00F, 0x0081])
+    assert Crc16.crc16_xmodem(memoryview(data)) == _crc16_xmodem_bitwise(data.tobytes())
+
+
+def test_unknown_implementation():
+    with pytest.raises(ValueError):
+        Crc16.set_implementation("unknown")
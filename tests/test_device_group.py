@@ -0,0 +1,65 @@
+"""Tests for device group"""
+
+import asyncio
+
+from science_mode_4.device_group import DeviceGroup
+from science_mode_4.device_p24 import DeviceP24
+from science_mode_4.general.general_device_id import PacketGeneralGetDeviceId
+from science_mode_4.protocol.protocol_helper import ProtocolHelper
+from science_mode_4.protocol.frame_decoder import FrameDecoder
+from science_mode_4.utils.emulator_connection import EmulatorConnection
+from science_mode_4.utils.null_connection import NullConnection
+
+
+class _NoiseConnection(NullConnection):
+    """Connection that returns data without packets"""
+
+    def read(self) -> bytes:
+        return bytes(FrameDecoder.DEFAULT_CAPACITY + 100)
+
+    def clear_buffer(self):
+        pass
+
+
+def test_initialize_and_stats():
+    async def run():
+        connections = [EmulatorConnection(str(x) * 10) for x in range(3)]
+        group = DeviceGroup([DeviceP24(conn) for conn in connections])
+        await group.initialize()
+        assert [device.get_layer_general().device_id for device in group] == ["0" * 10, "1" * 10, "2" * 10]
+        stats = group.get_stats()
+        assert all(x.request_count > 0 for x in stats)
+
+        group.reset_stats()
+        stats = group.get_stats()
+        assert all(x.request_count == 0 and x.received_packet_count == 0 for x in stats)
+
+    asyncio.run(run())
+
+
+def test_reset_stats_resets_overflow_count():
+    device = DeviceP24(_NoiseConnection())
+    group = DeviceGroup([device])
+    device.packet_buffer.update_buffer()
+    assert group.get_stats()[0].overflow_count == 100
+
+    group.reset_stats()
+    assert group.get_stats()[0].overflow_count == 0
+    device.packet_buffer.update_buffer()
+    assert group.get_stats()[0].overflow_count > 0
+    assert device.packet_buffer.overflow_count > group.get_stats()[0].overflow_count
+
+
+def test_create_packet_from_raw_packet():
+    async def run():
+        conn = EmulatorConnection("1234567890")
+        device = DeviceP24(conn)
+        ProtocolHelper.send_packet(PacketGeneralGetDeviceId(), 1, device.packet_buffer)
+        raw_packet = None
+        while raw_packet is None:
+            await asyncio.sleep(0.001)
+            raw_packet = device.packet_buffer.get_raw_packet_from_buffer()
+        packet = device.packet_buffer.create_packet(raw_packet)
+        assert packet.device_id == "1234567890"
+
+    asyncio.run(run())
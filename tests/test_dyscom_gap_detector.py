@@ -0,0 +1,53 @@
+"""Tests for dyscom gap detector"""
+
+import numpy as np
+
+from science_mode_4.dyscom.dyscom_gap_detector import DyscomGapDetector
+from science_mode_4.dyscom.dyscom_sample_store import DyscomSampleStore
+from science_mode_4.dyscom.dyscom_types import DyscomSignalType
+
+
+def test_consecutive_packets():
+    detector = DyscomGapDetector(4000)
+    assert detector.process([0, 250, 500, 750]).tolist() == [0, 0, 0, 0]
+    assert detector.lost_sample_count == 0
+    assert detector.duplicate_count == 0
+
+
+def test_lost_samples():
+    detector = DyscomGapDetector(4000)
+    assert detector.process([0, 250, 1000, 1250]).tolist() == [0, 0, 2, 0]
+    assert detector.process([2000]).tolist() == [2]
+    assert detector.gap_count == 2
+    assert detector.lost_sample_count == 4
+    assert detector.largest_gap == 2
+
+
+def test_time_offset_wrap():
+    detector = DyscomGapDetector(4000)
+    wrap = 1 << 32
+    assert detector.process([wrap - 500, wrap - 250, 0, 500]).tolist() == [0, 0, 0, 1]
+
+
+def test_out_of_order_duplicates():
+    detector = DyscomGapDetector(4000)
+    assert detector.process([0, 250, 500, 250, 750]).tolist() == [0, 0, 0, -1, 0]
+    detector.reset()
+    assert detector.process([0, 250, 500, 250, 500, 750]).tolist() == [0, 0, 0, -1, -1, 0]
+    assert detector.duplicate_count == 2
+    assert detector.lost_sample_count == 0
+
+
+def test_duplicate_at_end_of_batch_is_not_baseline():
+    detector = DyscomGapDetector(4000)
+    assert detector.process([0, 250, 500, 250]).tolist() == [0, 0, 0, -1]
+    assert detector.process([500, 750]).tolist() == [-1, 0]
+    assert detector.lost_sample_count == 0
+
+
+def test_sample_store_ignores_out_of_order_duplicates():
+    store = DyscomSampleStore([DyscomSignalType.BI], 4000, 1.0, fill_gaps=True)
+    time_offsets = np.array([0, 250, 500, 250, 500, 750])
+    store.append_values(time_offsets, {DyscomSignalType.BI: np.arange(6, dtype=np.float32)})
+    assert store.get_timestamps().tolist() == [0, 250, 500, 750]
+    assert store.get_values(DyscomSignalType.BI).tolist() == [0, 1, 2, 5]
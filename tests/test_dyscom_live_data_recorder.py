@@ -0,0 +1,55 @@
+"""Tests for dyscom live data recorder"""
+
+import struct
+import time
+
+import pytest
+
+from science_mode_4.dyscom.dyscom_live_data_batch import DyscomLiveDataDecoder
+from science_mode_4.dyscom.dyscom_live_data_recorder import DyscomLiveDataRecorder, DyscomLiveDataRecording
+from science_mode_4.dyscom.dyscom_types import DyscomInitParams, DyscomSignalType
+
+
+def _create_batch(first_time_offset: int, count: int):
+    payloads = [struct.pack(">BIfBBfBB", 2, first_time_offset + 250 * x, float(x), DyscomSignalType.BI, 0,
+                            -float(x), DyscomSignalType.EMG_1, 0) for x in range(count)]
+    return DyscomLiveDataDecoder.decode(payloads)
+
+
+def test_write_and_read(tmp_path):
+    filename = str(tmp_path / "recording.bin")
+    recorder = DyscomLiveDataRecorder(filename, DyscomInitParams(), 4000, chunk_size=8)
+    recorder.start()
+    for x in range(5):
+        recorder.append(_create_batch(x * 250 * 3, 3))
+    recorder.stop()
+    assert recorder.packet_count == 15
+    assert recorder.dropped_packet_count == 0
+
+    recording = DyscomLiveDataRecording(filename)
+    assert recording.packet_count == 15
+    assert recording.get_time_offsets().tolist() == [250 * x for x in range(15)]
+    assert recording.get_values(DyscomSignalType.EMG_1).tolist() == [-float(x % 3) for x in range(15)]
+    recording.close()
+
+
+def test_write_error_is_raised(tmp_path):
+    recorder = DyscomLiveDataRecorder(str(tmp_path / "missing" / "recording.bin"), DyscomInitParams())
+    recorder.start()
+    deadline = time.monotonic() + 5
+    while recorder.error is None:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+    with pytest.raises(OSError):
+        recorder.append(_create_batch(0, 3))
+    with pytest.raises(OSError):
+        recorder.stop()
+
+
+def test_full_queue_drops_batches():
+    recorder = DyscomLiveDataRecorder("not_written.bin", DyscomInitParams(), queue_capacity=2)
+    # background thread is not started, so queue is not emptied
+    for x in range(4):
+        recorder.append(_create_batch(x * 250 * 3, 3))
+    assert recorder.queue_depth == 2
+    assert recorder.dropped_packet_count == 6
@@ -0,0 +1,123 @@
+"""Tests for dyscom measurement file decoder"""
+
+import struct
+
+import numpy as np
+import pytest
+
+from science_mode_4.dyscom.ads129x.ads129x import Ads129x
+from science_mode_4.dyscom.ads129x.ads129x_config_register_1 import Ads129xOutputDataRate, Ads129xPowerMode
+from science_mode_4.dyscom.dyscom_live_data_batch import DyscomLiveDataDecoder
+from science_mode_4.dyscom.dyscom_measurement_file_decoder import DyscomMeasurementFileDecoder
+from science_mode_4.dyscom.dyscom_types import DyscomFrequencyOut, DyscomInitParams, DyscomSignalType
+
+
+_SIGNAL_TYPES = [DyscomSignalType.BI, DyscomSignalType.EMG_1, DyscomSignalType.EMG_2]
+
+
+def _meta_info(signal_types: list[DyscomSignalType], output_data_rate: Ads129xOutputDataRate) -> bytes:
+    """Returns measurement meta info with init params, datetimes are encoded as send by device"""
+    init_params = DyscomInitParams()
+    init_params.signal_type = signal_types
+    data = bytearray(init_params.get_data())
+    # config register 1, high resolution mode
+    data[8] = (Ads129xPowerMode.HIGH_RESOLUTION << 7) | output_data_rate
+    date_time = struct.pack("<BBBBBBBHh", 12, 0, 2, 30, 1, 0, 2, 1, 124)
+    data[26:37] = date_time
+    data[37:48] = date_time
+    data += bytes(60) + bytes(8) + bytes(2) + bytes(37) + date_time + bytes(4)
+    return bytes(data)
+
+
+def _records(count: int, number_of_channels: int = len(_SIGNAL_TYPES)) -> np.ndarray:
+    """Returns packets with send live data layout"""
+    records = np.zeros(count, DyscomLiveDataDecoder.get_dtype(number_of_channels))
+    records["number_of_channels"] = number_of_channels
+    records["time_offset"] = np.arange(count) * 1000
+    records["samples"]["value"] = np.arange(count * number_of_channels).reshape(count, number_of_channels) / 8
+    records["samples"]["signal_type"] = _SIGNAL_TYPES[:number_of_channels]
+    records["samples"]["status"] = np.arange(count * number_of_channels).reshape(count, number_of_channels) % 256
+    return records
+
+
+def _write_file(path, records: np.ndarray, rest: bytes = b"",
+                output_data_rate: Ads129xOutputDataRate = Ads129xOutputDataRate.HR_MODE_1_KSPS__LP_MODE_500_SPS) -> str:
+    path.write_bytes(_meta_info(_SIGNAL_TYPES, output_data_rate) + records.tobytes() + rest)
+    return str(path)
+
+
+def test_decode(tmp_path):
+    records = _records(100)
+    decoder = DyscomMeasurementFileDecoder(_write_file(tmp_path / "m.bin", records, bytes(5)))
+    assert decoder.signal_types == _SIGNAL_TYPES
+    assert decoder.sample_rate == 1000
+    # incomplete last packet is ignored
+    assert decoder.packet_count == 100
+
+    batch = decoder.decode()
+    assert batch.number_of_packets == 100
+    assert (batch.time_offset == records["time_offset"]).all()
+    assert (batch.value == records["samples"]["value"]).all()
+    assert (batch.status == records["samples"]["status"]).all()
+    assert list(batch.values_by_signal_type) == _SIGNAL_TYPES
+
+    part = decoder.decode(90, 20)
+    assert (part.time_offset == records["time_offset"][90:]).all()
+    assert decoder.decode(100).number_of_packets == 0
+    with pytest.raises(IndexError):
+        decoder.decode(101)
+
+
+def test_sample_rate(tmp_path):
+    decoder = DyscomMeasurementFileDecoder(_write_file(tmp_path / "m.bin", _records(1), output_data_rate=Ads129xOutputDataRate.HR_MODE_4_KSPS__LP_MODE_2_KSPS))
+    assert decoder.sample_rate == 4000
+
+    init_params = DyscomInitParams()
+    init_params.register_map_ads129x = Ads129x()
+    init_params.register_map_ads129x.set_data(bytes(8) + bytes([Ads129xOutputDataRate.HR_MODE_4_KSPS__LP_MODE_2_KSPS]) + bytes(17))
+    assert init_params.register_map_ads129x.config_register_1.power_mode == Ads129xPowerMode.LOW_POWER
+    assert DyscomMeasurementFileDecoder.get_frequency_out(init_params) == DyscomFrequencyOut.SAMPLES_PER_SECOND_2K
+    # set_data does not change default register map
+    assert DyscomInitParams().register_map_ads129x.config_register_1.power_mode == Ads129xPowerMode.HIGH_RESOLUTION
+
+
+@pytest.mark.parametrize("packet_count, chunk_size, max_workers", [(0, 16, 1), (100, 16, 1), (100, 7, 1), (1000, 32, 2), (1001, 10, 3)])
+def test_convert(tmp_path, packet_count: int, chunk_size: int, max_workers: int):
+    records = _records(packet_count)
+    decoder = DyscomMeasurementFileDecoder(_write_file(tmp_path / "m.bin", records, bytes(3)))
+    recording = decoder.convert(str(tmp_path / "m.rec"), max_workers, chunk_size)
+    try:
+        assert recording.signal_types == _SIGNAL_TYPES
+        assert recording.sample_rate == 1000
+        assert recording.packet_count == packet_count
+        assert (recording.get_time_offsets() == records["time_offset"]).all()
+        for index, signal_type in enumerate(_SIGNAL_TYPES):
+            assert (recording.get_values(signal_type) == records["samples"]["value"][:, index]).all()
+        if packet_count > 0:
+            chunk = recording.get_chunk(recording.chunk_count - 1)
+            assert (chunk.status[DyscomSignalType.EMG_2] == records["samples"]["status"][-len(chunk.time_offset):, 2]).all()
+    finally:
+        recording.close()
+
+
+def test_wrong_number_of_channels(tmp_path):
+    records = _records(100)
+    records["number_of_channels"][42] = 2
+    decoder = DyscomMeasurementFileDecoder(_write_file(tmp_path / "m.bin", records))
+    with pytest.raises(ValueError):
+        decoder.decode()
+    assert decoder.decode(0, 42).number_of_packets == 42
+    with pytest.raises(ValueError, match=f"position {DyscomMeasurementFileDecoder.META_INFO_SIZE + 42 * records.itemsize}"):
+        decoder.convert(str(tmp_path / "m.rec"), 1)
+
+
+def test_invalid_file(tmp_path):
+    path = tmp_path / "short.bin"
+    path.write_bytes(bytes(100))
+    with pytest.raises(ValueError):
+        DyscomMeasurementFileDecoder(str(path))
+
+    path = tmp_path / "no_signal_types.bin"
+    path.write_bytes(_meta_info([], Ads129xOutputDataRate.HR_MODE_1_KSPS__LP_MODE_500_SPS))
+    with pytest.raises(ValueError):
+        DyscomMeasurementFileDecoder(str(path))
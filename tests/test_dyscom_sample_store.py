@@ -0,0 +1,140 @@
+"""Tests for dyscom sample store"""
+
+import numpy as np
+import pytest
+
+from science_mode_4.dyscom.ads129x.ads129x import Ads129x
+from science_mode_4.dyscom.dyscom_init import DyscomInitResult
+from science_mode_4.dyscom.dyscom_live_data_batch import DyscomLiveDataDecoder
+from science_mode_4.dyscom.dyscom_sample_store import DyscomSampleStore
+from science_mode_4.dyscom.dyscom_types import DyscomFrequencyOut, DyscomInitParams, DyscomInitState, DyscomSignalType
+
+
+def _values(first: int, count: int) -> np.ndarray:
+    return np.arange(first, first + count, dtype=np.float32)
+
+
+def _append(store: DyscomSampleStore, first: int, count: int, interval: int = 250):
+    """Appends count samples, values are sample index and BI values are negated"""
+    store.append_values(np.arange(first, first + count) * interval,
+                        {DyscomSignalType.EMG_1: _values(first, count), DyscomSignalType.BI: -_values(first, count)})
+
+
+def test_append_and_wrap_around():
+    store = DyscomSampleStore([DyscomSignalType.EMG_1, DyscomSignalType.BI], 4000, 0.0025)
+    assert store.capacity == 10
+    _append(store, 0, 4)
+    assert store.count == 4
+    assert store.get_values(DyscomSignalType.EMG_1).tolist() == [0, 1, 2, 3]
+
+    for first in range(4, 25, 7):
+        _append(store, first, 7)
+    assert store.count == 10
+    assert store.total_count == 25
+    assert store.get_values(DyscomSignalType.EMG_1).tolist() == list(range(15, 25))
+    assert store.get_values(DyscomSignalType.BI).tolist() == [-x for x in range(15, 25)]
+    assert store.get_timestamps().tolist() == [x * 250 for x in range(15, 25)]
+    assert store.get_values(DyscomSignalType.EMG_1, 3).tolist() == [22, 23, 24]
+    assert len(store.get_values(DyscomSignalType.EMG_1, 100)) == 10
+    assert len(store.get_values(DyscomSignalType.EMG_1, 0)) == 0
+    # views are contiguous
+    assert store.get_values(DyscomSignalType.EMG_1).flags["C_CONTIGUOUS"]
+
+
+def test_append_more_than_capacity():
+    store = DyscomSampleStore([DyscomSignalType.EMG_1, DyscomSignalType.BI], 4000, 0.0025)
+    _append(store, 0, 3)
+    _append(store, 3, 25)
+    assert store.count == 10
+    assert store.total_count == 28
+    assert store.get_values(DyscomSignalType.EMG_1).tolist() == list(range(18, 28))
+    assert store.get_timestamps().tolist() == [x * 250 for x in range(18, 28)]
+
+
+def test_append_batch():
+    store = DyscomSampleStore([DyscomSignalType.EMG_1, DyscomSignalType.EMG_2], 4000)
+    records = np.zeros(5, DyscomLiveDataDecoder.get_dtype(2))
+    records["number_of_channels"] = 2
+    records["time_offset"] = np.arange(5) * 250
+    records["samples"]["value"][:, 0] = _values(0, 5)
+    records["samples"]["value"][:, 1] = _values(10, 5)
+    records["samples"]["signal_type"] = [DyscomSignalType.EMG_1, DyscomSignalType.BI]
+    store.append(DyscomLiveDataDecoder.decode([x.tobytes() for x in records]))
+    store.append(DyscomLiveDataDecoder.decode([]))
+
+    assert store.count == 5
+    assert store.get_values(DyscomSignalType.EMG_1).tolist() == [0, 1, 2, 3, 4]
+    # signal type without values is NaN, signal type not in store is ignored
+    assert np.isnan(store.get_values(DyscomSignalType.EMG_2)).all()
+    with pytest.raises(KeyError):
+        store.get_values(DyscomSignalType.BI)
+
+
+def test_time_offset_wrap_around():
+    store = DyscomSampleStore([DyscomSignalType.EMG_1], 4000)
+    wrap = 1 << 32
+    store.append_values(np.array([wrap - 500, wrap - 250]), {DyscomSignalType.EMG_1: _values(0, 2)})
+    store.append_values(np.array([0, 250]), {DyscomSignalType.EMG_1: _values(2, 2)})
+    assert store.get_timestamps().tolist() == [wrap - 500, wrap - 250, wrap, wrap + 250]
+
+
+def test_time_range_and_last_seconds():
+    store = DyscomSampleStore([DyscomSignalType.EMG_1, DyscomSignalType.BI], 4000)
+    _append(store, 0, 100)
+    timestamps, values = store.get_time_range(DyscomSignalType.EMG_1, 1000, 2000)
+    assert timestamps.tolist() == [1000, 1250, 1500, 1750]
+    assert values.tolist() == [4, 5, 6, 7]
+    timestamps, values = store.get_last_seconds(DyscomSignalType.BI, 0.001)
+    assert values.tolist() == [-96, -97, -98, -99]
+    assert timestamps[-1] == 99 * 250
+
+
+def test_fill_gaps():
+    store = DyscomSampleStore([DyscomSignalType.EMG_1], 4000, fill_gaps=True)
+    store.append_values(np.array([0, 250, 1000, 1250, 1250]), {DyscomSignalType.EMG_1: _values(0, 5)})
+    assert store.get_timestamps().tolist() == [0, 250, 500, 750, 1000, 1250]
+    values = store.get_values(DyscomSignalType.EMG_1)
+    assert values[[0, 1, 4, 5]].tolist() == [0, 1, 2, 3]
+    assert np.isnan(values[2:4]).all()
+    assert store.gap_detector.lost_sample_count == 2
+    assert store.gap_detector.duplicate_count == 1
+
+
+def test_fill_gaps_larger_than_capacity():
+    store = DyscomSampleStore([DyscomSignalType.EMG_1], 4000, 0.0025, fill_gaps=True)
+    store.append_values(np.array([0, 250 * 100]), {DyscomSignalType.EMG_1: _values(0, 2)})
+    assert store.count == 10
+    assert store.get_timestamps().tolist() == [x * 250 for x in range(91, 101)]
+    assert np.isnan(store.get_values(DyscomSignalType.EMG_1)[:-1]).all()
+    assert store.get_values(DyscomSignalType.EMG_1)[-1] == 1
+
+
+def test_clear():
+    store = DyscomSampleStore([DyscomSignalType.EMG_1], 4000, fill_gaps=True)
+    store.append_values(np.array([0, 1000]), {DyscomSignalType.EMG_1: _values(0, 2)})
+    store.clear()
+    assert store.count == 0 and store.total_count == 0
+    assert store.gap_detector.lost_sample_count == 0
+    # no gap to time offset before clear
+    store.append_values(np.array([5000]), {DyscomSignalType.EMG_1: _values(0, 1)})
+    assert store.get_timestamps().tolist() == [5000]
+
+
+def test_create():
+    init_params = DyscomInitParams()
+    init_params.signal_type = [DyscomSignalType.BI, DyscomSignalType.EMG_1]
+    store = DyscomSampleStore.create(init_params, DyscomInitResult(Ads129x(), DyscomInitState.SUCESS,
+                                                                   DyscomFrequencyOut.SAMPLES_PER_SECOND_1K), 2.0)
+    assert store.signal_types == [DyscomSignalType.BI, DyscomSignalType.EMG_1]
+    assert store.sample_rate == 1000
+    assert store.capacity == 2000
+    assert store.gap_detector is None
+
+
+def test_invalid_sample_rate():
+    assert DyscomSampleStore.get_sample_rate(DyscomFrequencyOut.SAMPLES_PER_SECOND_32K) == 32000
+    assert DyscomSampleStore.get_sample_rate(DyscomFrequencyOut.SAMPLES_PER_SECOND_250) == 250
+    with pytest.raises(ValueError):
+        DyscomSampleStore.get_sample_rate(DyscomFrequencyOut.UNUSED)
+    with pytest.raises(ValueError):
+        DyscomSampleStore([DyscomSignalType.EMG_1], 0)
@@ -0,0 +1,113 @@
+"""Tests for dyscom shared sample ring"""
+
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from science_mode_4.dyscom.dyscom_live_data_batch import DyscomLiveDataDecoder
+from science_mode_4.dyscom.dyscom_shared_sample_ring import DyscomSharedSampleRing
+
+
+def _payload_records(first_sequence: int, count: int, number_of_channels: int = 2) -> np.ndarray:
+    """Returns records with send live data packet layout, time offset and values are sequence"""
+    records = np.zeros(count, DyscomLiveDataDecoder.get_dtype(number_of_channels))
+    records["number_of_channels"] = number_of_channels
+    records["time_offset"] = np.arange(first_sequence, first_sequence + count)
+    records["samples"]["value"] = np.arange(first_sequence, first_sequence + count)[:, np.newaxis]
+    records["samples"]["signal_type"] = 3
+    return records
+
+
+@pytest.fixture(name="ring")
+def fixture_ring():
+    ring = DyscomSharedSampleRing.create(2, 8)
+    yield ring
+    ring.close()
+    ring.unlink()
+
+
+def test_write_and_read(ring: DyscomSharedSampleRing):
+    ring.write(_payload_records(0, 5))
+    assert ring.write_sequence == 5
+    result = ring.read(0)
+    assert result.next_sequence == 5
+    assert result.lost_count == 0
+    assert list(result.records["time_offset"]) == [0, 1, 2, 3, 4]
+    assert result.records["value"][:, 1].tolist() == [0, 1, 2, 3, 4]
+    assert (result.records["signal_type"] == 3).all()
+
+    # nothing new
+    result = ring.read(5)
+    assert len(result.records) == 0 and result.next_sequence == 5 and result.lost_count == 0
+
+
+def test_wrap_around(ring: DyscomSharedSampleRing):
+    ring.write(_payload_records(0, 6))
+    ring.write(_payload_records(6, 5))
+    views = ring.get_views(6, 11)
+    assert [len(x) for x in views] == [2, 3]
+    assert np.concatenate(views)["time_offset"].tolist() == [6, 7, 8, 9, 10]
+    result = ring.read(6)
+    assert result.records["time_offset"].tolist() == [6, 7, 8, 9, 10]
+    assert result.next_sequence == 11 and result.lost_count == 0
+    with pytest.raises(ValueError):
+        ring.get_views(0, 11)
+
+
+def test_lost_records(ring: DyscomSharedSampleRing):
+    for x in range(0, 20, 4):
+        ring.write(_payload_records(x, 4))
+    assert ring.oldest_sequence == 12
+    assert not ring.is_valid(11) and ring.is_valid(12)
+    result = ring.read(0)
+    assert result.lost_count == 12
+    assert result.records["time_offset"].tolist() == list(range(12, 20))
+    assert result.next_sequence == 20
+
+
+def test_write_more_than_capacity(ring: DyscomSharedSampleRing):
+    ring.write(_payload_records(0, 20))
+    assert ring.write_sequence == 20
+    assert ring.read(0).records["time_offset"].tolist() == list(range(12, 20))
+
+
+def test_reserved_records_are_not_read(ring: DyscomSharedSampleRing):
+    ring.write(_payload_records(0, 8))
+    views = ring.get_views(0, 8)
+    # writer announced 3 records, but did not publish them yet
+    ring._header[DyscomSharedSampleRing._RESERVE_SEQUENCE] = 11 # pylint:disable=protected-access
+    assert not ring.is_valid(0)
+    assert ring.is_valid(3)
+    result = ring.read(0)
+    assert result.lost_count == 3
+    assert result.records["time_offset"].tolist() == [3, 4, 5, 6, 7]
+    assert result.next_sequence == 8
+    del views
+
+
+def test_write_payloads_skips_other_number_of_channels(ring: DyscomSharedSampleRing):
+    payloads = [x.tobytes() for x in _payload_records(0, 3)] + [_payload_records(3, 1, 1).tobytes()]
+    ring.write_payloads(payloads)
+    assert ring.write_sequence == 3
+    assert ring.invalid_packet_count == 1
+
+
+def test_invalid_capacity():
+    with pytest.raises(ValueError):
+        DyscomSharedSampleRing.create(2, 0)
+
+
+def test_attach_from_independent_process(ring: DyscomSharedSampleRing):
+    ring.write(_payload_records(0, 3))
+    code = "import sys\nfrom science_mode_4.dyscom.dyscom_shared_sample_ring import DyscomSharedSampleRing\n" +\
+        "ring = DyscomSharedSampleRing.attach(sys.argv[1])\nprint(ring.read(0).records['time_offset'].tolist())\nring.close()"
+    result = subprocess.run([sys.executable, "-c", code, ring.name], capture_output=True, text=True, timeout=60, check=True)
+    assert result.stdout.strip() == "[0, 1, 2]"
+    assert "leaked" not in result.stderr
+
+    # shared memory still exists after other process ended
+    other = DyscomSharedSampleRing.attach(ring.name)
+    assert other.write_sequence == 3
+    other.close()
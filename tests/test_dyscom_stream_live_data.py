@@ -0,0 +1,129 @@
+"""Tests for streaming dyscom live data"""
+
+import asyncio
+
+import numpy as np
+
+from science_mode_4.device_i24 import DeviceI24
+from science_mode_4.dyscom.dyscom_live_data_batch import DyscomLiveDataBatch
+from science_mode_4.dyscom.dyscom_types import DyscomInitParams, DyscomSignalType
+from science_mode_4.utils.emulator_connection import EmulatorConnection
+
+
+async def _start_measurement(conn: EmulatorConnection) -> DeviceI24:
+    conn.open()
+    device = DeviceI24(conn)
+    await device.initialize()
+    init_params = DyscomInitParams()
+    init_params.signal_type = [DyscomSignalType.BI, DyscomSignalType.EMG_1]
+    await device.get_layer_dyscom().init(init_params)
+    await device.get_layer_dyscom().start()
+    return device
+
+
+def _assert_consecutive(batches: list[DyscomLiveDataBatch], sample_rate: int):
+    time_offsets = np.concatenate([x.time_offset for x in batches])
+    assert (np.diff(time_offsets.astype(np.int64)) == 1000000 // sample_rate).all()
+
+
+def test_stream_until_measurement_stops():
+    async def run():
+        conn = EmulatorConnection()
+        device = await _start_measurement(conn)
+        layer = device.get_layer_dyscom()
+        batches = []
+        is_stopped = False
+        async for batch in layer.stream_live_data(batch_size=64, operation_mode_interval_in_seconds=0.02):
+            batches.append(batch)
+            if not is_stopped and sum(x.number_of_packets for x in batches) >= 500:
+                # generator yields remaining packets and ends at next operation mode poll
+                await layer.stop()
+                is_stopped = True
+        conn.close()
+        return batches, conn.live_data_packet_count
+
+    batches, packet_count = asyncio.run(run())
+    assert sum(x.number_of_packets for x in batches) == packet_count
+    assert all(x.number_of_packets <= 64 for x in batches)
+    assert all(list(x.values_by_signal_type) == [DyscomSignalType.BI, DyscomSignalType.EMG_1] for x in batches)
+    _assert_consecutive(batches, 4000)
+
+
+def test_partial_batch_after_max_latency():
+    async def run():
+        conn = EmulatorConnection()
+        conn.live_data_sample_rate = 250
+        device = await _start_measurement(conn)
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        batches = []
+        async for batch in device.get_layer_dyscom().stream_live_data(batch_size=1000, max_latency_in_seconds=0.02):
+            batches.append((loop.time() - start_time, batch))
+            if len(batches) == 5:
+                break
+        await device.get_layer_dyscom().stop()
+        conn.close()
+        return batches
+
+    batches = asyncio.run(run())
+    # batches are yielded long before they are full
+    assert all(0 < x.number_of_packets < 100 for _, x in batches)
+    assert batches[-1][0] < 1.0
+    _assert_consecutive([x for _, x in batches], 250)
+
+
+def test_batch_split_on_channel_count_change():
+    async def run():
+        conn = EmulatorConnection()
+        device = await _start_measurement(conn)
+        layer = device.get_layer_dyscom()
+        batches = []
+        async for batch in layer.stream_live_data(batch_size=10000, operation_mode_interval_in_seconds=10.0):
+            batches.append(batch)
+            if len(batches) == 1:
+                # measurement continues with three channels, generator does not notice stop in between
+                await layer.stop()
+                conn.live_data_signal_types = [DyscomSignalType.BI, DyscomSignalType.EMG_1, DyscomSignalType.EMG_2]
+                await layer.start()
+            elif batch.number_of_channels == 3:
+                break
+        await layer.stop()
+        conn.close()
+        return batches
+
+    batches = asyncio.run(run())
+    assert batches[0].number_of_channels == 2
+    assert all(x.number_of_channels == 2 for x in batches[:-1])
+    assert batches[-1].number_of_channels == 3
+    assert list(batches[-1].values_by_signal_type) == [DyscomSignalType.BI, DyscomSignalType.EMG_1, DyscomSignalType.EMG_2]
+
+
+def test_stream_without_measurement():
+    async def run():
+        conn = EmulatorConnection()
+        conn.open()
+        device = DeviceI24(conn)
+        await device.initialize()
+        batches = [x async for x in device.get_layer_dyscom().stream_live_data()]
+        conn.close()
+        return batches
+
+    assert not asyncio.run(run())
+
+
+def test_batch_get_packet():
+    async def run():
+        conn = EmulatorConnection()
+        device = await _start_measurement(conn)
+        async for batch in device.get_layer_dyscom().stream_live_data(batch_size=4, max_latency_in_seconds=1.0):
+            break
+        await device.get_layer_dyscom().stop()
+        conn.close()
+        return batch
+
+    batch = asyncio.run(run())
+    assert batch.number_of_packets == 4
+    packet = batch.get_packet(3)
+    assert packet.time_offset == batch.time_offset[3]
+    assert [x.value for x in packet.samples] == batch.value[3].tolist()
+    assert [x.signal_type for x in packet.samples] == [DyscomSignalType.BI, DyscomSignalType.EMG_1]
@@ -0,0 +1,120 @@
+"""Tests for emulator connection, running the whole stack without hardware"""
+
+import asyncio
+import random
+
+from science_mode_4.device_i24 import DeviceI24
+from science_mode_4.device_p24 import DeviceP24
+from science_mode_4.dyscom.dyscom_types import DyscomGetOperationModeType
+from science_mode_4.protocol.types import StimStatus
+from science_mode_4.utils.connection import Connection
+from science_mode_4.utils.emulator_connection import EmulatorConnection
+
+
+class _PollingEmulatorConnection(EmulatorConnection):
+    """Emulator without notification about incoming data"""
+
+
+    async def wait_for_data(self, timeout_in_seconds: float):
+        await Connection.wait_for_data(self, timeout_in_seconds)
+
+
+async def _measure_request_latency(conn: EmulatorConnection) -> float:
+    """Returns mean latency of get_stim_status requests"""
+    conn.open()
+    conn.latency_in_seconds = 0.002
+    device = DeviceP24(conn)
+    for _ in range(20):
+        await device.get_layer_general().get_stim_status()
+    conn.close()
+    return device.packet_buffer.statistics.mean_request_latency
+
+
+def test_general_and_mid_level():
+    async def run():
+        conn = EmulatorConnection("1234567890")
+        conn.open()
+        device = DeviceP24(conn)
+        await device.initialize()
+        assert device.get_layer_general().device_id == "1234567890"
+
+        await device.get_layer_mid_level().init(False)
+        stim_status = await device.get_layer_general().get_stim_status()
+        assert stim_status.stim_status == StimStatus.MID_LEVEL_INITIALIZED
+        await device.get_layer_mid_level().stop()
+        conn.close()
+
+    asyncio.run(run())
+
+
+def test_dyscom_live_data(tmp_path):
+    async def run():
+        conn = EmulatorConnection(files={"measurement": bytes(range(256)) * 10})
+        conn.open()
+        device = DeviceI24(conn)
+        await device.initialize()
+        layer = device.get_layer_dyscom()
+
+        await layer.init()
+        await layer.start()
+        assert await layer.get_operation_mode() == DyscomGetOperationModeType.LIVE_MEASURING
+        await asyncio.sleep(0.05)
+        await layer.stop()
+        assert conn.live_data_packet_count > 0
+
+        result = await layer.download_file("measurement", str(tmp_path / "measurement"))
+        assert result.byte_count == 2560
+        conn.close()
+
+    asyncio.run(run())
+    assert (tmp_path / "measurement").read_bytes() == bytes(range(256)) * 10
+
+
+def test_reset_keeps_settings():
+    async def run():
+        conn = EmulatorConnection()
+        conn.open()
+        conn.latency_in_seconds = 0.001
+        conn.file_block_size = 128
+        device = DeviceP24(conn)
+        await device.get_layer_mid_level().init(False)
+        await device.get_layer_general().reset()
+        stim_status = await device.get_layer_general().get_stim_status()
+        assert stim_status.stim_status == StimStatus.NO_LEVEL_INITIALIZED
+        assert conn.latency_in_seconds == 0.001
+        assert conn.file_block_size == 128
+        conn.close()
+
+    asyncio.run(run())
+
+
+def test_request_latency_is_not_bound_to_poll_interval():
+    async def run():
+        notified_latency = await _measure_request_latency(EmulatorConnection())
+        polling_latency = await _measure_request_latency(_PollingEmulatorConnection())
+        assert notified_latency < Connection.POLL_INTERVAL_IN_SECONDS / 2
+        assert polling_latency >= Connection.POLL_INTERVAL_IN_SECONDS * 0.9
+
+    asyncio.run(run())
+
+
+def test_dyscom_download_with_lost_blocks(tmp_path):
+    content = random.Random(1).randbytes(100000)
+
+    async def run():
+        conn = EmulatorConnection(files={"a.bin": content}, seed=1)
+        conn.open()
+        device = DeviceI24(conn)
+        await device.initialize()
+        # about 10 corrupted blocks, more than max_resume_count
+        conn.corruption_rate = 1e-4
+        result = await device.get_layer_dyscom().download_file("a.bin", str(tmp_path / "a.bin"), block_timeout_in_seconds=0.5,
+                                                                max_resume_count=1)
+        conn.close()
+        return result
+
+    result = asyncio.run(run())
+    assert (tmp_path / "a.bin").read_bytes() == content
+    assert result.resume_count > 0
+    # lost blocks are requested again as soon as a later block arrives, without waiting for block timeout
+    assert result.duration_in_seconds < 0.5 * result.resume_count
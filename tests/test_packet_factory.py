@@ -0,0 +1,60 @@
+"""Tests for packet factory"""
+
+import struct
+
+import pytest
+
+from science_mode_4.protocol.commands import Commands
+from science_mode_4.protocol.packet import Packet, PacketAck
+from science_mode_4.protocol.packet_factory import PacketFactory
+from science_mode_4.protocol.types import ResultAndError
+from science_mode_4.dyscom.dyscom_types import DyscomGetOperationModeType, DyscomGetType
+
+
+def _create_packet_with_data_two_step(factory: PacketFactory, command: int, number: int, data: bytes) -> PacketAck:
+    """Decoding as done before dispatch tables, prototype with kind -1 decodes kind"""
+    copy = factory.data[command, -1].create_copy_with_data(data)
+    kind = copy.get_kind(data)
+    if kind != -1:
+        copy = factory.data[command, kind].create_copy_with_data(data)
+    copy.number = number
+    return copy
+
+
+_ACKS = [
+    (Commands.GetDeviceIdAck, bytes([ResultAndError.NO_ERROR]) + b"1234567890"),
+    (Commands.GetStimStatusAck, bytes([ResultAndError.NO_ERROR, 0, 0])),
+    (Commands.DlGetAck, bytes([ResultAndError.NO_ERROR, DyscomGetType.OPERATION_MODE, DyscomGetOperationModeType.IDLE])),
+    (Commands.DlGetAck, bytes([ResultAndError.NO_ERROR, DyscomGetType.BATTERY]) + struct.pack("<BBbiI", 0, 100, 25, 0, 4100)),
+    (Commands.DlGetAck, bytes([ResultAndError.NO_ERROR, DyscomGetType.DEVICE_ID]) + b"device".ljust(128, b"\0")),
+]
+
+
+@pytest.mark.parametrize("command, data", _ACKS)
+def test_create_packet_with_data_matches_two_step_decoding(command: int, data: bytes):
+    factory = PacketFactory()
+    packet = factory.create_packet_with_data(command, 5, data)
+    expected = _create_packet_with_data_two_step(factory, command, 5, data)
+    assert type(packet) is type(expected)
+    assert packet.command == expected.command
+    assert packet.kind == expected.kind
+    assert packet.number == 5
+
+
+def test_all_commands_are_registered():
+    factory = PacketFactory()
+    for (command, kind), packet in factory.data.items():
+        if kind == -1 and not isinstance(packet, PacketAck):
+            assert factory.create_packet(command).command == command
+
+
+def test_subclass_defined_later_is_registered():
+    PacketFactory()
+
+    class _LatePacket(Packet):
+        def __init__(self):
+            super().__init__()
+            self._command = 1000
+
+    factory = PacketFactory()
+    assert isinstance(factory.create_packet(1000), _LatePacket)
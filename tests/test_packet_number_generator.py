@@ -0,0 +1,70 @@
+"""Tests for packet number generator and correlation of acknowledges by packet number"""
+
+import asyncio
+
+import pytest
+
+from science_mode_4.device_p24 import DeviceP24
+from science_mode_4.protocol.packet_number_generator import PacketNumberGenerator
+from science_mode_4.utils.emulator_connection import EmulatorConnection
+
+
+def test_acquire_waits_for_release():
+    generator = PacketNumberGenerator()
+
+    async def run():
+        numbers = [await generator.acquire_number() for _ in range(PacketNumberGenerator.NUMBER_COUNT)]
+        assert len(set(numbers)) == PacketNumberGenerator.NUMBER_COUNT
+        waiting = asyncio.ensure_future(generator.acquire_number())
+        await asyncio.sleep(0)
+        assert not waiting.done()
+        generator.release_number(numbers[10])
+        assert await waiting == numbers[10]
+        for x in numbers:
+            generator.release_number(x)
+
+    # generator is usable with more than one event loop
+    asyncio.run(run())
+    asyncio.run(run())
+
+
+def test_quarantined_number_is_not_handed_out():
+    generator = PacketNumberGenerator()
+
+    async def run():
+        late_acknowledge = asyncio.get_running_loop().create_future()
+        number = await generator.acquire_number()
+        generator.quarantine_number(number, late_acknowledge)
+        others = [await generator.acquire_number() for _ in range(PacketNumberGenerator.NUMBER_COUNT - 1)]
+        assert number not in others
+        assert generator.quarantined_count == 1
+
+        late_acknowledge.set_result(None)
+        await asyncio.sleep(0)
+        assert generator.quarantined_count == 0
+        assert await generator.acquire_number() == number
+
+    asyncio.run(run())
+
+
+def test_late_acknowledge_is_discarded():
+    async def run():
+        conn = EmulatorConnection("1234567890")
+        conn.open()
+        conn.latency_in_seconds = 0.05
+        device = DeviceP24(conn)
+        general = device.get_layer_general()
+        general.timeout_in_seconds = 0.01
+        with pytest.raises(ValueError):
+            await general.get_device_id()
+        assert device.packet_number_generator.quarantined_count == 1
+
+        general.timeout_in_seconds = 1.0
+        assert (await general.get_stim_status()).stim_status is not None
+        await asyncio.sleep(0)
+        assert device.packet_number_generator.quarantined_count == 0
+        assert device.packet_number_generator.in_use_count == 0
+        assert device.packet_buffer.stream_count == 0
+        conn.close()
+
+    asyncio.run(run())
@@ -0,0 +1,201 @@
+"""Tests for protocol encoding"""
+
+import random
+
+import pytest
+
+from science_mode_4.protocol.packet import Packet
+from science_mode_4.protocol.packet_factory import PacketFactory
+from science_mode_4.protocol.protocol import Protocol
+from science_mode_4.protocol.protocol_helper import ProtocolHelper
+from science_mode_4.utils.null_connection import NullConnection
+from science_mode_4.utils.packet_buffer import PacketBuffer
+from science_mode_4.utils.transmit_buffer import TransmitBuffer
+
+
+def _stuff_bytewise(packet_data: bytes) -> bytes:
+    """Reference implementation, stuffs one byte at a time"""
+    result = bytearray()
+    for b in packet_data:
+        if b in [Protocol.START_BYTE, Protocol.STOP_BYTE, Protocol.STUFFING_BYTE]:
+            result.extend(Protocol.stuff_byte(b))
+        else:
+            result.append(b)
+    return bytes(result)
+
+
+def _unstuff_bytewise(stuffed_packet_data: bytes) -> bytes:
+    """Reference implementation, unstuffs one byte at a time"""
+    result = bytearray()
+    index = 0
+    while index < len(stuffed_packet_data):
+        if stuffed_packet_data[index] == Protocol.STUFFING_BYTE:
+            index += 1
+            result.append(Protocol.unstuff_byte(stuffed_packet_data[index]))
+        else:
+            result.append(stuffed_packet_data[index])
+        index += 1
+    return bytes(result)
+
+
+def _random_payloads() -> list[bytes]:
+    rnd = random.Random(4)
+    # framing bytes are more likely than in random data
+    special = [0xF0, 0x0F, 0x81, 0x55, 0x00, 0xFF]
+    result = [b"", bytes([0xF0]), bytes([0x0F, 0x81, 0xF0]), bytes(range(256))]
+    for length in [1, 2, 3, 10, 100, 1000]:
+        for _ in range(20):
+            result.append(bytes(rnd.choice(special) if rnd.random() < 0.3 else rnd.randrange(256) for _ in range(length)))
+    return result
+
+
+class _FailingPacket(Packet):
+    """Packet with invalid parameters"""
+
+    def __init__(self):
+        super().__init__()
+        self._command = 1
+
+    def get_data(self) -> bytes:
+        raise ValueError("invalid parameter")
+
+
+class _SimplePacket(Packet):
+    """Packet with fixed payload"""
+
+    def __init__(self):
+        super().__init__()
+        self._command = 2
+
+    def get_data(self) -> bytes:
+        return bytes([0xF0, 0x01, 0x0F, 0x81])
+
+
+class _RecordingConnection(NullConnection):
+    """Connection that keeps all written data"""
+
+    def __init__(self):
+        super().__init__()
+        self.written = []
+
+    def write(self, data: bytes):
+        self.written.append(data)
+
+    def clear_buffer(self):
+        pass
+
+
+def test_packet_to_buffer_keeps_target_on_error():
+    target = bytearray(b"\x01\x02")
+    with pytest.raises(ValueError):
+        Protocol.packet_to_buffer(_FailingPacket(), target)
+    assert target == b"\x01\x02"
+
+
+def test_raw_packet_to_buffer_removes_partial_frame_on_error():
+    target = bytearray(b"\x01\x02")
+    with pytest.raises(TypeError):
+        Protocol.raw_packet_to_buffer(1, 0, object(), target)
+    assert target == b"\x01\x02"
+
+
+def test_transmit_buffer_not_corrupted_by_failing_packet():
+    conn = _RecordingConnection()
+    transmit_buffer = TransmitBuffer(conn)
+    with pytest.raises(ValueError):
+        with transmit_buffer.batch():
+            transmit_buffer.write_packet(_FailingPacket())
+    assert transmit_buffer.pending_byte_count == 0
+
+    transmit_buffer.write_packet(_SimplePacket())
+    assert conn.written == [Protocol.packet_to_bytes(_SimplePacket())]
+    assert Protocol.is_valid_packet_data(conn.written[0])
+
+
+def test_failed_batch_is_not_written():
+    conn = _RecordingConnection()
+    discarded = []
+    transmit_buffer = TransmitBuffer(conn, discarded.append)
+    packets = [_SimplePacket(), _SimplePacket()]
+    with pytest.raises(RuntimeError):
+        with transmit_buffer.batch():
+            transmit_buffer.write_packet(packets[0])
+            transmit_buffer.write_packet(packets[1])
+            raise RuntimeError("Batch failed")
+    assert not conn.written
+    assert transmit_buffer.pending_byte_count == 0
+    assert discarded == packets
+
+
+def test_failed_nested_batch_keeps_outer_packets():
+    conn = _RecordingConnection()
+    discarded = []
+    transmit_buffer = TransmitBuffer(conn, discarded.append)
+    outer = [_SimplePacket(), _SimplePacket()]
+    inner = _SimplePacket()
+    with transmit_buffer.batch():
+        transmit_buffer.write_packet(outer[0])
+        with pytest.raises(RuntimeError):
+            with transmit_buffer.batch():
+                transmit_buffer.write_packet(inner)
+                raise RuntimeError("Batch failed")
+        transmit_buffer.write_packet(outer[1])
+    assert discarded == [inner]
+    assert conn.written == [Protocol.packet_to_bytes(outer[0]) + Protocol.packet_to_bytes(outer[1])]
+
+
+def test_failed_batch_after_flush():
+    conn = _RecordingConnection()
+    discarded = []
+    transmit_buffer = TransmitBuffer(conn, discarded.append)
+    packets = [_SimplePacket(), _SimplePacket()]
+    with pytest.raises(RuntimeError):
+        with transmit_buffer.batch():
+            transmit_buffer.write_packet(packets[0])
+            # e.g. a request waiting for its acknowledge
+            transmit_buffer.flush()
+            transmit_buffer.write_packet(packets[1])
+            raise RuntimeError("Batch failed")
+    assert conn.written == [Protocol.packet_to_bytes(packets[0])]
+    assert discarded == [packets[1]]
+
+
+def test_failed_batch_removes_open_acknowledges():
+    conn = _RecordingConnection()
+    packet_buffer = PacketBuffer(conn, PacketFactory())
+    packet = _SimplePacket()
+    with pytest.raises(RuntimeError):
+        with packet_buffer.transmit_buffer.batch():
+            ProtocolHelper.send_packet(packet, 1, packet_buffer)
+            raise RuntimeError("Batch failed")
+    assert not conn.written
+    assert packet_buffer._open_acknowledges[packet.command + 1, 1] == 0 # pylint:disable=protected-access
+
+
+@pytest.mark.parametrize("data", _random_payloads())
+def test_stuff_matches_bytewise(data: bytes):
+    stuffed = Protocol.stuff(data)
+    assert stuffed == _stuff_bytewise(data)
+    target = bytearray(b"\x01")
+    assert Protocol.stuff_into(memoryview(data), target) == len(stuffed)
+    assert target == b"\x01" + stuffed
+
+
+@pytest.mark.parametrize("data", _random_payloads())
+def test_unstuff_matches_bytewise(data: bytes):
+    stuffed = _stuff_bytewise(data)
+    assert Protocol.unstuff(stuffed) == _unstuff_bytewise(stuffed) == data
+    target = bytearray(b"\x01")
+    assert Protocol.unstuff_into(memoryview(stuffed), target) == len(data)
+    assert target == b"\x01" + data
+
+
+@pytest.mark.parametrize("data", _random_payloads())
+def test_packet_round_trip(data: bytes):
+    frame = bytearray()
+    Protocol.raw_packet_to_buffer(0x3F0, 0x2F, data, frame)
+    assert frame[0] == Protocol.START_BYTE and frame[-1] == Protocol.STOP_BYTE
+    # payload contains no unstuffed framing bytes
+    assert Protocol.START_BYTE not in frame[9:-1] and Protocol.STOP_BYTE not in frame[9:-1]
+    assert Protocol.is_valid_packet_data(bytes(frame))
+    assert Protocol.extract_packet_data(bytes(frame)) == (0x3F0, 0x2F, data)
@@ -0,0 +1,120 @@
+"""Tests for record and replay connections"""
+
+import asyncio
+import sys
+import threading
+import time
+
+import pytest
+
+from science_mode_4.device_p24 import DeviceP24
+from science_mode_4.protocol.protocol import Protocol
+from science_mode_4.protocol.types import StimStatus
+from science_mode_4.utils.emulator_connection import EmulatorConnection
+from science_mode_4.utils.null_connection import NullConnection
+from science_mode_4.utils.recording_connection import ConnectionRecordDirection, RecordingConnection
+from science_mode_4.utils.replay_connection import ReplayConnection
+from science_mode_4.utils.threaded_frame_reader import ThreadedFrameReader
+
+
+class _ChunkConnection(NullConnection):
+    """Connection that returns queued chunks of data"""
+
+    def __init__(self, chunks: list[bytes]):
+        super().__init__()
+        self._chunks = list(chunks)
+        self._lock = threading.Lock()
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return not self._chunks
+
+    def read(self) -> bytes:
+        with self._lock:
+            return self._chunks.pop(0) if self._chunks else b""
+
+    def clear_buffer(self):
+        pass
+
+
+def _frame(command: int, number: int, data: bytes) -> bytes:
+    buffer = bytearray()
+    Protocol.raw_packet_to_buffer(command, number, data, buffer)
+    return bytes(buffer)
+
+
+def test_record_and_replay_session(tmp_path):
+    filename = str(tmp_path / "session.rec")
+
+    async def run(conn) -> StimStatus:
+        conn.open()
+        device = DeviceP24(conn)
+        await device.get_layer_mid_level().init(False)
+        stim_status = await device.get_layer_general().get_stim_status()
+        await device.get_layer_mid_level().stop()
+        conn.close()
+        return stim_status.stim_status
+
+    recording = RecordingConnection(EmulatorConnection(), filename)
+    assert asyncio.run(run(recording)) == StimStatus.MID_LEVEL_INITIALIZED
+
+    records = RecordingConnection.read_records(filename)
+    assert len(records) == recording.record_count
+    assert [x.timestamp for x in records] == sorted(x.timestamp for x in records)
+    assert {x.direction for x in records} == {ConnectionRecordDirection.READ, ConnectionRecordDirection.WRITE}
+
+    # device sends same answers, because requests are the same
+    replay = ReplayConnection(filename, original_timing=False)
+    assert asyncio.run(run(replay)) == StimStatus.MID_LEVEL_INITIALIZED
+    assert replay.is_finished
+    assert replay.written_byte_count == sum(len(x.data) for x in records if x.direction == ConnectionRecordDirection.WRITE)
+
+    # with original timing all chunks are returned after duration of recording
+    replay = ReplayConnection(filename, speed=10)
+    replay.open()
+    time.sleep(replay.duration_in_seconds / 10)
+    assert replay.read() == b"".join(x.data for x in records if x.direction == ConnectionRecordDirection.READ)
+    assert replay.is_finished
+
+
+def test_record_with_reader_thread(tmp_path):
+    filename = str(tmp_path / "session.rec")
+    read_chunks = [_frame(1, x % 64, bytes(range(x % 200))) for x in range(2000)]
+    # chunks larger than file buffer, so file writes release GIL
+    written_chunks = [bytes([x % 256]) * (x % 50 + 10000) for x in range(2000)]
+    recording = RecordingConnection(_ChunkConnection(read_chunks), filename)
+    recording.open()
+    reader = ThreadedFrameReader(recording, idle_sleep_in_seconds=0)
+    # switch threads as often as possible
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    reader.start()
+    try:
+        # records from reader thread and this thread are written concurrently
+        for data in written_chunks:
+            recording.write(data)
+        deadline = time.monotonic() + 5
+        while reader.packet_count < len(read_chunks):
+            assert time.monotonic() < deadline
+            time.sleep(0.001)
+    finally:
+        reader.stop()
+        recording.close()
+        sys.setswitchinterval(switch_interval)
+
+    records = RecordingConnection.read_records(filename)
+    assert len(records) == len(read_chunks) + len(written_chunks)
+    assert [x.data for x in records if x.direction == ConnectionRecordDirection.READ] == read_chunks
+    assert [x.data for x in records if x.direction == ConnectionRecordDirection.WRITE] == written_chunks
+
+    replay = ReplayConnection(filename, original_timing=False)
+    replay.open()
+    assert [replay.read() for _ in range(replay.chunk_count)] == read_chunks
+    assert replay.is_finished
+
+
+def test_read_records_rejects_other_files(tmp_path):
+    filename = tmp_path / "other.rec"
+    filename.write_bytes(b"not a recording")
+    with pytest.raises(ValueError):
+        RecordingConnection.read_records(str(filename))
@@ -0,0 +1,125 @@
+"""Tests for threaded frame reader"""
+
+import threading
+import time
+
+import pytest
+
+from science_mode_4.protocol.commands import Commands
+from science_mode_4.protocol.packet_factory import PacketFactory
+from science_mode_4.protocol.protocol import Protocol
+from science_mode_4.utils.async_serial_port_connection import AsyncSerialPortConnection
+from science_mode_4.utils.null_connection import NullConnection
+from science_mode_4.utils.packet_buffer import PacketBuffer
+from science_mode_4.utils.recording_connection import RecordingConnection
+from science_mode_4.utils.threaded_frame_reader import ThreadedFrameReader
+
+
+class _ChunkConnection(NullConnection):
+    """Connection that returns queued chunks of data"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._lock = threading.Lock()
+        self.clear_count = 0
+
+    def push(self, data: bytes):
+        with self._lock:
+            self._chunks.append(data)
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return not self._chunks
+
+    def read(self) -> bytes:
+        with self._lock:
+            return self._chunks.pop(0) if self._chunks else b""
+
+    def clear_buffer(self):
+        self.clear_count += 1
+
+
+def _frame(command: int, number: int, data: bytes) -> bytes:
+    buffer = bytearray()
+    Protocol.raw_packet_to_buffer(command, number, data, buffer)
+    return bytes(buffer)
+
+
+def _wait_until(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_clear_discards_partial_frame():
+    conn = _ChunkConnection()
+    reader = ThreadedFrameReader(conn)
+    reader.start()
+    try:
+        first = _frame(1, 1, b"first")
+        second = _frame(2, 2, b"second")
+        conn.push(first[:-3])
+        _wait_until(conn.is_empty)
+        reader.clear()
+        assert conn.clear_count == 1
+
+        conn.push(first[-3:] + second)
+        _wait_until(lambda: reader.packet_count > 0)
+        assert reader.get_raw_packet() == (2, 2, b"second")
+        assert reader.get_raw_packet() is None
+    finally:
+        reader.stop()
+
+
+def test_clear_without_running_thread():
+    conn = _ChunkConnection()
+    reader = ThreadedFrameReader(conn)
+    reader.clear()
+    assert conn.clear_count == 1
+
+
+def test_event_loop_reader_disabled_while_running():
+    conn = AsyncSerialPortConnection("not_existing_port")
+    reader = ThreadedFrameReader(conn)
+    reader.start()
+    assert not conn.event_loop_reader_enabled
+    reader.stop()
+    assert conn.event_loop_reader_enabled
+
+
+class _FailingConnection(_ChunkConnection):
+    """Connection that raises after all chunks were read"""
+
+    def read(self) -> bytes:
+        if self.is_empty():
+            raise OSError("Connection lost")
+        return super().read()
+
+
+def test_event_loop_reader_of_wrapped_connection_disabled_while_running(tmp_path):
+    inner = AsyncSerialPortConnection("not_existing_port")
+    conn = RecordingConnection(inner, str(tmp_path / "session.rec"))
+    reader = ThreadedFrameReader(conn)
+    reader.start()
+    assert not inner.event_loop_reader_enabled
+    reader.stop()
+    assert inner.event_loop_reader_enabled
+
+
+def test_reader_error_is_raised_by_packet_buffer():
+    conn = _FailingConnection()
+    conn.push(_frame(Commands.DlSendLiveData, 0, b"last"))
+    packet_buffer = PacketBuffer(conn, PacketFactory())
+    packet_buffer.start_reader_thread()
+    try:
+        _wait_until(lambda: not packet_buffer.reader.is_running)
+        # packets read before error are returned first
+        assert packet_buffer.get_raw_packet_from_buffer() == (Commands.DlSendLiveData, 0, b"last")
+        with pytest.raises(OSError):
+            packet_buffer.get_raw_packet_from_buffer()
+        with pytest.raises(OSError):
+            packet_buffer.process_incoming()
+    finally:
+        packet_buffer.stop_reader_thread()